@@ -1,14 +1,141 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, List, Optional
-import pandas as pd
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+from contextlib import asynccontextmanager
+import os
+import asyncio
+import importlib
+import json
+import math
+import threading
+import time
+import uuid
 from datetime import datetime
 
-from backtest import QuantBacktester, BacktestConfig
-from strategies import get_strategy, STRATEGY_CONFIGS
-from data import DataFetcher
+# pandas, numba and the engine modules load on first use (or during /ready warm-up), so
+# importing this module costs little more than FastAPI itself
+from batch import BatchRunner
+from jobs import JobManager
+from cache import ResultCache, make_key, series_version
+import profiling
 
-app = FastAPI(title="Quant Backtester API", version="1.0.0")
+if TYPE_CHECKING:
+    import pandas as pd
+
+batch_runner = BatchRunner()
+result_cache = ResultCache()
+# Per-bar series of recent runs by request_id, for /backtest/{id}/series and binary formats
+series_store = ResultCache(max_entries=int(os.getenv('SERIES_CACHE_SIZE', 256)))
+MAX_SERIES_POINTS = 100_000
+CHART_COLUMNS = ('price', 'equity_curve', 'drawdown')
+job_manager = JobManager(db_path=os.getenv('JOBS_DB_PATH'), runner=batch_runner)
+
+
+# Background warm-up for /ready: imports the engine, runs a small backtest, compiles kernels
+WARMUP_ON_START = os.getenv('API_WARMUP', 'false').lower() in ('1', 'true', 'yes')
+warmup_state: Dict = {'status': 'idle', 'steps': {}}
+warmup_lock = threading.Lock()
+
+
+WARMUP_MODULES = ('pandas', 'backtest', 'strategies', 'data', 'optimizer', 'walkforward', 'montecarlo',
+                  'portfolio', 'downsample', 'metrics')
+
+
+def warm_up() -> None:
+    steps = warmup_state['steps']
+    try:
+        start = time.perf_counter()
+        for module in WARMUP_MODULES:
+            importlib.import_module(module)
+        steps['imports'] = time.perf_counter() - start
+        
+        from backtest import QuantBacktester, BacktestConfig
+        from data import DataFetcher
+        from providers import SyntheticProvider
+        from strategies import get_strategy, STRATEGY_CONFIGS
+        start = time.perf_counter()
+        prices = SyntheticProvider(seed=0, bars=300).download('WARMUP')['close']
+        for name in STRATEGY_CONFIGS:
+            QuantBacktester().backtest_strategy(prices, get_strategy(name)(prices), name)
+        steps['backtest'] = time.perf_counter() - start
+        
+        if BacktestConfig().engine == 'numba':
+            import kernels
+            start = time.perf_counter()
+            kernels.warm_up()
+            steps['kernels'] = time.perf_counter() - start
+        
+        tickers = [t.strip() for t in os.getenv('API_WARMUP_TICKERS', '').split(',') if t.strip()]
+        if tickers:
+            start = time.perf_counter()
+            DataFetcher.fetch_many(tickers, period=os.getenv('API_WARMUP_PERIOD', '5y'))
+            steps['prices'] = time.perf_counter() - start
+        warmup_state['status'] = 'warm'
+    except Exception as e:
+        warmup_state.update(status='failed', error=f"{type(e).__name__}: {e}")
+
+
+def start_warm_up() -> None:
+    with warmup_lock:
+        if warmup_state['status'] != 'idle':
+            return
+        warmup_state['status'] = 'warming'
+    threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if WARMUP_ON_START:
+        start_warm_up()
+    yield
+    job_manager.shutdown()
+
+
+app = FastAPI(title="Quant Backtester API", version="1.0.0", lifespan=lifespan)
+ALLOW_PROFILING = os.getenv('API_ALLOW_PROFILING', 'false').lower() in ('1', 'true', 'yes')
+
+
+@app.middleware("http")
+async def timing_middleware(request: Request, call_next):
+    """
+    Adds a ``Server-Timing`` header (stage spans + total) and records the request latency.
+    ``?profile=cprofile`` (or ``pyinstrument``) returns the request's profile as text instead.
+    """
+    mode = request.query_params.get('profile')
+    profiler = None
+    if mode is not None and ALLOW_PROFILING:
+        try:
+            profiler = profiling.Profiler('cprofile' if mode in ('', '1', 'true') else mode)
+        except ValueError as e:
+            return JSONResponse(status_code=400, content={"detail": str(e)})
+        if not profiling.profile_lock.acquire(blocking=False):
+            return JSONResponse(status_code=409, content={"detail": "Another request is being profiled"})
+    
+    token = profiling.start_request()
+    start = time.perf_counter()
+    try:
+        if profiler is not None:
+            profiler.start()
+            try:
+                response = await call_next(request)
+            finally:
+                profiler.stop()
+        else:
+            response = await call_next(request)
+    finally:
+        elapsed = time.perf_counter() - start
+        spans = profiling.end_request(token)
+        if profiler is not None:
+            profiling.profile_lock.release()
+    
+    route = request.scope.get('route')
+    profiling.request_duration.observe(elapsed, method=request.method,
+                                       route=getattr(route, 'path', 'unmatched'), status=response.status_code)
+    if profiler is not None:
+        response = PlainTextResponse(profiler.report())
+    response.headers['Server-Timing'] = profiling.server_timing(spans, elapsed)
+    return response
 
 
 class BacktestRequest(BaseModel):
@@ -19,6 +146,50 @@ class BacktestRequest(BaseModel):
     initial_cash: float = 100000
 
 
+class OptimizeRequest(BaseModel):
+    ticker: str
+    period: str = "5y"
+    strategy_name: str
+    metric: str = "sharpe_ratio"
+    top_n: int = 20
+    steps: Dict = {}
+    initial_cash: float = 100000
+
+
+class MonteCarloRequest(BacktestRequest):
+    n_paths: int = 10000
+    method: str = "stationary"
+    block_size: int = 20
+    confidence: float = 0.95
+    seed: Optional[int] = None
+
+
+class PortfolioRequest(BaseModel):
+    tickers: List[str] = []
+    period: str = "5y"
+    strategy_name: str
+    parameters: Dict = {}
+    rebalance: Optional[str] = "M"
+    threshold: Optional[float] = None
+    initial_cash: float = 100000
+
+
+class WalkForwardRequest(BaseModel):
+    ticker: str
+    period: str = "5y"
+    strategy_name: str
+    train_size: int = 252
+    test_size: int = 63
+    anchored: bool = False
+    metric: str = "sharpe_ratio"
+    steps: Dict = {}
+    initial_cash: float = 100000
+
+
+class JobRequest(BaseModel):
+    requests: List[BacktestRequest]
+
+
 class BacktestResponse(BaseModel):
     request_id: str
     strategy_name: str
@@ -35,6 +206,138 @@ class BacktestResponse(BaseModel):
     status: str = "completed"
 
 
+def new_request_id() -> str:
+    return f"REQ_{datetime.now().timestamp()}_{uuid.uuid4().hex[:8]}"
+
+
+def result_series(prices: 'pd.Series', results: Dict) -> 'pd.DataFrame':
+    import columnar
+    return columnar.series_frame(prices, columnar.series_arrays(results))
+
+
+def check_format(fmt: str) -> None:
+    import columnar
+    try:
+        columnar.check_format(fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def columnar_response(frames: List['pd.DataFrame'], meta: Dict, fmt: str) -> Response:
+    """Series as one Arrow IPC stream / ``.npz`` archive; the JSON body goes in its metadata."""
+    import columnar
+    from fastapi.encoders import jsonable_encoder
+    with profiling.span('encode'):
+        content = columnar.encode(frames, jsonable_encoder(meta), fmt)
+    return Response(content=content, media_type=columnar.MEDIA_TYPES[fmt])
+
+
+def cache_key(request: BacktestRequest, prices: Optional['pd.Series'] = None) -> Optional[str]:
+    """Content address of a request: its payload plus the version of the price snapshot it runs on."""
+    from data import DataFetcher
+    version = DataFetcher.data_version(request.ticker, period=request.period)
+    if version is None and prices is not None:
+        version = series_version(prices)
+    return make_key(request.model_dump(), version) if version is not None else None
+
+
+def build_response(request: BacktestRequest, results: Dict) -> BacktestResponse:
+    return BacktestResponse(
+        request_id=new_request_id(),
+        strategy_name=request.strategy_name,
+        ticker=request.ticker,
+        total_return=results['total_return'],
+        sharpe_ratio=results['sharpe_ratio'],
+        sortino_ratio=results['sortino_ratio'],
+        calmar_ratio=results['calmar_ratio'],
+        max_drawdown=results['max_drawdown'],
+        annual_return=results['annual_return'],
+        annual_volatility=results['annual_volatility'],
+        win_rate=results['win_rate'],
+        total_trades=int(results['total_trades']),
+    )
+
+
+def run_batch(requests: List[BacktestRequest], series: bool = False) -> Dict:
+    """
+    Scalar results in request order, failures under ``errors``. ``series`` also returns the
+    per-bar frame of every successful result (same order) under ``series``.
+    """
+    import columnar
+    from batch import load_prices
+    items = [req.model_dump() for req in requests]
+    prices = load_prices(items)
+    
+    keys = [cache_key(req, prices.get((req.ticker, req.period))) for req in requests]
+    cached = [result_cache.get(key) if key else None for key in keys]
+    if series:
+        # A cached result whose series has been evicted is run again
+        cached = [hit if hit is not None and series_store.get(hit.request_id) is not None else None
+                  for hit in cached]
+    pending = [i for i, hit in enumerate(cached) if hit is None]
+    outcomes = dict(zip(pending, batch_runner.run([items[i] for i in pending], prices, series=series)))
+    
+    results, errors, frames = [], [], []
+    for index, req in enumerate(requests):
+        if cached[index] is not None:
+            response = cached[index].model_copy(update={'request_id': new_request_id()})
+            frame = series_store.get(cached[index].request_id) if series else None
+        else:
+            outcome = outcomes[index]
+            if not outcome['ok']:
+                errors.append({"index": index, "ticker": req.ticker, "strategy_name": req.strategy_name,
+                               "error": outcome['error']})
+                continue
+            response = build_response(req, outcome['result'])
+            if keys[index]:
+                result_cache.set(keys[index], response)
+            frame = columnar.series_frame(prices[(req.ticker, req.period)], outcome['series']) if series else None
+        results.append(response)
+        if frame is not None:
+            series_store.set(response.request_id, frame)
+            frames.append(frame)
+    body = {"total": len(requests), "successful": len(results), "results": results, "errors": errors}
+    if series:
+        body['series'] = frames
+    return body
+
+
+def ndjson_line(data: Dict) -> bytes:
+    """One NDJSON line; NaN/inf become null, as in the JSON responses."""
+    clean = {key: None if isinstance(value, float) and not math.isfinite(value) else value
+             for key, value in data.items()}
+    return (json.dumps(clean, allow_nan=False) + '\n').encode()
+
+
+def stream_batch(requests: List[BacktestRequest], prices: Dict[Tuple[str, str], 'pd.Series']) -> Iterator[bytes]:
+    """
+    NDJSON in completion order, cache hits first: each result as a ``BacktestResponse`` plus
+    its request ``index``, each failure as ``{"index", "ticker", "strategy_name", "error"}``.
+    """
+    pending, keys = [], {}
+    for index, req in enumerate(requests):
+        key = cache_key(req, prices.get((req.ticker, req.period)))
+        hit = result_cache.get(key) if key else None
+        if hit is not None:
+            response = hit.model_copy(update={'request_id': new_request_id()})
+            yield ndjson_line({"index": index, **response.model_dump()})
+        else:
+            pending.append(index)
+            keys[index] = key
+    
+    for position, outcome in batch_runner.iter_results([requests[i].model_dump() for i in pending], prices):
+        index = pending[position]
+        req = requests[index]
+        if outcome['ok']:
+            response = build_response(req, outcome['result'])
+            if keys[index]:
+                result_cache.set(keys[index], response)
+            line = {"index": index, **response.model_dump()}
+        else:
+            line = {"index": index, "ticker": req.ticker, "strategy_name": req.strategy_name, "error": outcome['error']}
+        yield ndjson_line(line)
+
+
 @app.get("/")
 async def root():
     return {"message": "Quant Backtester API", "version": "1.0.0"}
@@ -42,48 +345,273 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    return {"status": "healthy", "timestamp": datetime.now().isoformat(), "result_cache": result_cache.stats()}
+
+
+@app.get("/ready")
+async def ready(warm: bool = False):
+    """
+    Readiness probe. ``warm=true`` starts the background warm-up (once) and reports 503 until
+    it has finished; a failed warm-up is reported but does not block readiness.
+    """
+    if warm:
+        start_warm_up()
+    status = warmup_state['status']
+    body = {"status": "warming" if status == 'warming' and warm else "ready", "warmup": warmup_state}
+    return JSONResponse(status_code=503 if body['status'] == 'warming' else 200, content=body)
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return PlainTextResponse(profiling.render_metrics(), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/strategies")
 async def list_strategies():
+    from strategies import STRATEGY_CONFIGS
     return {"total": len(STRATEGY_CONFIGS), "strategies": list(STRATEGY_CONFIGS.keys())}
 
 
 @app.get("/tickers")
 async def list_tickers():
+    from data import DataFetcher
     tickers = DataFetcher.get_available_tickers()
     return {"total": len(tickers), "tickers": tickers}
 
 
+def fetch_prices(request: BacktestRequest) -> 'pd.Series':
+    from data import DataFetcher
+    with profiling.span('fetch'):
+        data = DataFetcher.fetch_historical_data(request.ticker, period=request.period)
+    if data.empty:
+        raise HTTPException(status_code=400, detail=f"No data for {request.ticker}")
+    return data['close']
+
+
 @app.post("/backtest")
-async def run_backtest(request: BacktestRequest):
+async def run_backtest(request: BacktestRequest, fmt: str = Query("json", alias="format")):
+    """
+    Scalar metrics as JSON, or with ``format=arrow``/``npz`` the full per-bar series
+    (``columnar.SERIES_COLUMNS``) with the JSON body in the stream metadata.
+    """
+    from backtest import QuantBacktester, BacktestConfig
+    from strategies import get_strategy
+    check_format(fmt)
     try:
-        data = DataFetcher.fetch_historical_data(request.ticker, period=request.period)
-        if data.empty:
-            raise HTTPException(status_code=400, detail=f"No data for {request.ticker}")
+        # A fresh stored snapshot gives the cache key without loading any prices
+        prices = None
+        with profiling.span('cache'):
+            key = cache_key(request)
+        if key is None:
+            prices = fetch_prices(request)
+            key = cache_key(request, prices)
+        cached = result_cache.get(key)
+        series = series_store.get(cached.request_id) if cached is not None else None
+        # Binary formats need the series, so a hit whose series was evicted runs again
+        if cached is not None and (series is not None or fmt == 'json'):
+            response = cached.model_copy(update={'request_id': new_request_id()})
+            if series is not None:
+                series_store.set(response.request_id, series)
+            if fmt != 'json':
+                return columnar_response([series], {"results": [response], "errors": []}, fmt)
+            return response
         
-        prices = data['close']
-        strategy_func = get_strategy(request.strategy_name)
-        signals = strategy_func(prices, **request.parameters)
+        if prices is None:
+            prices = fetch_prices(request)
+        with profiling.span('signals'):
+            strategy_func = get_strategy(request.strategy_name)
+            signals = strategy_func(prices, **request.parameters)
         
-        backtester = QuantBacktester(BacktestConfig(initial_cash=request.initial_cash))
-        results = backtester.backtest_strategy(prices, signals, request.strategy_name)
+        with profiling.span('backtest'):
+            backtester = QuantBacktester(BacktestConfig(initial_cash=request.initial_cash))
+            results = backtester.backtest_strategy(prices, signals, request.strategy_name)
         
-        return BacktestResponse(
-            request_id=f"REQ_{datetime.now().timestamp()}",
-            strategy_name=request.strategy_name,
-            ticker=request.ticker,
-            total_return=results['total_return'],
-            sharpe_ratio=results['sharpe_ratio'],
-            sortino_ratio=results['sortino_ratio'],
-            calmar_ratio=results['calmar_ratio'],
-            max_drawdown=results['max_drawdown'],
-            annual_return=results['annual_return'],
-            annual_volatility=results['annual_volatility'],
-            win_rate=results['win_rate'],
-            total_trades=int(results['total_trades']),
-        )
+        with profiling.span('serialize'):
+            response = build_response(request, results)
+        result_cache.set(key, response)
+        series = result_series(prices, results)
+        series_store.set(response.request_id, series)
+        if fmt != 'json':
+            return columnar_response([series], {"results": [response], "errors": []}, fmt)
+        return response
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/backtest/{request_id}/series")
+async def backtest_series(request_id: str, points: Optional[int] = None, method: str = "lttb"):
+    """
+    Price, equity and drawdown of a recent /backtest run, each downsampled to about ``points``
+    values (``CHART_MAX_POINTS`` by default).
+    """
+    from downsample import DEFAULT_POINTS, downsample_series
+    points = DEFAULT_POINTS if points is None else points
+    frame = series_store.get(request_id)
+    if frame is None:
+        raise HTTPException(status_code=404, detail=f"No series for {request_id}; run the backtest again")
+    if not 3 <= points <= MAX_SERIES_POINTS:
+        raise HTTPException(status_code=400, detail=f"points must be between 3 and {MAX_SERIES_POINTS:,}")
+    try:
+        series = {name: downsample_series(frame[name], points, method) for name in CHART_COLUMNS}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "request_id": request_id,
+        "method": method,
+        "points": points,
+        "total_points": len(frame),
+        "series": {
+            name: {"index": [ts.isoformat() for ts in values.index], "values": values.tolist()}
+            for name, values in series.items()
+        },
+    }
+
+
+def run_montecarlo(request: MonteCarloRequest) -> Dict:
+    from batch import run_strategy
+    from montecarlo import MonteCarloSimulator
+    prices = fetch_prices(request)
+    results = run_strategy(prices, request.strategy_name, request.parameters, request.initial_cash)
+    simulator = MonteCarloSimulator(n_paths=request.n_paths, method=request.method, block_size=request.block_size,
+                                    seed=request.seed, initial_cash=request.initial_cash)
+    summary = simulator.summarize(results['returns'], confidence=request.confidence)
+    return {"ticker": request.ticker, "strategy_name": request.strategy_name, **summary}
+
+
+@app.post("/backtest/montecarlo")
+async def montecarlo(request: MonteCarloRequest):
+    try:
+        if not 0 < request.n_paths <= 1_000_000:
+            raise ValueError("n_paths must be between 1 and 1,000,000")
+        if not 0 < request.confidence < 1:
+            raise ValueError("confidence must be between 0 and 1")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, run_montecarlo, request)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def run_optimize(request: OptimizeRequest) -> Dict:
+    from backtest import BacktestConfig
+    from data import DataFetcher
+    from optimizer import GridSearchOptimizer, expand_grid
+    if request.top_n < 1:
+        raise ValueError(f"top_n must be at least 1, got {request.top_n}")
+    # Reject bad steps before fetching any data
+    grid = expand_grid(request.strategy_name, request.steps)
+    data = DataFetcher.fetch_historical_data(request.ticker, period=request.period)
+    if data.empty:
+        raise HTTPException(status_code=400, detail=f"No data for {request.ticker}")
+    
+    optimizer = GridSearchOptimizer(BacktestConfig(initial_cash=request.initial_cash))
+    ranked = optimizer.evaluate(data['close'], request.strategy_name, grid)
+    if request.metric not in ranked.columns:
+        raise ValueError(f"Unknown metric: {request.metric}")
+    top = ranked.sort_values(request.metric, ascending=False, kind='stable').head(request.top_n)
+    
+    return {
+        "ticker": request.ticker,
+        "strategy_name": request.strategy_name,
+        "metric": request.metric,
+        "combinations": len(ranked),
+        "results": json.loads(top.to_json(orient='records', date_format='iso')),
+    }
+
+
+@app.post("/optimize")
+async def optimize(request: OptimizeRequest):
+    try:
+        # The fetch and the grid search block; run them off the event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, run_optimize, request)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def run_walkforward(request: WalkForwardRequest) -> Dict:
+    from backtest import BacktestConfig
+    from data import DataFetcher
+    from walkforward import WalkForwardOptimizer
+    data = DataFetcher.fetch_historical_data(request.ticker, period=request.period)
+    if data.empty:
+        raise HTTPException(status_code=400, detail=f"No data for {request.ticker}")
+    optimizer = WalkForwardOptimizer(BacktestConfig(initial_cash=request.initial_cash))
+    result = optimizer.run(data['close'], request.strategy_name, train_size=request.train_size,
+                           test_size=request.test_size, anchored=request.anchored, metric=request.metric,
+                           steps=request.steps)
+    equity = result['equity_curve']
+    return {
+        "ticker": request.ticker,
+        "strategy_name": request.strategy_name,
+        "metric": request.metric,
+        "total_return": float(result['total_return']),
+        "sharpe_ratio": float(result['sharpe_ratio']),
+        "sortino_ratio": float(result['sortino_ratio']),
+        "calmar_ratio": float(result['calmar_ratio']),
+        "max_drawdown": float(result['max_drawdown']),
+        "win_rate": float(result['win_rate']),
+        "total_trades": int(result['total_trades']),
+        "windows": json.loads(result['windows'].to_json(orient='records', date_format='iso')),
+        "equity_curve": {"index": [ts.isoformat() for ts in equity.index], "values": equity.tolist()},
+    }
+
+
+@app.post("/walkforward")
+async def walkforward(request: WalkForwardRequest):
+    try:
+        # The optimization is CPU-bound and blocks; run it off the event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, run_walkforward, request)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def run_portfolio(request: PortfolioRequest) -> Dict:
+    from backtest import BacktestConfig
+    from data import DataFetcher
+    from portfolio import PortfolioBacktester
+    tickers = request.tickers or DataFetcher.get_available_tickers()
+    prices = DataFetcher.fetch_many(tickers, period=request.period)
+    if prices.empty:
+        raise HTTPException(status_code=400, detail="No data for the requested tickers")
+    rebalance = int(request.rebalance) if request.rebalance and request.rebalance.isdigit() else request.rebalance
+    backtester = PortfolioBacktester(BacktestConfig(initial_cash=request.initial_cash))
+    results = backtester.run_strategy(prices, request.strategy_name, request.parameters,
+                                      rebalance=rebalance, threshold=request.threshold)
+    return {
+        "strategy_name": request.strategy_name,
+        "tickers": list(prices.columns),
+        "rebalances": results['rebalances'],
+        **{key: float(results[key]) for key in ['total_return', 'annual_return', 'annual_volatility', 'sharpe_ratio',
+                                                 'sortino_ratio', 'calmar_ratio', 'max_drawdown']},
+        "total_costs": float(results['costs'].sum()),
+        "asset_contribution": results['asset_contribution'].to_dict(),
+    }
+
+
+@app.post("/portfolio")
+async def portfolio_backtest(request: PortfolioRequest):
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, run_portfolio, request)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -100,33 +628,47 @@ async def metrics_definition():
 
 
 @app.post("/backtest/batch")
-async def batch_backtest(requests: List[BacktestRequest]):
-    results = []
-    for req in requests:
-        try:
-            data = DataFetcher.fetch_historical_data(req.ticker, period=req.period)
-            if not data.empty:
-                prices = data['close']
-                strategy_func = get_strategy(req.strategy_name)
-                signals = strategy_func(prices, **req.parameters)
-                backtester = QuantBacktester(BacktestConfig(initial_cash=req.initial_cash))
-                result = backtester.backtest_strategy(prices, signals, req.strategy_name)
-                
-                results.append(BacktestResponse(
-                    request_id=f"REQ_{datetime.now().timestamp()}",
-                    strategy_name=req.strategy_name,
-                    ticker=req.ticker,
-                    total_return=result['total_return'],
-                    sharpe_ratio=result['sharpe_ratio'],
-                    sortino_ratio=result['sortino_ratio'],
-                    calmar_ratio=result['calmar_ratio'],
-                    max_drawdown=result['max_drawdown'],
-                    annual_return=result['annual_return'],
-                    annual_volatility=result['annual_volatility'],
-                    win_rate=result['win_rate'],
-                    total_trades=int(result['total_trades']),
-                ))
-        except:
-            pass
-    
-    return {"total": len(requests), "successful": len(results), "results": results}
+async def batch_backtest(requests: List[BacktestRequest], fmt: str = Query("json", alias="format"),
+                         stream: bool = False):
+    """
+    ``format=arrow``/``npz`` returns every result's series; item i of the table is ``results[i]``.
+    ``stream=true`` sends each result as an NDJSON line the moment it finishes (see ``stream_batch``).
+    """
+    check_format(fmt)
+    # Fetching and the worker pool both block, so keep them off the event loop
+    loop = asyncio.get_running_loop()
+    if stream:
+        if fmt != 'json':
+            raise HTTPException(status_code=400, detail="stream=true sends NDJSON; it cannot be combined with format")
+        from batch import load_prices
+        prices = await loop.run_in_executor(None, load_prices, [req.model_dump() for req in requests])
+        # Starlette pulls the next line only once the previous one is sent, which with the
+        # bounded in-flight window in iter_results keeps memory flat for any batch size
+        return StreamingResponse(stream_batch(requests, prices), media_type="application/x-ndjson")
+    body = await loop.run_in_executor(None, run_batch, requests, fmt != 'json')
+    if fmt == 'json':
+        return body
+    frames = body.pop('series')
+    return await loop.run_in_executor(None, columnar_response, frames, body, fmt)
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(job: JobRequest):
+    created = job_manager.submit([req.model_dump() for req in job.requests])
+    return created.snapshot(include_results=False)
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, include_results: bool = True):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.snapshot(include_results=include_results)
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.snapshot(include_results=False)
@@ -1,14 +1,16 @@
+import os
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime, timedelta
 
 from backtest import QuantBacktester, BacktestConfig
 from strategies import get_strategy, STRATEGY_CONFIGS
 from data import DataFetcher
 from utils import RiskMetrics, Formatter
+from montecarlo import MonteCarloSimulator
+from downsample import DEFAULT_POINTS, downsample_ohlc, downsample_series
 
 st.set_page_config(
     page_title="Project: A.T.L.A.S.",
@@ -314,6 +316,62 @@ st.markdown("""
     </div>
 """, unsafe_allow_html=True)
 
+# Memoized pipeline stages, keyed by their inputs; each stage reuses the cached one before it
+CACHE_TTL = int(os.getenv('DASHBOARD_CACHE_TTL', 900))
+CACHE_ENTRIES = int(os.getenv('DASHBOARD_CACHE_ENTRIES', 32))
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_ENTRIES, show_spinner=False)
+def load_data(ticker: str, period: str) -> pd.DataFrame:
+    return DataFetcher.fetch_historical_data(ticker, period=period)
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_ENTRIES, show_spinner=False)
+def generate_signals(ticker: str, period: str, strategy_name: str, params: dict) -> pd.Series:
+    return get_strategy(strategy_name)(load_data(ticker, period)['close'], **params)
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_ENTRIES, show_spinner=False)
+def run_backtest(ticker: str, period: str, strategy_name: str, params: dict, initial_capital: float) -> dict:
+    prices = load_data(ticker, period)['close']
+    signals = generate_signals(ticker, period, strategy_name, params)
+    backtester = QuantBacktester(BacktestConfig(initial_cash=initial_capital))
+    return backtester.backtest_strategy(prices, signals, strategy_name)
+
+
+# Chart frames are downsampled to about CHART_MAX_POINTS points (peaks and troughs kept),
+# indexed by bar number for the "Days" axis
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_ENTRIES, show_spinner=False)
+def equity_frame(ticker: str, period: str, strategy_name: str, params: dict, initial_capital: float) -> pd.Series:
+    equity = run_backtest(ticker, period, strategy_name, params, initial_capital)['equity_curve']
+    return downsample_series(equity.reset_index(drop=True), DEFAULT_POINTS)
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_ENTRIES, show_spinner=False)
+def drawdown_frame(ticker: str, period: str, strategy_name: str, params: dict, initial_capital: float) -> pd.Series:
+    equity = run_backtest(ticker, period, strategy_name, params, initial_capital)['equity_curve']
+    running_max = equity.expanding().max()
+    drawdown = (equity - running_max) / running_max * 100
+    return downsample_series(drawdown.reset_index(drop=True), DEFAULT_POINTS)
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_ENTRIES, show_spinner=False)
+def candlestick_frame(ticker: str, period: str) -> pd.DataFrame:
+    df_prices = load_data(ticker, period).copy()
+    df_prices['Open'] = df_prices['close'].shift(1)
+    df_prices['High'] = df_prices['close'].rolling(window=5).max()
+    df_prices['Low'] = df_prices['close'].rolling(window=5).min()
+    return downsample_ohlc(df_prices.dropna(), DEFAULT_POINTS)
+
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_ENTRIES, show_spinner=False)
+def monte_carlo_paths(ticker: str, period: str, strategy_name: str, params: dict, initial_capital: float) -> dict:
+    returns = run_backtest(ticker, period, strategy_name, params, initial_capital)['returns']
+    simulator = MonteCarloSimulator(n_paths=10000, method='stationary', block_size=20, seed=0,
+                                    initial_cash=initial_capital)
+    return simulator.simulate(returns)
+
+
 # Sidebar Configuration
 with st.sidebar:
     st.markdown("""
@@ -363,18 +421,23 @@ with st.sidebar:
     st.markdown("<div style='margin-top: 50px;'></div>", unsafe_allow_html=True)
     run_button = st.button("RUN BACKTEST", use_container_width=True, key="run_bt")
 
+current_run = dict(ticker=ticker, period=period, strategy_name=strategy_name, params=params,
+                   initial_capital=initial_capital)
 if run_button:
+    st.session_state['last_run'] = current_run
+
+# The last run stays on screen across reruns (tab switches, slider moves) until RUN is pressed again
+last_run = st.session_state.get('last_run')
+if last_run is not None:
     with st.spinner("🔄 Analyzing market data..."):
-        data = DataFetcher.fetch_historical_data(ticker, period=period)
+        data = load_data(last_run['ticker'], last_run['period'])
         
         if data.empty:
             st.error("❌ Could not fetch data for selected ticker")
         else:
-            prices = data['close']
-            strategy_func = get_strategy(strategy_name)
-            signals = strategy_func(prices, **params)
-            backtester = QuantBacktester(BacktestConfig(initial_cash=initial_capital))
-            results = backtester.backtest_strategy(prices, signals, strategy_name)
+            results = run_backtest(**last_run)
+            if last_run != current_run:
+                st.caption("Showing the last run - press RUN BACKTEST to apply the changed settings")
             
             # Results Section
             st.markdown("""
@@ -405,12 +468,14 @@ if run_button:
                 </div>
             """, unsafe_allow_html=True)
             
-            tab1, tab2, tab3, tab4, tab5 = st.tabs(["Equity Curve", "Drawdown", "Returns Distribution", "Price Action", "Metrics"])
+            tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["Equity Curve", "Drawdown", "Returns Distribution", "Price Action", "Metrics", "Monte Carlo"])
             
             with tab1:
+                equity = equity_frame(**last_run)
                 fig = go.Figure()
                 fig.add_trace(go.Scatter(
-                    y=results['equity_curve'].values, 
+                    x=equity.index,
+                    y=equity.values, 
                     mode='lines', 
                     name='Portfolio Value',
                     line=dict(color='#00ff41', width=4),
@@ -436,10 +501,10 @@ if run_button:
                 st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': True, 'displaylogo': False})
             
             with tab2:
-                running_max = results['equity_curve'].expanding().max()
-                drawdown = (results['equity_curve'] - running_max) / running_max * 100
+                drawdown = drawdown_frame(**last_run)
                 fig = go.Figure()
                 fig.add_trace(go.Scatter(
+                    x=drawdown.index,
                     y=drawdown.values, 
                     fill='tozeroy', 
                     name='Drawdown',
@@ -465,14 +530,18 @@ if run_button:
                 st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': True, 'displaylogo': False})
             
             with tab3:
-                fig = px.histogram(
-                    x=results['returns'].values, 
-                    nbins=50, 
-                    title="Daily Returns Distribution",
-                    labels={'x': 'Daily Returns (%)', 'count': 'Frequency'}
-                )
-                fig.update_traces(marker_color='#00ff41', marker_line_width=0)
+                fig = go.Figure()
+                fig.add_trace(go.Histogram(
+                    x=results['returns'].values,
+                    nbinsx=50,
+                    name='Daily Returns',
+                    marker_color='#00ff41',
+                    marker_line_width=0
+                ))
                 fig.update_layout(
+                    title="Daily Returns Distribution",
+                    xaxis_title="Daily Returns (%)",
+                    yaxis_title="Frequency",
                     template="plotly_dark",
                     plot_bgcolor='#0a0a0a',
                     paper_bgcolor='#000000',
@@ -486,11 +555,7 @@ if run_button:
                 st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': True, 'displaylogo': False})
             
             with tab4:
-                df_prices = data.copy()
-                df_prices['Open'] = df_prices['close'].shift(1)
-                df_prices['High'] = df_prices['close'].rolling(window=5).max()
-                df_prices['Low'] = df_prices['close'].rolling(window=5).min()
-                df_prices = df_prices.dropna()
+                df_prices = candlestick_frame(last_run['ticker'], last_run['period'])
                 
                 fig = go.Figure(data=[go.Candlestick(
                     x=df_prices.index,
@@ -540,6 +605,49 @@ if run_button:
                 })
                 st.dataframe(metrics_df, use_container_width=True, hide_index=True)
             
+            with tab6:
+                paths = monte_carlo_paths(**last_run)
+                fig = go.Figure()
+                fig.add_trace(go.Histogram(
+                    x=paths['terminal_equity'],
+                    nbinsx=60,
+                    name='Terminal Equity',
+                    marker_color='#00ff41',
+                    marker_line_width=0,
+                    hovertemplate='<b>₹%{x:,.0f}</b>: %{y} paths<extra></extra>'
+                ))
+                fig.update_layout(
+                    title="Terminal Equity - 10,000 Stationary Bootstrap Paths",
+                    xaxis_title="Terminal Value (₹)",
+                    yaxis_title="Paths",
+                    template="plotly_dark",
+                    plot_bgcolor='#0a0a0a',
+                    paper_bgcolor='#000000',
+                    font=dict(color='#ffffff', size=14, family='Inter'),
+                    margin=dict(l=80, r=40, t=80, b=60),
+                    title_font_size=20,
+                    title_font_color='#00ff41',
+                    xaxis_tickfont=dict(size=12),
+                    yaxis_tickfont=dict(size=12)
+                )
+                st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': True, 'displaylogo': False})
+                
+                intervals = {key: np.percentile(values, [2.5, 50, 97.5]) for key, values in paths.items()}
+                mc_df = pd.DataFrame({
+                    'Metric': ['Sharpe Ratio', 'Max Drawdown', 'Terminal Equity'],
+                    '2.5%': [f"{intervals['sharpe_ratio'][0]:.2f}",
+                             Formatter.format_percentage(intervals['max_drawdown'][0]),
+                             Formatter.format_currency(intervals['terminal_equity'][0])],
+                    'Median': [f"{intervals['sharpe_ratio'][1]:.2f}",
+                               Formatter.format_percentage(intervals['max_drawdown'][1]),
+                               Formatter.format_currency(intervals['terminal_equity'][1])],
+                    '97.5%': [f"{intervals['sharpe_ratio'][2]:.2f}",
+                              Formatter.format_percentage(intervals['max_drawdown'][2]),
+                              Formatter.format_currency(intervals['terminal_equity'][2])],
+                })
+                st.dataframe(mc_df, use_container_width=True, hide_index=True)
+                st.caption(f"Probability of loss: {Formatter.format_percentage((paths['total_return'] < 0).mean())}")
+            
             # Export Section
             st.markdown("""
                 <div style='padding-top: 50px; margin-top: 50px; border-top: 2px solid #00ff41;'>
@@ -1,13 +1,30 @@
 """
 Backtesting Engine - Simplified version without VectorBT (Mac M1/M2 compatible)
 """
+import os
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import warnings
 warnings.filterwarnings('ignore')
 
+import execution
+import kernels
+import metrics
+
+# Peak bytes of float64 temporaries per (bar, column) in the NumPy backtest_matrix path
+# (positions, fills, net returns, equity, drawdown and the metrics pass; about 84 measured with
+# tracemalloc). The kept (T x K) result arrays come on top of the budget.
+WORKING_BYTES_PER_CELL = 96
+
+# Compact layout (BacktestConfig.compact): statistics are still computed in float64 chunk by
+# chunk, so they match the default layout exactly. Only the kept arrays are narrowed, each
+# value rounded once: float32 equity, returns and drawdown are within a relative 2**-24
+# (about 6e-8, i.e. +-0.006 on 100,000 of equity) of the float64 values; int8 positions are
+# exact for whole sizes in [-128, 127] and anything else is kept as float32.
+COMPACT_PRECISION = 2.0 ** -24
+
 
 @dataclass
 class BacktestConfig:
@@ -16,6 +33,17 @@ class BacktestConfig:
     stt_tax: float = 0.001
     slippage: float = 0.0002
     max_trades: int = 1000
+    # 'pandas' (reference) or 'numba' (compiled kernels; NumPy fallback if numba is missing)
+    engine: str = field(default_factory=lambda: os.getenv('COMPUTE_ENGINE', 'pandas'))
+    # int8 positions and float32 equity/return/drawdown arrays in the results (see COMPACT_PRECISION)
+    compact: bool = field(default_factory=lambda: os.getenv('COMPUTE_COMPACT', 'false').lower() in ('1', 'true', 'yes'))
+    # Working-set cap for backtest_matrix and the optimizer; wider sweeps run in column chunks
+    memory_budget_mb: float = field(default_factory=lambda: float(os.getenv('COMPUTE_MEMORY_MB', 1024)))
+    
+    @property
+    def trade_cost(self) -> float:
+        """Cost per unit of traded size: brokerage plus slippage on every fill."""
+        return self.brokerage_fee + self.slippage
     
 
 class QuantBacktester:
@@ -28,83 +56,202 @@ class QuantBacktester:
         return price_series.pct_change().fillna(0)
     
     def calculate_sharp_ratio(self, returns: pd.Series, rf_rate: float = 0.04) -> float:
-        if len(returns) == 0:
-            return 0.0
-        annual_ret = returns.mean() * 252
-        annual_vol = returns.std() * np.sqrt(252)
-        if annual_vol == 0:
-            return 0.0
-        return (annual_ret - rf_rate) / annual_vol
+        return metrics.compute(returns, rf_rate=rf_rate)['sharpe_ratio']
     
     def calculate_sortino_ratio(self, returns: pd.Series, rf_rate: float = 0.04) -> float:
-        if len(returns) == 0:
-            return 0.0
-        annual_ret = returns.mean() * 252
-        downside_ret = returns[returns < 0]
-        downside_vol = downside_ret.std() * np.sqrt(252)
-        if downside_vol == 0:
-            return 0.0
-        return (annual_ret - rf_rate) / downside_vol
+        return metrics.compute(returns, rf_rate=rf_rate)['sortino_ratio']
     
     def calculate_max_drawdown(self, equity_curve: pd.Series) -> Tuple[float, str]:
-        running_max = equity_curve.expanding().max()
-        drawdown = (equity_curve - running_max) / running_max
-        max_dd = drawdown.min()
-        max_dd_date = drawdown.idxmin()
-        return max_dd, max_dd_date
+        stats = metrics.compute(equity_curve.pct_change(), dd=metrics.drawdown(equity_curve))
+        return stats['max_drawdown'], equity_curve.index[stats['max_drawdown_index']]
     
     def calculate_calmar_ratio(self, returns: pd.Series, equity_curve: pd.Series) -> float:
-        max_dd, _ = self.calculate_max_drawdown(equity_curve)
-        if max_dd == 0:
-            return 0.0
-        annual_ret = returns.mean() * 252
-        return annual_ret / abs(max_dd)
+        return metrics.compute(returns, equity_curve)['calmar_ratio']
     
     def calculate_var(self, returns: pd.Series, confidence: float = 0.95) -> float:
-        return np.percentile(returns, (1 - confidence) * 100)
+        return metrics.compute(returns, confidence=confidence)['var']
     
     def backtest_strategy(self, prices: pd.Series, signals: pd.Series, strategy_name: str = "Strategy") -> Dict:
         """Backtest a strategy"""
         returns = self.calculate_returns(prices)
+        # Fill forward positions, stopping new entries once max_trades round trips have opened
+        pos_values = execution.positions_from_signals(signals.to_numpy(dtype=np.float64, na_value=np.nan),
+                                                      self.config.max_trades)
+        if self.config.engine == 'numba':
+            positions, net_returns, equity_curve, drawdown = self._run_kernel(prices, pos_values)
+        else:
+            positions = pd.Series(pos_values, index=signals.index)
+            
+            # Calculate strategy returns
+            strategy_returns = positions.shift(1) * returns
+            
+            # Per-fill costs: brokerage + slippage on the traded size, STT on the sold size
+            cost_series = pd.Series(execution.fill_costs(pos_values, self.config.trade_cost, self.config.stt_tax),
+                                    index=signals.index)
+            
+            # Net returns after costs
+            net_returns = strategy_returns - cost_series
+            equity_curve = (1 + net_returns).cumprod() * self.config.initial_cash
+            drawdown = metrics.drawdown(equity_curve.to_numpy())
         
-        # Fill forward positions
-        positions = signals.copy()
-        positions = positions.fillna(method='ffill').fillna(0)
-        
-        # Calculate strategy returns
-        strategy_returns = positions.shift(1) * returns
-        
-        # Calculate costs
-        cost_series = abs(positions.diff()).fillna(0) * self.config.brokerage_fee
-        cost_series += (positions.diff() < 0).fillna(False) * 0.001 * self.config.stt_tax
-        
-        # Net returns after costs
-        net_returns = strategy_returns - cost_series
-        equity_curve = (1 + net_returns).cumprod() * self.config.initial_cash
-        
-        total_return = (equity_curve.iloc[-1] / self.config.initial_cash - 1)
-        max_dd, max_dd_date = self.calculate_max_drawdown(equity_curve)
-        annual_ret = returns.mean() * 252
-        annual_vol = returns.std() * np.sqrt(252)
-        
-        wins = (net_returns > 0).sum()
-        total_trades = (net_returns != 0).sum()
-        win_rate = wins / total_trades if total_trades > 0 else 0
+        summary = metrics.compute(net_returns.to_numpy(), dd=drawdown)
+        price_returns = returns.to_numpy()
+        trades = execution.trade_log(pos_values, prices.to_numpy(dtype=np.float64), net_returns.to_numpy(),
+                                     self.config.slippage)
+        total_return = equity_curve.iloc[-1] / self.config.initial_cash - 1
+        if self.config.compact:
+            positions = pd.Series(execution.compact_positions(pos_values), index=positions.index)
+            net_returns = net_returns.astype(np.float32)
+            equity_curve = equity_curve.astype(np.float32)
         
         return {
             'strategy_name': strategy_name,
             'equity_curve': equity_curve,
             'returns': net_returns,
             'positions': positions,
+            'trades': trades,
+            'total_return': total_return,
+            'annual_return': price_returns.mean() * 252,
+            'annual_volatility': price_returns.std(ddof=1) * np.sqrt(252),
+            'sharpe_ratio': summary['sharpe_ratio'],
+            'sortino_ratio': summary['sortino_ratio'],
+            'calmar_ratio': summary['calmar_ratio'],
+            'max_drawdown': summary['max_drawdown'],
+            'max_drawdown_date': prices.index[summary['max_drawdown_index']],
+            'var_95': summary['var'],
+            'cvar_95': summary['cvar'],
+            'profit_factor': summary['profit_factor'],
+            **execution.trade_stats(trades),
+        }
+    
+    def _run_kernel(self, prices: pd.Series, positions: np.ndarray) -> Tuple[pd.Series, pd.Series, pd.Series, np.ndarray]:
+        """Costs, equity and drawdown from one compiled loop, shaped like the pandas path."""
+        positions, net, equity, _ = kernels.backtest_loop(
+            prices.to_numpy(), positions, self.config.trade_cost, self.config.stt_tax, self.config.initial_cash,
+        )
+        # The pandas path leaves the first bar undefined (no prior position), so its drawdown
+        # peak starts at bar 1 rather than at the initial cash
+        net[0] = equity[0] = np.nan
+        drawdown = metrics.drawdown(equity)
+        index = prices.index
+        return (pd.Series(positions, index=index), pd.Series(net, index=index),
+                pd.Series(equity, index=index), drawdown)
+    
+    def chunk_columns(self, n_bars: int, n_cols: Optional[int] = None) -> int:
+        """Columns per ``backtest_matrix`` chunk that keep its working set under ``memory_budget_mb``."""
+        budget = self.config.memory_budget_mb * 2 ** 20
+        columns = max(int(budget // (max(n_bars, 1) * WORKING_BYTES_PER_CELL)), 1)
+        return columns if n_cols is None else min(columns, max(n_cols, 1))
+    
+    def backtest_matrix(self, prices, positions, keep_series: bool = True, rf_rate: float = 0.04) -> Dict:
+        """
+        Backtest K position columns in one NumPy pass.
+        
+        ``positions`` is (T x K); ``prices`` is either one series (T,) shared by every column
+        (K parameter sets) or a (T x K) matrix (K tickers). Costs and metrics follow
+        ``backtest_strategy``; the first bar has no prior position and is excluded from the
+        statistics. Returns a ``stats`` DataFrame with one row per column and, when
+        ``keep_series`` is set, the (T x K) equity, net return and drawdown arrays.
+        
+        Columns are evaluated in chunks sized by ``chunk_columns``, so the float64 temporaries
+        never exceed the memory budget; int8 positions are only widened a chunk at a time.
+        With ``config.compact`` the kept series are float32 and the positions int8 (see
+        ``COMPACT_PRECISION``); the statistics are the same in both layouts.
+        """
+        index = getattr(positions, 'index', getattr(prices, 'index', None))
+        names = list(positions.columns) if isinstance(positions, pd.DataFrame) else None
+        pos = np.asarray(positions)
+        if pos.ndim == 1:
+            pos = pos[:, None]
+        px = np.asarray(prices, dtype=np.float64)
+        if px.ndim == 1:
+            px = px[:, None]
+        n_bars, n_cols = pos.shape
+        if names is None:
+            names = list(range(n_cols))
+        
+        chunk = self.chunk_columns(n_bars, n_cols)
+        if keep_series:
+            dtype = np.float32 if self.config.compact else np.float64
+            series = {name: np.empty((n_bars, n_cols), dtype=dtype) for name in ('equity_curve', 'returns', 'drawdown')}
+            series['positions'] = np.empty((n_bars, n_cols), dtype=np.int8 if self.config.compact else np.float64)
+        parts = []
+        for start in range(0, max(n_cols, 1), chunk):
+            cols = slice(start, start + chunk)
+            part, arrays = self._matrix_chunk(px[:, cols] if px.shape[1] > 1 else px, pos[:, cols], keep_series, rf_rate)
+            parts.append(part)
+            if keep_series:
+                if self.config.compact:
+                    arrays['positions'] = execution.compact_positions(arrays['positions'])
+                    if arrays['positions'].dtype != series['positions'].dtype:
+                        series['positions'] = series['positions'].astype(np.float32)
+                for name, values in arrays.items():
+                    series[name][:, cols] = values
+        
+        stats = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+        max_dd_idx = stats.pop('max_drawdown_index')
+        stats['max_drawdown_date'] = np.asarray(index)[max_dd_idx] if index is not None else max_dd_idx
+        columns = ['total_return', 'annual_return', 'annual_volatility', 'sharpe_ratio', 'sortino_ratio',
+                   'calmar_ratio', 'max_drawdown', 'max_drawdown_date', 'var_95', 'cvar_95', 'profit_factor',
+                   'win_rate', 'total_trades']
+        results = {'stats': pd.DataFrame(stats, index=names, columns=columns)}
+        if keep_series:
+            results.update({'equity_curve': series['equity_curve'], 'returns': series['returns'],
+                            'positions': series['positions'], 'drawdown': series['drawdown'],
+                            'index': index, 'columns': names})
+        return results
+    
+    def _matrix_chunk(self, px: np.ndarray, signals: np.ndarray, keep_series: bool,
+                      rf_rate: float) -> Tuple[Dict, Optional[Dict]]:
+        """Statistics (and, with ``keep_series``, float64 series) for one column chunk."""
+        n_bars, n_cols = signals.shape
+        returns = np.zeros_like(px)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns[1:] = px[1:] / px[:-1] - 1
+        returns = np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+        price_std = returns.std(axis=0, ddof=1) if n_bars > 1 else np.zeros(px.shape[1])
+        pos = execution.positions_from_signals(signals, self.config.max_trades)
+        
+        kernel_stats = None
+        if self.config.engine == 'numba' and not keep_series:
+            kernel_stats = kernels.matrix_stats(px, pos, self.config.trade_cost, self.config.stt_tax,
+                                                self.config.initial_cash)
+        arrays = None
+        if kernel_stats is not None:
+            (total_return, mean, std, downside_std, max_dd, max_dd_idx, var_95, cvar_95,
+             gain_sum, loss_sum, wins, trades) = kernel_stats
+            summary = metrics.from_moments(mean, std, downside_std, max_dd, gain_sum, loss_sum, wins, trades, rf_rate)
+        else:
+            net = np.zeros_like(pos)
+            net[1:] = pos[:-1] * returns[1:]
+            net -= execution.fill_costs(pos, self.config.trade_cost, self.config.stt_tax)
+            
+            equity = np.cumprod(1 + net, axis=0) * self.config.initial_cash
+            drawdown = equity / np.maximum.accumulate(equity, axis=0) - 1
+            total_return = equity[-1] / self.config.initial_cash - 1
+            
+            # Bar 0 has no prior position, so it is left out of the statistics
+            summary = metrics.compute(net[1:], dd=drawdown[1:], rf_rate=rf_rate)
+            max_dd_idx = summary['max_drawdown_index'] + 1
+            var_95, cvar_95 = summary['var'], summary['cvar']
+            trades, wins = execution.trade_counts(pos, net)
+            summary.update(trades=trades, wins=wins, win_rate=wins / np.maximum(trades, 1))
+            if keep_series:
+                arrays = {'equity_curve': equity, 'returns': net, 'positions': pos, 'drawdown': drawdown}
+        
+        stats = {
             'total_return': total_return,
-            'annual_return': annual_ret,
-            'annual_volatility': annual_vol,
-            'sharpe_ratio': self.calculate_sharp_ratio(net_returns),
-            'sortino_ratio': self.calculate_sortino_ratio(net_returns),
-            'calmar_ratio': self.calculate_calmar_ratio(net_returns, equity_curve),
-            'max_drawdown': max_dd,
-            'max_drawdown_date': max_dd_date,
-            'var_95': self.calculate_var(net_returns, 0.95),
-            'win_rate': win_rate,
-            'total_trades': total_trades,
+            'annual_return': np.broadcast_to(returns.mean(axis=0) * 252, (n_cols,)),
+            'annual_volatility': np.broadcast_to(price_std * np.sqrt(252), (n_cols,)),
+            'sharpe_ratio': summary['sharpe_ratio'],
+            'sortino_ratio': summary['sortino_ratio'],
+            'calmar_ratio': summary['calmar_ratio'],
+            'max_drawdown': summary['max_drawdown'],
+            'max_drawdown_index': max_dd_idx,
+            'var_95': var_95,
+            'cvar_95': cvar_95,
+            'profit_factor': summary['profit_factor'],
+            'win_rate': summary['win_rate'],
+            'total_trades': summary['trades'],
         }
+        return stats, arrays
@@ -0,0 +1,128 @@
+"""
+Batch Runner - fans backtest requests out over a process pool
+"""
+import os
+import threading
+from functools import partial
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+import kernels
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+SCALAR_KEYS = [
+    'total_return', 'sharpe_ratio', 'sortino_ratio', 'calmar_ratio', 'max_drawdown',
+    'annual_return', 'annual_volatility', 'win_rate', 'total_trades',
+]
+
+# Price series shared by every task in a pool, installed once per worker by _init_worker
+_shared_prices: Dict[Tuple[str, str], 'pd.Series'] = {}
+
+
+def run_strategy(prices: 'pd.Series', strategy_name: str, parameters: Dict, initial_cash: float) -> Dict:
+    from backtest import QuantBacktester, BacktestConfig
+    from strategies import get_strategy
+    strategy_func = get_strategy(strategy_name)
+    signals = strategy_func(prices, **parameters)
+    backtester = QuantBacktester(BacktestConfig(initial_cash=initial_cash))
+    return backtester.backtest_strategy(prices, signals, strategy_name)
+
+
+def load_prices(items: List[Dict]) -> Dict[Tuple[str, str], 'pd.Series']:
+    """One bulk download per distinct period, keyed by (ticker, period) for the workers."""
+    from data import DataFetcher
+    prices = {}
+    for period in {item['period'] for item in items}:
+        matrix = DataFetcher.fetch_many([item['ticker'] for item in items if item['period'] == period], period=period)
+        for ticker in matrix.columns:
+            prices[(ticker, period)] = matrix[ticker].dropna()
+    return prices
+
+
+def _init_worker(prices: Dict[Tuple[str, str], 'pd.Series']) -> None:
+    global _shared_prices
+    _shared_prices = prices
+
+
+def run_item(item: Dict, prices: Optional[Dict[Tuple[str, str], 'pd.Series']] = None, series: bool = False) -> Dict:
+    """
+    Evaluate one request against the shared prices; never raises, errors are reported in the
+    result. ``series`` adds the per-bar equity, returns, positions and drawdown arrays.
+    """
+    try:
+        prices = (_shared_prices if prices is None else prices).get((item['ticker'], item['period']))
+        if prices is None or prices.empty:
+            return {'ok': False, 'error': f"No data for {item['ticker']}"}
+        results = run_strategy(prices, item['strategy_name'], item.get('parameters') or {}, item['initial_cash'])
+        result = {key: float(results[key]) for key in SCALAR_KEYS}
+        result['total_trades'] = int(results['total_trades'])
+        if series:
+            from columnar import series_arrays
+            return {'ok': True, 'result': result, 'series': series_arrays(results)}
+        return {'ok': True, 'result': result}
+    except Exception as e:
+        return {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+
+
+def default_workers() -> int:
+    return int(os.getenv('BATCH_MAX_WORKERS', os.cpu_count() or 1))
+
+
+class BatchRunner:
+    """
+    Runs a list of request dicts (ticker, period, strategy_name, parameters, initial_cash)
+    and returns one ``{'ok': ..., 'result'/'error': ...}`` entry per item, in request order.
+    Prices are handed to each worker once through the pool initializer rather than being
+    pickled with every task. ``max_workers <= 1`` (or a single item) runs inline.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, chunksize: int = 4):
+        self.max_workers = default_workers() if max_workers is None else max_workers
+        self.chunksize = chunksize
+
+    def run(self, items: List[Dict], prices: Dict[Tuple[str, str], 'pd.Series'], series: bool = False) -> List[Dict]:
+        workers = min(self.max_workers, len(items))
+        if workers <= 1:
+            return [run_item(item, prices, series) for item in items]
+        with ProcessPoolExecutor(max_workers=workers, mp_context=kernels.pool_context([__name__]),
+                                 initializer=_init_worker, initargs=(prices,)) as pool:
+            return list(pool.map(partial(run_item, series=series), items, chunksize=self.chunksize))
+
+    def iter_results(self, items: List[Dict], prices: Dict[Tuple[str, str], 'pd.Series'],
+                     cancel: Optional[threading.Event] = None,
+                     max_in_flight: Optional[int] = None) -> Iterator[Tuple[int, Dict]]:
+        """
+        Yield ``(index, outcome)`` pairs as items finish. Setting ``cancel`` (or closing the
+        iterator) stops the iteration and drops every task that has not started yet.
+        At most ``max_in_flight`` items (default ``chunksize`` per worker) are submitted at
+        once and the next is only submitted when a finished one has been consumed, so a
+        slow consumer holds the pool back instead of piling up results.
+        """
+        workers = min(self.max_workers, len(items))
+        if workers <= 1:
+            for index, item in enumerate(items):
+                if cancel is not None and cancel.is_set():
+                    return
+                yield index, run_item(item, prices)
+            return
+        limit = max(max_in_flight or workers * self.chunksize, 1)
+        queue = enumerate(items)
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=kernels.pool_context([__name__]),
+                                   initializer=_init_worker, initargs=(prices,))
+        try:
+            futures = {pool.submit(run_item, item): index for index, item in islice(queue, limit)}
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if cancel is not None and cancel.is_set():
+                        return
+                    yield futures.pop(future), future.result()
+                    index_item = next(queue, None)
+                    if index_item is not None:
+                        futures[pool.submit(run_item, index_item[1])] = index_item[0]
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
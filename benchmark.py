@@ -0,0 +1,285 @@
+"""
+Benchmark Suite - offline timings for the data, strategy, backtest, metrics and API hot paths and cold start
+
+Runs on seeded synthetic prices (no network) and sweeps series length and parameter-set
+count. Results are written as JSON; pass ``--baseline`` to compare against a stored run.
+
+    python benchmark.py --quick --output baseline.json
+    python benchmark.py --quick --baseline baseline.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+SIZES = (250, 1_000, 10_000, 100_000, 1_000_000)
+PARAM_SETS = (1, 10, 100, 1_000, 10_000)
+QUICK_SIZES = (250, 1_000, 10_000)
+QUICK_PARAM_SETS = (1, 10, 100)
+# Series length used when sweeping parameter-set counts (five years of daily bars)
+MATRIX_BARS = 1260
+MATRIX_CHUNK = 2000
+SUITES = ('data', 'strategies', 'backtest', 'metrics', 'matrix', 'api', 'startup')
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Cold-start timings, each in a fresh interpreter ('python' is the interpreter's own floor)
+STARTUP_SNIPPETS = {
+    'python': "pass",
+    'import api': "import api",
+    'import backtest': "import backtest",
+    'first POST /backtest': (
+        "from fastapi.testclient import TestClient\n"
+        "import api\n"
+        "from data import DataFetcher\n"
+        "from providers import SyntheticProvider\n"
+        "DataFetcher.store = None\n"
+        f"DataFetcher.set_provider(SyntheticProvider(seed=0, bars={MATRIX_BARS}))\n"
+        "with TestClient(api.app) as client:\n"
+        "    client.post('/backtest', json={'ticker': 'BENCH', 'strategy_name': 'SMA Crossover'}).raise_for_status()\n"
+    ),
+}
+
+
+def time_call(func: Callable[[], object], setup: Optional[Callable[[], None]] = None,
+              min_time: float = 0.2, max_repeats: int = 20) -> Dict:
+    """
+    Run ``func`` until ``min_time`` seconds have been spent or ``max_repeats`` runs are done
+    (at least once), calling ``setup`` untimed before each run. Reports min/median/mean seconds.
+    """
+    samples = []
+    while not samples or (sum(samples) < min_time and len(samples) < max_repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return {
+        'min': min(samples),
+        'median': float(np.median(samples)),
+        'mean': float(np.mean(samples)),
+        'repeats': len(samples),
+    }
+
+
+def synthetic_prices(n_bars: int, seed: int = 0) -> pd.Series:
+    """Daily-scale GBM closes; series past pandas' date range (~76k bars) are minute-stamped."""
+    from providers import SyntheticProvider
+    return SyntheticProvider(seed=seed, bars=n_bars).download('BENCH', interval='1d')['close']
+
+
+def random_positions(n_bars: int, n_cols: int, seed: int = 0) -> np.ndarray:
+    """0/1 position columns that flip on about 2% of bars, like a typical crossover signal."""
+    rng = np.random.default_rng(seed)
+    return (np.cumsum(rng.random((n_bars, n_cols)) < 0.02, axis=0) % 2).astype(np.float64)
+
+
+class Benchmark:
+    """Collects one record per (suite, name, bars, params) timing."""
+
+    def __init__(self, sizes=SIZES, param_sets=PARAM_SETS, min_time: float = 0.2, verbose: bool = True):
+        self.sizes = sizes
+        self.param_sets = param_sets
+        self.min_time = min_time
+        self.verbose = verbose
+        self.records: List[Dict] = []
+
+    def record(self, suite: str, name: str, func: Callable[[], object], bars: int, params: int = 1,
+               setup: Optional[Callable[[], None]] = None, min_time: Optional[float] = None) -> None:
+        timing = time_call(func, setup, self.min_time if min_time is None else min_time)
+        self.records.append(dict(suite=suite, name=name, bars=bars, params=params, **timing))
+        if self.verbose:
+            print(f"{suite:<11}{name:<28}{bars:>10,}{params:>8,}{timing['median'] * 1e3:>12.3f} ms", flush=True)
+
+    def run_data(self) -> None:
+        from providers import SyntheticProvider
+        for n in self.sizes:
+            provider = SyntheticProvider(seed=0, bars=n)
+            self.record('data', 'synthetic_download', lambda: provider.download('BENCH'), n)
+
+    def run_strategies(self) -> None:
+        import inspect
+        import indicators
+        from strategies import TradingStrategies
+        functions = inspect.getmembers(TradingStrategies, inspect.isfunction)
+        for n in self.sizes:
+            prices = synthetic_prices(n)
+            for name, func in functions:
+                # Cold indicator cache: measure the computation, not the memoized lookup
+                self.record('strategies', name, lambda: func(prices), n, setup=indicators.cache.clear)
+
+    def run_backtest(self) -> None:
+        import indicators
+        from backtest import QuantBacktester
+        from strategies import TradingStrategies
+        backtester = QuantBacktester()
+        for n in self.sizes:
+            prices = synthetic_prices(n)
+            signals = TradingStrategies.sma_crossover(prices)
+            indicators.cache.clear()
+            self.record('backtest', 'backtest_strategy', lambda: backtester.backtest_strategy(prices, signals), n)
+
+    def run_metrics(self) -> None:
+        import metrics
+        from utils import RiskMetrics
+        for n in self.sizes:
+            returns = synthetic_prices(n).pct_change()
+            values = returns.to_numpy()
+            self.record('metrics', 'compute', lambda: metrics.compute(values), n)
+            self.record('metrics', 'risk_summary', lambda: RiskMetrics.summary(returns), n)
+
+    def run_matrix(self) -> None:
+        from backtest import QuantBacktester
+        from optimizer import GridSearchOptimizer, expand_grid
+        import metrics
+        prices = synthetic_prices(MATRIX_BARS)
+        backtester = QuantBacktester()
+        optimizer = GridSearchOptimizer()
+        grid = expand_grid('RSI')
+        for k in self.param_sets:
+            positions = random_positions(MATRIX_BARS, k)
+
+            def backtest_matrix():
+                for start in range(0, k, MATRIX_CHUNK):
+                    backtester.backtest_matrix(prices, positions[:, start:start + MATRIX_CHUNK], keep_series=False)
+
+            self.record('matrix', 'backtest_matrix', backtest_matrix, MATRIX_BARS, k)
+            returns = np.diff(positions, axis=0) * 0.01
+            self.record('matrix', 'metrics_compute', lambda: metrics.compute(returns), MATRIX_BARS, k)
+            subset = grid.head(k)
+            self.record('matrix', 'optimizer_evaluate', lambda: optimizer.evaluate(prices, 'RSI', subset),
+                        MATRIX_BARS, k)
+
+    def run_api(self) -> None:
+        from fastapi.testclient import TestClient
+        import api
+        from data import DataFetcher
+        from optimizer import expand_grid
+        from providers import SyntheticProvider
+
+        provider, store = DataFetcher.provider, DataFetcher.store
+        DataFetcher.store = None
+        try:
+            with TestClient(api.app) as client:
+                def post(path, payload):
+                    response = client.post(path, json=payload)
+                    response.raise_for_status()
+
+                request = {'ticker': 'BENCH', 'strategy_name': 'SMA Crossover'}
+                for n in self.sizes:
+                    DataFetcher.set_provider(SyntheticProvider(seed=0, bars=n))
+                    self.record('api', 'POST /backtest', lambda: post('/backtest', request), n,
+                                setup=api.result_cache.clear)
+
+                DataFetcher.set_provider(SyntheticProvider(seed=0, bars=MATRIX_BARS))
+                grid = expand_grid('SMA Crossover')
+                for k in self.param_sets:
+                    rows = grid.iloc[np.arange(k) % len(grid)]
+                    batch = [dict(request, parameters={key: int(value) for key, value in row.items()},
+                                  initial_cash=100000 + i)
+                             for i, (_, row) in enumerate(rows.iterrows())]
+                    self.record('api', 'POST /backtest/batch', lambda: post('/backtest/batch', batch),
+                                MATRIX_BARS, k, setup=api.result_cache.clear)
+        finally:
+            DataFetcher.provider, DataFetcher.store = provider, store
+
+    def run_startup(self) -> None:
+        for name, code in STARTUP_SNIPPETS.items():
+            command = [sys.executable, '-c', code]
+            bars = MATRIX_BARS if 'POST' in name else 0
+            # A few runs each: a single cold start is noisy
+            self.record('startup', name, lambda: subprocess.run(command, cwd=HERE, check=True, capture_output=True),
+                        bars, min_time=max(self.min_time, 2.0))
+
+    def run(self, suites=SUITES) -> Dict:
+        for suite in suites:
+            getattr(self, f'run_{suite}')()
+        return {'meta': environment(), 'results': self.records}
+
+
+def environment() -> Dict:
+    import kernels
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'compute_engine': os.getenv('COMPUTE_ENGINE', 'pandas'),
+        'numba_available': kernels.NUMBA_AVAILABLE,
+    }
+
+
+def _key(record: Dict) -> tuple:
+    return record['suite'], record['name'], record['bars'], record['params']
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float = 0.2) -> List[Dict]:
+    """
+    Match records on (suite, name, bars, params) and report the median-time ratio against the
+    baseline. A record regresses when it is more than ``tolerance`` (fractional) slower.
+    """
+    previous = {_key(record): record for record in baseline['results']}
+    rows = []
+    for record in current['results']:
+        base = previous.get(_key(record))
+        if base is None:
+            continue
+        ratio = record['median'] / base['median'] if base['median'] > 0 else float('inf')
+        rows.append(dict(suite=record['suite'], name=record['name'], bars=record['bars'], params=record['params'],
+                         baseline=base['median'], current=record['median'], ratio=ratio,
+                         regression=ratio > 1 + tolerance))
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--suites', default=','.join(SUITES), help=f"comma-separated subset of {', '.join(SUITES)}")
+    parser.add_argument('--quick', action='store_true', help='sweep up to 10k bars and 100 parameter sets')
+    parser.add_argument('--max-bars', type=int, help='drop series lengths above this')
+    parser.add_argument('--max-params', type=int, help='drop parameter-set counts above this')
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds to spend repeating each timing')
+    parser.add_argument('--output', default='benchmark.json', help='where to write the results')
+    parser.add_argument('--baseline', help='stored results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown before failing (0.2 = 20%%)')
+    args = parser.parse_args(argv)
+
+    sizes = QUICK_SIZES if args.quick else SIZES
+    param_sets = QUICK_PARAM_SETS if args.quick else PARAM_SETS
+    if args.max_bars:
+        sizes = tuple(n for n in sizes if n <= args.max_bars)
+    if args.max_params:
+        param_sets = tuple(k for k in param_sets if k <= args.max_params)
+    suites = [suite.strip() for suite in args.suites.split(',') if suite.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"Unknown suites: {', '.join(sorted(unknown))}")
+
+    results = Benchmark(sizes, param_sets, args.min_time).run(suites)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {len(results['results'])} timings to {args.output}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows = compare(results, baseline, args.tolerance)
+    for row in rows:
+        flag = '  REGRESSION' if row['regression'] else ''
+        print(f"{row['suite']:<11}{row['name']:<28}{row['bars']:>10,}{row['params']:>8,}"
+              f"{row['baseline'] * 1e3:>12.3f}{row['current'] * 1e3:>12.3f} ms{row['ratio']:>8.2f}x{flag}")
+    regressions = sum(row['regression'] for row in rows)
+    print(f"{len(rows)} compared, {regressions} slower than the baseline by more than {args.tolerance:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Result Cache - content-addressed LRU cache for backtest results
+"""
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, time, timedelta
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+from zoneinfo import ZoneInfo
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+MARKET_TZ = ZoneInfo('Asia/Kolkata')
+MARKET_CLOSE = time(15, 30)
+
+
+def next_market_close(now: Optional[datetime] = None) -> float:
+    """Epoch seconds of the next NSE close (15:30 IST on a weekday) after ``now``."""
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    close = datetime.combine(now.date(), MARKET_CLOSE, tzinfo=MARKET_TZ)
+    if now >= close:
+        close += timedelta(days=1)
+    while close.weekday() >= 5:
+        close += timedelta(days=1)
+    return close.timestamp()
+
+
+def series_version(prices: 'pd.Series') -> str:
+    """Cheap fingerprint of a price snapshot: length, date span and the last close."""
+    if prices.empty:
+        return 'empty'
+    return f"{len(prices)}:{prices.index[0]}:{prices.index[-1]}:{float(prices.iloc[-1])!r}"
+
+
+def make_key(payload: Dict, data_version: str) -> str:
+    body = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(f"{body}|{data_version}".encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Thread-safe LRU keyed by ``make_key(request, data_version)``. Entries expire at the time
+    returned by ``expiry`` (the next market close by default), when a new bar may change them.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, expiry: Callable[[], float] = next_market_close,
+                 clock: Callable[[], float] = None):
+        self.max_entries = max_entries or int(os.getenv('RESULT_CACHE_SIZE', 1024))
+        self.expiry = expiry
+        self.clock = clock or (lambda: datetime.now().timestamp())
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] <= self.clock():
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: str, value: Any) -> None:
+        with self.lock:
+            self.entries[key] = (value, self.expiry())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self) -> Dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,105 @@
+"""
+Columnar Results - full backtest series as Arrow IPC streams or compressed NumPy archives
+"""
+import importlib.util
+import io
+import json
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+FORMATS = ('json', 'arrow', 'npz')
+MEDIA_TYPES = {
+    'arrow': 'application/vnd.apache.arrow.stream',
+    'npz': 'application/x-npz',
+}
+SERIES_COLUMNS = ('price', 'equity_curve', 'returns', 'positions', 'drawdown')
+
+
+def arrow_available() -> bool:
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def check_format(fmt: str) -> None:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt}. Available: {', '.join(FORMATS)}")
+    if fmt == 'arrow' and not arrow_available():
+        raise ValueError("pyarrow is not installed; use format=npz")
+
+
+def series_arrays(results: Dict) -> Dict[str, np.ndarray]:
+    """Per-bar result columns of ``backtest_strategy`` output, everything but the price."""
+    import metrics
+    equity = results['equity_curve'].to_numpy(dtype=np.float64)
+    return {
+        'equity_curve': equity,
+        'returns': results['returns'].to_numpy(dtype=np.float64),
+        'positions': results['positions'].to_numpy(dtype=np.float64),
+        'drawdown': metrics.drawdown(equity),
+    }
+
+
+def series_frame(prices: pd.Series, arrays: Dict[str, np.ndarray]) -> pd.DataFrame:
+    return pd.DataFrame({'price': prices.to_numpy(dtype=np.float64), **arrays},
+                        index=prices.index, columns=list(SERIES_COLUMNS))
+
+
+def _timestamps(index: pd.Index) -> np.ndarray:
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index.to_numpy(dtype='datetime64[ns]')
+
+
+def encode(frames: List[pd.DataFrame], meta: Dict, fmt: str) -> bytes:
+    """
+    One long table of every frame: ``item`` (position in ``frames``), ``timestamp`` (UTC,
+    ns) and the ``SERIES_COLUMNS``. ``meta`` travels as JSON: in the Arrow schema metadata
+    under ``meta``, or as the ``meta`` entry of the archive. Arrow writes one record batch
+    per item; the archive carries ``offsets`` so item i is rows ``offsets[i]:offsets[i + 1]``.
+    """
+    check_format(fmt)
+    if fmt not in MEDIA_TYPES:
+        raise ValueError(f"{fmt} is not a binary format")
+    meta_json = json.dumps(meta, default=str)
+    lengths = np.array([len(frame) for frame in frames], dtype=np.int64)
+    if fmt == 'npz':
+        columns = {
+            'item': np.repeat(np.arange(len(frames), dtype=np.int32), lengths),
+            'timestamp': np.concatenate([_timestamps(f.index) for f in frames] or [np.empty(0, 'datetime64[ns]')]),
+        }
+        for name in SERIES_COLUMNS:
+            columns[name] = np.concatenate([f[name].to_numpy(dtype=np.float64) for f in frames] or [np.empty(0)])
+        out = io.BytesIO()
+        np.savez_compressed(out, offsets=np.concatenate([[0], np.cumsum(lengths)]), meta=np.array(meta_json),
+                            **columns)
+        return out.getvalue()
+
+    import pyarrow as pa
+    schema = pa.schema([('item', pa.int32()), ('timestamp', pa.timestamp('ns'))]
+                       + [(name, pa.float64()) for name in SERIES_COLUMNS],
+                       metadata={'meta': meta_json})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for item, frame in enumerate(frames):
+            arrays = [pa.array(np.full(len(frame), item, dtype=np.int32)), pa.array(_timestamps(frame.index))]
+            arrays += [pa.array(frame[name].to_numpy(dtype=np.float64)) for name in SERIES_COLUMNS]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+    return sink.getvalue().to_pybytes()
+
+
+def decode(data: bytes, fmt: str) -> Tuple[pd.DataFrame, Optional[Dict]]:
+    """Inverse of ``encode``: the long table and its metadata."""
+    check_format(fmt)
+    if fmt not in MEDIA_TYPES:
+        raise ValueError(f"{fmt} is not a binary format")
+    if fmt == 'npz':
+        with np.load(io.BytesIO(data)) as archive:
+            meta = json.loads(str(archive['meta']))
+            frame = pd.DataFrame({name: archive[name] for name in ('item', 'timestamp') + SERIES_COLUMNS})
+        return frame, meta
+    import pyarrow as pa
+    table = pa.ipc.open_stream(data).read_all()
+    metadata = table.schema.metadata or {}
+    meta = json.loads(metadata[b'meta']) if b'meta' in metadata else None
+    return table.to_pandas(), meta
@@ -1,10 +1,13 @@
 import pandas as pd
 import numpy as np
-import yfinance as yf
 from typing import Dict, List, Optional
 import warnings
 warnings.filterwarnings('ignore')
 
+from store import PriceStore, period_start, align_tz
+from providers import DataProvider, get_provider
+import indicators as ind
+
 
 class DataFetcher:
     NSE_TICKERS = {
@@ -21,57 +24,137 @@ class DataFetcher:
         'NIFTY50': '^NSEI',
     }
     
+    provider: DataProvider = get_provider()
+    store: Optional[PriceStore] = PriceStore()
+    
     def __init__(self):
         self.cache = {}
     
+    @staticmethod
+    def set_provider(provider) -> DataProvider:
+        """Swap the price source; accepts a DataProvider or a registered name ('yfinance', 'local', 'synthetic')."""
+        DataFetcher.provider = get_provider(provider) if isinstance(provider, str) else provider
+        return DataFetcher.provider
+    
+    @staticmethod
+    def _download(ticker_key: str, period: Optional[str] = None, interval: str = '1d', start=None) -> pd.DataFrame:
+        return DataFetcher.provider.download(ticker_key, period=period, interval=interval, start=start)
+    
+    @staticmethod
+    def _download_many(ticker_keys: List[str], period: Optional[str] = None, interval: str = '1d',
+                       start=None) -> Dict[str, pd.DataFrame]:
+        if len(ticker_keys) == 1:
+            key = ticker_keys[0]
+            return {key: DataFetcher._download(key, period=period, interval=interval, start=start)}
+        return DataFetcher.provider.download_many(ticker_keys, period=period, interval=interval, start=start)
+    
+    @staticmethod
+    def _fetch_frames(ticker_keys: List[str], period: str, interval: str) -> Dict[str, pd.DataFrame]:
+        """Serve each ticker from the price store where possible; download the rest in bulk."""
+        store = DataFetcher.store
+        if store is None or not DataFetcher.provider.persist:
+            return DataFetcher._download_many(ticker_keys, period=period, interval=interval)
+        
+        start = period_start(period)
+        frames, missing, stale = {}, [], []
+        for key in ticker_keys:
+            frames[key] = store.load(key, interval)
+            if frames[key].empty or not store.covers(key, interval, start):
+                missing.append(key)
+            elif store.is_stale(key, interval):
+                stale.append(key)
+        
+        if missing:
+            downloaded = DataFetcher._download_many(missing, period=period, interval=interval)
+            for key in missing:
+                data = downloaded.get(key, pd.DataFrame())
+                if not data.empty:
+                    frames[key] = store.merge(key, interval, data, start)
+        if stale:
+            # Only the tail is missing: re-download from the last stored bar onwards
+            tail_start = min(frames[key].index[-1] for key in stale)
+            downloaded = DataFetcher._download_many(stale, interval=interval, start=tail_start)
+            for key in stale:
+                frames[key] = store.merge(key, interval, downloaded.get(key, pd.DataFrame()), start)
+        
+        for key, data in frames.items():
+            if not data.empty and start is not None:
+                frames[key] = data[data.index >= align_tz(start, data.index)]
+        return frames
+    
     @staticmethod
     def fetch_historical_data(ticker: str, period: str = '5y', interval: str = '1d') -> pd.DataFrame:
         try:
             ticker_key = DataFetcher.NSE_TICKERS.get(ticker, ticker)
-            data = yf.download(ticker_key, period=period, interval=interval, progress=False)
-            if data.empty:
-                return pd.DataFrame()
-            data = data[['Close']].dropna()
-            data.columns = ['close']
-            return data
+            data = DataFetcher._fetch_frames([ticker_key], period, interval).get(ticker_key, pd.DataFrame())
+            return data if not data.empty else pd.DataFrame()
         except Exception as e:
             print(f"Error fetching data for {ticker}: {e}")
             return pd.DataFrame()
     
     @staticmethod
-    def fetch_intraday_data(ticker: str, days: int = 30) -> pd.DataFrame:
+    def data_version(ticker: str, period: str = '5y', interval: str = '1d') -> Optional[str]:
+        """
+        Version tag of the stored snapshot that ``fetch_historical_data`` would serve without
+        touching the provider, or None when a download is due (or the store is not in use).
+        """
+        store = DataFetcher.store
+        if store is None or not DataFetcher.provider.persist:
+            return None
+        ticker_key = DataFetcher.NSE_TICKERS.get(ticker, ticker)
         try:
-            ticker_key = DataFetcher.NSE_TICKERS.get(ticker, ticker)
-            data = yf.download(ticker_key, period=f'{days}d', interval='1h', progress=False)
-            return data[['Close']].dropna() if not data.empty else pd.DataFrame()
-        except:
+            start = period_start(period)
+        except ValueError:
+            return None
+        if not store.covers(ticker_key, interval, start) or store.is_stale(ticker_key, interval):
+            return None
+        return f"store:{ticker_key}:{interval}:{store.metadata(ticker_key, interval)['updated']}"
+    
+    @staticmethod
+    def fetch_many(tickers: List[str], period: str = '5y', interval: str = '1d', join: str = 'outer') -> pd.DataFrame:
+        """
+        Close prices for several tickers as one date-aligned wide DataFrame (one column per
+        ticker, duplicates removed). Use ``.to_numpy()`` for the raw (T x N) matrix.
+        """
+        names = list(dict.fromkeys(tickers))
+        keys = {name: DataFetcher.NSE_TICKERS.get(name, name) for name in names}
+        try:
+            frames = DataFetcher._fetch_frames(list(dict.fromkeys(keys.values())), period, interval)
+        except Exception as e:
+            print(f"Error fetching data for {', '.join(names)}: {e}")
+            return pd.DataFrame()
+        columns = {name: frames[key]['close'] for name, key in keys.items()
+                   if key in frames and not frames[key].empty}
+        if not columns:
             return pd.DataFrame()
+        return pd.concat(columns, axis=1, join=join).sort_index()
+    
+    @staticmethod
+    def fetch_intraday_data(ticker: str, days: int = 30) -> pd.DataFrame:
+        return DataFetcher.fetch_historical_data(ticker, period=f'{days}d', interval='1h')
     
     @staticmethod
     def calculate_technical_indicators(data: pd.DataFrame) -> pd.DataFrame:
         df = data.copy()
         prices = df['close'] if 'close' in df.columns else df.iloc[:, 0]
         
-        df['sma_20'] = prices.rolling(20).mean()
-        df['sma_50'] = prices.rolling(50).mean()
-        df['ema_12'] = prices.ewm(span=12).mean()
-        df['ema_26'] = prices.ewm(span=26).mean()
+        df['sma_20'] = ind.rolling_mean(prices, 20)
+        df['sma_50'] = ind.rolling_mean(prices, 50)
+        df['ema_12'] = ind.ewm_mean(prices, 12)
+        df['ema_26'] = ind.ewm_mean(prices, 26)
         
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-        rs = gain / loss
-        df['rsi'] = 100 - (100 / (1 + rs))
+        df['rsi'] = ind.rsi(prices, 14)
         
         df['macd'] = df['ema_12'] - df['ema_26']
         df['macd_signal'] = df['macd'].ewm(span=9).mean()
         
-        df['std_20'] = prices.rolling(20).std()
+        df['std_20'] = ind.rolling_std(prices, 20)
         df['bb_upper'] = df['sma_20'] + (df['std_20'] * 2)
         df['bb_lower'] = df['sma_20'] - (df['std_20'] * 2)
         
-        df['momentum_10'] = prices.pct_change(10)
-        df['roc'] = ((prices - prices.shift(12)) / prices.shift(12)) * 100
+        df['momentum_10'] = ind.pct_change(prices, 10)
+        shifted = ind.shift(prices, 12)
+        df['roc'] = ((prices - shifted) / shifted) * 100
         
         return df
     
@@ -0,0 +1,95 @@
+"""
+Chart Downsampling - LTTB and min/max reduction of long series before they are plotted or sent
+"""
+import os
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+METHODS = ('lttb', 'minmax')
+DEFAULT_POINTS = int(os.getenv('CHART_MAX_POINTS', 2000))
+
+
+def lttb_indices(y: np.ndarray, points: int, x: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: keep the first and last point and, from each of
+    ``points - 2`` equal buckets, the point forming the largest triangle with the previously
+    kept point and the mean of the next bucket.
+    """
+    n = len(y)
+    if points >= n or points < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = (np.arange(points - 1) * (n - 2) / (points - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+    kept = np.empty(points, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(points - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[stop:next_stop].mean()
+        avg_y = y[stop:next_stop].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+
+def minmax_indices(y: np.ndarray, points: int) -> np.ndarray:
+    """The lowest and highest point of each of ``points // 2`` equal buckets, in time order."""
+    n = len(y)
+    n_buckets = max(points // 2, 1)
+    if points >= n:
+        return np.arange(n)
+    size = -(-n // n_buckets)
+    padded = np.full(size * n_buckets, np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(n_buckets, size)
+    valid = ~np.isnan(blocks).all(axis=1)
+    offsets = np.arange(n_buckets)[valid] * size
+    lows = offsets + np.nanargmin(blocks[valid], axis=1)
+    highs = offsets + np.nanargmax(blocks[valid], axis=1)
+    return np.unique(np.concatenate([lows, highs]))
+
+
+def downsample_indices(y: np.ndarray, points: int = DEFAULT_POINTS, method: str = 'lttb') -> np.ndarray:
+    """
+    Sorted positions to keep from ``y`` (NaN-free). The first and last points and the global
+    maximum and minimum (equity peak, deepest drawdown) are always kept, so the result may
+    exceed ``points`` by up to four.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method: {method}. Available: {', '.join(METHODS)}")
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= points:
+        return np.arange(n)
+    idx = lttb_indices(y, points) if method == 'lttb' else minmax_indices(y, points)
+    return np.unique(np.concatenate([idx, [0, n - 1, np.argmax(y), np.argmin(y)]]))
+
+
+def downsample_series(series: pd.Series, points: int = DEFAULT_POINTS, method: str = 'lttb') -> pd.Series:
+    """``series`` reduced to about ``points`` values; NaNs are dropped first."""
+    series = series.dropna()
+    return series.iloc[downsample_indices(series.to_numpy(dtype=np.float64), points, method)]
+
+
+def downsample_ohlc(frame: pd.DataFrame, points: int = DEFAULT_POINTS, columns=('Open', 'High', 'Low', 'close')) -> pd.DataFrame:
+    """
+    Merge consecutive candles into about ``points`` buckets (first open, highest high, lowest
+    low, last close), each stamped with its first bar, so every extreme survives.
+    """
+    n = len(frame)
+    if n <= points:
+        return frame
+    open_col, high_col, low_col, close_col = columns
+    starts = np.unique(np.linspace(0, n, points + 1).astype(np.int64)[:-1])
+    ends = np.append(starts[1:], n) - 1
+    return pd.DataFrame({
+        open_col: frame[open_col].to_numpy()[starts],
+        high_col: np.maximum.reduceat(frame[high_col].to_numpy(dtype=np.float64), starts),
+        low_col: np.minimum.reduceat(frame[low_col].to_numpy(dtype=np.float64), starts),
+        close_col: frame[close_col].to_numpy()[ends],
+    }, index=frame.index[starts])
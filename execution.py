@@ -0,0 +1,139 @@
+"""
+Execution Model - fills, per-fill costs, trade limits and an array-backed trade log
+"""
+from typing import Dict
+import numpy as np
+import pandas as pd
+
+# One row per round trip: flat -> position -> flat (trades still open at the end close on the last bar)
+TRADE_DTYPE = np.dtype([
+    ('entry', np.int64), ('exit', np.int64), ('size', np.float64),
+    ('entry_price', np.float64), ('exit_price', np.float64),
+    ('return', np.float64), ('bars', np.int64), ('open', np.bool_),
+])
+
+
+def ffill(values: np.ndarray) -> np.ndarray:
+    """Forward fill NaNs down the first axis of a 1-D or 2-D array; leading NaNs become 0."""
+    values = np.asarray(values, dtype=np.float64)
+    mask = np.isnan(values)
+    if not mask.any():
+        return values
+    rows = np.arange(values.shape[0]).reshape((-1,) + (1,) * (values.ndim - 1))
+    idx = np.where(~mask, rows, 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    filled = np.take_along_axis(values, idx, axis=0)
+    return np.nan_to_num(filled, nan=0.0)
+
+
+def _previous(positions: np.ndarray) -> np.ndarray:
+    prev = np.zeros_like(positions)
+    prev[1:] = positions[:-1]
+    return prev
+
+
+def limit_trades(positions: np.ndarray, max_trades: int) -> np.ndarray:
+    """Stay flat from the entry that would open trade ``max_trades + 1`` onwards."""
+    entries = (_previous(positions) == 0) & (positions != 0)
+    return np.where(np.cumsum(entries, axis=0) > max_trades, 0.0, positions)
+
+
+def positions_from_signals(signals: np.ndarray, max_trades: int) -> np.ndarray:
+    """Carry signals forward over NaNs, start flat and enforce ``max_trades``."""
+    return limit_trades(ffill(signals), max_trades)
+
+
+def compact_positions(positions: np.ndarray) -> np.ndarray:
+    """int8 copy of whole-unit positions in [-128, 127]; anything else becomes float32."""
+    positions = np.asarray(positions)
+    whole = np.all((positions == np.round(positions)) & (positions >= -128) & (positions <= 127))
+    return positions.astype(np.int8 if whole else np.float32)
+
+
+def fill_costs(positions: np.ndarray, trade_cost: float, stt_rate: float) -> np.ndarray:
+    """
+    Cost of each bar's fill as a fraction of equity: the traded size pays ``trade_cost``
+    (brokerage + slippage) and the sold size also pays ``stt_rate``. Bar 0 has no fill.
+    """
+    change = positions - _previous(positions)
+    change[0] = 0.0
+    return np.abs(change) * trade_cost + np.maximum(-change, 0) * stt_rate
+
+
+def _growth(net_returns: np.ndarray) -> np.ndarray:
+    return np.cumprod(1 + np.nan_to_num(net_returns, nan=0.0), axis=0)
+
+
+def _round_trips(positions: np.ndarray):
+    """Entry and exit masks; an open trade is closed on the last bar."""
+    prev = _previous(positions)
+    entries = (prev == 0) & (positions != 0)
+    exits = (prev != 0) & (positions == 0)
+    exits[-1] |= positions[-1] != 0
+    return entries, exits
+
+
+def trade_log(positions: np.ndarray, prices: np.ndarray, net_returns: np.ndarray, slippage: float = 0.0) -> np.ndarray:
+    """
+    Round trips of one position series as a ``TRADE_DTYPE`` array. A trade's return runs from
+    the equity before its entry fill to the equity after its exit fill, so it includes both
+    fills' costs; fill prices include slippage against the trader.
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    if len(positions) == 0:
+        return np.empty(0, dtype=TRADE_DTYPE)
+    prices = np.asarray(prices, dtype=np.float64)
+    entries, exits = _round_trips(positions)
+    entry_idx, exit_idx = np.flatnonzero(entries), np.flatnonzero(exits)
+    growth = _growth(net_returns)
+    base = np.where(entry_idx > 0, growth[np.maximum(entry_idx - 1, 0)], 1.0)
+
+    log = np.empty(len(entry_idx), dtype=TRADE_DTYPE)
+    log['entry'] = entry_idx
+    log['exit'] = exit_idx
+    log['size'] = positions[entry_idx]
+    side = np.sign(log['size'])
+    log['entry_price'] = prices[entry_idx] * (1 + side * slippage)
+    log['exit_price'] = prices[exit_idx] * (1 - side * slippage)
+    log['return'] = growth[exit_idx] / base - 1
+    log['bars'] = exit_idx - entry_idx
+    log['open'] = (exit_idx == len(positions) - 1) & (positions[-1] != 0)
+    return log
+
+
+def trade_stats(trades: np.ndarray) -> Dict:
+    returns = trades['return']
+    n = len(returns)
+    return {
+        'total_trades': n,
+        'win_rate': float((returns > 0).sum() / n) if n else 0.0,
+        'avg_trade_return': float(returns.mean()) if n else 0.0,
+        'best_trade': float(returns.max()) if n else 0.0,
+        'worst_trade': float(returns.min()) if n else 0.0,
+        'avg_trade_bars': float(trades['bars'].mean()) if n else 0.0,
+    }
+
+
+def trade_counts(positions: np.ndarray, net_returns: np.ndarray):
+    """Per-column ``(trades, winning_trades)`` for a (T x K) position matrix."""
+    n_cols = positions.shape[1]
+    if len(positions) == 0:
+        return np.zeros(n_cols, dtype=np.int64), np.zeros(n_cols, dtype=np.int64)
+    entries, exits = _round_trips(positions)
+    growth = _growth(net_returns)
+    base = np.vstack([np.ones((1, n_cols)), growth[:-1]])
+    # Transposed so nonzero() walks each column in time order and entries pair with exits
+    entry_col, entry_t = np.nonzero(entries.T)
+    exit_col, exit_t = np.nonzero(exits.T)
+    returns = growth[exit_t, exit_col] / base[entry_t, entry_col] - 1
+    trades = np.bincount(entry_col, minlength=n_cols)
+    wins = np.bincount(entry_col, weights=returns > 0, minlength=n_cols).astype(np.int64)
+    return trades, wins
+
+
+def to_frame(trades: np.ndarray, index: pd.Index) -> pd.DataFrame:
+    """Readable view of a trade log with entry/exit timestamps."""
+    frame = pd.DataFrame(trades)
+    frame['entry_date'] = index[trades['entry']]
+    frame['exit_date'] = index[trades['exit']]
+    return frame
@@ -0,0 +1,217 @@
+"""
+Indicator Engine - memoized rolling/EWM primitives shared across strategies
+"""
+import os
+import threading
+import weakref
+from typing import Callable, Dict
+import numpy as np
+import pandas as pd
+
+import kernels
+
+
+class IndicatorCache:
+    """
+    Memoizes indicator series keyed by (series identity, indicator, parameters).
+    Entries live exactly as long as the input series: a finalizer drops them when it is
+    garbage collected, so a recycled ``id()`` can never serve stale values. Inputs are
+    assumed not to be mutated in place after an indicator has been computed from them.
+    """
+
+    def __init__(self):
+        self._entries: Dict[int, Dict[tuple, pd.Series]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, series: pd.Series, key: tuple, compute: Callable[[], pd.Series]) -> pd.Series:
+        sid = id(series)
+        with self._lock:
+            entries = self._entries.get(sid)
+            if entries is not None and key in entries:
+                self.hits += 1
+                return entries[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            if sid not in self._entries:
+                self._entries[sid] = {}
+                weakref.finalize(series, self._entries.pop, sid, None)
+            self._entries[sid][key] = value
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'series': len(self._entries),
+                'entries': sum(len(e) for e in self._entries.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+cache = IndicatorCache()
+
+# 'numba' routes the rolling window primitives through the compiled kernels
+backend = os.getenv('COMPUTE_ENGINE', 'pandas')
+
+
+def set_backend(name: str) -> None:
+    global backend
+    backend = name
+
+
+def _rolling(prices: pd.Series, name: str, window: int) -> pd.Series:
+    if backend == 'numba' and kernels.NUMBA_AVAILABLE:
+        kernel = getattr(kernels, f'rolling_{name}')
+        return cache.get(prices, (name, window, 'numba'),
+                         lambda: pd.Series(kernel(prices.to_numpy(), window), index=prices.index, name=prices.name))
+    return cache.get(prices, (name, window), lambda: getattr(prices.rolling(window=window), name)())
+
+
+def rolling_mean(prices: pd.Series, window: int) -> pd.Series:
+    return _rolling(prices, 'mean', window)
+
+
+def rolling_std(prices: pd.Series, window: int) -> pd.Series:
+    return _rolling(prices, 'std', window)
+
+
+def rolling_min(prices: pd.Series, window: int) -> pd.Series:
+    return _rolling(prices, 'min', window)
+
+
+def rolling_max(prices: pd.Series, window: int) -> pd.Series:
+    return _rolling(prices, 'max', window)
+
+
+def ewm_mean(prices: pd.Series, span: int) -> pd.Series:
+    return cache.get(prices, ('ewm', span), lambda: prices.ewm(span=span).mean())
+
+
+def pct_change(prices: pd.Series, period: int = 1) -> pd.Series:
+    return cache.get(prices, ('pct_change', period), lambda: prices.pct_change(period))
+
+
+def shift(prices: pd.Series, period: int = 1) -> pd.Series:
+    return cache.get(prices, ('shift', period), lambda: prices.shift(period))
+
+
+def diff(prices: pd.Series) -> pd.Series:
+    return cache.get(prices, ('diff',), lambda: prices.diff())
+
+
+def rsi(prices: pd.Series, period: int = 14) -> pd.Series:
+    def compute():
+        delta = diff(prices)
+        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+        rs = gain / loss
+        return 100 - (100 / (1 + rs))
+    return cache.get(prices, ('rsi', period), compute)
+
+
+class IndicatorBank:
+    """
+    Holds NumPy views of the shared indicator cache for one price series and hands out
+    (T x K) gathers, so each window is computed once per series across all combinations.
+    """
+
+    def __init__(self, prices: pd.Series):
+        self.prices = prices
+        self.values = prices.to_numpy(dtype=np.float64)
+        self._cache: Dict[tuple, np.ndarray] = {}
+
+    def _get(self, key: tuple, compute: Callable[[], pd.Series]) -> np.ndarray:
+        if key not in self._cache:
+            self._cache[key] = compute().to_numpy(dtype=np.float64)
+        return self._cache[key]
+
+    def sma(self, window: int) -> np.ndarray:
+        return self._get(('sma', window), lambda: rolling_mean(self.prices, window))
+
+    def std(self, window: int) -> np.ndarray:
+        return self._get(('std', window), lambda: rolling_std(self.prices, window))
+
+    def ema(self, span: int) -> np.ndarray:
+        return self._get(('ema', span), lambda: ewm_mean(self.prices, span))
+
+    def rolling_min(self, window: int) -> np.ndarray:
+        return self._get(('min', window), lambda: rolling_min(self.prices, window))
+
+    def rolling_max(self, window: int) -> np.ndarray:
+        return self._get(('max', window), lambda: rolling_max(self.prices, window))
+
+    def pct_change(self, period: int) -> np.ndarray:
+        return self._get(('pct', period), lambda: pct_change(self.prices, period))
+
+    def roc(self, period: int) -> np.ndarray:
+        def compute():
+            shifted = shift(self.prices, period)
+            return ((self.prices - shifted) / shifted) * 100
+        return self._get(('roc', period), compute)
+
+    def rsi(self, period: int) -> np.ndarray:
+        return self._get(('rsi', period), lambda: rsi(self.prices, period))
+
+    def macd_hist(self, fast: int, slow: int, signal: int) -> np.ndarray:
+        def compute():
+            macd = pd.Series(self.ema(fast) - self.ema(slow), index=self.prices.index)
+            return macd - macd.ewm(span=signal).mean()
+        return self._get(('macd', fast, slow, signal), compute)
+
+    def stochastic(self, period: int, smooth: int) -> np.ndarray:
+        def compute():
+            low, high = self.rolling_min(period), self.rolling_max(period)
+            k = pd.Series(100 * (self.values - low) / (high - low), index=self.prices.index)
+            return k.rolling(window=smooth).mean()
+        return self._get(('stoch', period, smooth), compute)
+
+    def atr(self, period: int) -> np.ndarray:
+        def compute():
+            high, low, close = self.prices, self.prices * 0.98, self.prices
+            tr = np.maximum(high - low, np.maximum(abs(high - close.shift(1)), abs(low - close.shift(1))))
+            return pd.Series(tr).rolling(window=period).mean()
+        return self._get(('atr', period), compute)
+
+    def volatility(self, window: int) -> np.ndarray:
+        return self._get(('vol', window), lambda: rolling_std(pct_change(self.prices), window))
+
+    def stack(self, name: str, *keys: np.ndarray, rows: slice = slice(None)) -> np.ndarray:
+        """
+        (T x K) matrix whose k-th column is ``getattr(self, name)(keys[0][k], keys[1][k], ...)``,
+        computed once per distinct key combination.
+        """
+        combos = np.column_stack([np.asarray(k) for k in keys])
+        unique, inverse = np.unique(combos, axis=0, return_inverse=True)
+        columns = np.column_stack([getattr(self, name)(*map(int, combo))[rows] for combo in unique])
+        return columns[:, inverse.ravel()]
+    
+    def rows(self, start: int, stop: int) -> 'IndicatorBankView':
+        return IndicatorBankView(self, start, stop)
+
+
+class IndicatorBankView:
+    """
+    Rows [start, stop) of an IndicatorBank. Every indicator is causal, so slicing the
+    full-series columns gives a window warmed-up values and lets overlapping windows share
+    one cache.
+    """
+    
+    def __init__(self, bank: IndicatorBank, start: int, stop: int):
+        self.bank = bank
+        self.window = slice(start, stop)
+        self.prices = bank.prices.iloc[self.window]
+        self.values = bank.values[self.window]
+    
+    def __getattr__(self, name: str):
+        method = getattr(self.bank, name)
+        return lambda *args: method(*args)[self.window]
+    
+    def stack(self, name: str, *keys: np.ndarray) -> np.ndarray:
+        return self.bank.stack(name, *keys, rows=self.window)
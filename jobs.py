@@ -0,0 +1,237 @@
+"""
+Job Queue - background execution of backtest batches with progress polling
+"""
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from batch import BatchRunner, load_prices
+
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+CANCELLED = 'cancelled'
+FAILED = 'failed'
+FINISHED = (COMPLETED, CANCELLED, FAILED)
+
+
+class Job:
+    def __init__(self, items: List[Dict], job_id: Optional[str] = None, status: str = QUEUED,
+                 created: Optional[float] = None):
+        self.id = job_id or uuid.uuid4().hex
+        self.items = items
+        self.status = status
+        self.created = created or time.time()
+        self.updated = self.created
+        self.saved: Optional[float] = None
+        self.results: Dict[int, Dict] = {}
+        self.errors: Dict[int, str] = {}
+        self.error: Optional[str] = None
+        self.cancel_event = threading.Event()
+        self.lock = threading.Lock()
+
+    @property
+    def completed(self) -> int:
+        return len(self.results) + len(self.errors)
+
+    def _describe(self, index: int) -> Dict:
+        item = self.items[index]
+        return {'index': index, 'ticker': item.get('ticker'), 'strategy_name': item.get('strategy_name')}
+
+    def snapshot(self, include_results: bool = True) -> Dict:
+        with self.lock:
+            total = len(self.items)
+            data = {
+                'job_id': self.id,
+                'status': self.status,
+                'total': total,
+                'completed': self.completed,
+                'progress': self.completed / total if total else 1.0,
+                'created': self.created,
+                'updated': self.updated,
+                'error': self.error,
+            }
+            if include_results:
+                data['results'] = [dict(self._describe(i), **self.results[i]) for i in sorted(self.results)]
+                data['errors'] = [dict(self._describe(i), error=self.errors[i]) for i in sorted(self.errors)]
+            return data
+
+
+class JobStore:
+    """SQLite persistence so finished results (and unfinished work) survive a restart."""
+
+    COLUMNS = 'id, status, created, updated, items, results, errors, error'
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                'id TEXT PRIMARY KEY, status TEXT, created REAL, updated REAL, '
+                'items TEXT, results TEXT, errors TEXT, error TEXT)'
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def save(self, job: Job) -> None:
+        with job.lock:
+            row = (job.id, job.status, job.created, job.updated, json.dumps(job.items),
+                   json.dumps(job.results), json.dumps(job.errors), job.error)
+            job.saved = job.updated
+        with self.lock, self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?)', row)
+
+    def load_all(self) -> List[Job]:
+        with self.lock, self._connect() as conn:
+            rows = conn.execute(f'SELECT {self.COLUMNS} FROM jobs').fetchall()
+        return [self._job(row) for row in rows]
+
+    def load(self, job_id: str) -> Optional[Job]:
+        with self.lock, self._connect() as conn:
+            row = conn.execute(f'SELECT {self.COLUMNS} FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._job(row) if row else None
+
+    @staticmethod
+    def _job(row) -> Job:
+        job_id, status, created, updated, items, results, errors, error = row
+        job = Job(json.loads(items), job_id=job_id, status=status, created=created)
+        job.updated = job.saved = updated
+        job.results = {int(k): v for k, v in json.loads(results).items()}
+        job.errors = {int(k): v for k, v in json.loads(errors).items()}
+        job.error = error
+        return job
+
+
+class JobManager:
+    """
+    Runs submitted batches on a small thread pool (``JOBS_MAX_CONCURRENT``); each job fans
+    its items out through ``BatchRunner``. With a ``db_path`` (``JOBS_DB_PATH``) jobs are
+    persisted, and jobs that were queued or running at shutdown are resumed on start-up,
+    skipping items that already finished.
+
+    Finished jobs leave memory ``ttl`` seconds after their last update (``JOBS_TTL_SECONDS``)
+    or once more than ``max_finished`` are held (``JOBS_MAX_FINISHED``, oldest first); with a
+    store, ``get`` still reads them back from SQLite.
+    """
+
+    def __init__(self, max_concurrent: Optional[int] = None, db_path: Optional[str] = None,
+                 runner: Optional[BatchRunner] = None, save_interval: float = 1.0,
+                 ttl: Optional[float] = None, max_finished: Optional[int] = None):
+        max_concurrent = max_concurrent or int(os.getenv('JOBS_MAX_CONCURRENT', 2))
+        self.ttl = float(os.getenv('JOBS_TTL_SECONDS', 3600)) if ttl is None else ttl
+        self.max_finished = int(os.getenv('JOBS_MAX_FINISHED', 1000)) if max_finished is None else max_finished
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix='job')
+        self.runner = runner or BatchRunner()
+        self.store = JobStore(db_path) if db_path else None
+        self.save_interval = save_interval
+        self.jobs: Dict[str, Job] = {}
+        self.lock = threading.Lock()
+        self._closing = False
+        if self.store is not None:
+            for job in self.store.load_all():
+                self.jobs[job.id] = job
+                if job.status in (QUEUED, RUNNING):
+                    job.status = QUEUED
+                    self.executor.submit(self._run, job)
+            self._evict()
+
+    def submit(self, items: List[Dict]) -> Job:
+        job = Job(items)
+        with self.lock:
+            self.jobs[job.id] = job
+        self._evict()
+        self._save(job)
+        self.executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._evict()
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is None and self.store is not None:
+            job = self.store.load(job_id)
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self.get(job_id)
+        if job is None:
+            return None
+        with job.lock:
+            if job.status not in FINISHED:
+                job.cancel_event.set()
+                job.status = CANCELLED
+                job.updated = time.time()
+        self._save(job)
+        return job
+
+    def shutdown(self) -> None:
+        """Stop running jobs and leave them queued so a persistent manager resumes them."""
+        self._closing = True
+        with self.lock:
+            jobs = list(self.jobs.values())
+        for job in jobs:
+            job.cancel_event.set()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def _evict(self) -> None:
+        """Drop finished jobs past ``ttl`` and the oldest beyond ``max_finished``, once their final state is stored."""
+        cutoff = time.time() - self.ttl
+        with self.lock:
+            finished = sorted((job for job in self.jobs.values() if job.status in FINISHED
+                               and (self.store is None or job.saved == job.updated)),
+                              key=lambda job: job.updated)
+            excess = len(finished) - self.max_finished
+            for position, job in enumerate(finished):
+                if position < excess or job.updated < cutoff:
+                    del self.jobs[job.id]
+
+    def _save(self, job: Job) -> None:
+        if self.store is not None:
+            self.store.save(job)
+
+    def _set_status(self, job: Job, status: str, error: Optional[str] = None) -> None:
+        with job.lock:
+            if job.status == CANCELLED:
+                return
+            job.status = status
+            job.error = error
+            job.updated = time.time()
+        self._save(job)
+
+    def _run(self, job: Job) -> None:
+        if job.cancel_event.is_set():
+            return
+        self._set_status(job, RUNNING)
+        try:
+            done = set(job.results) | set(job.errors)
+            pending = [i for i in range(len(job.items)) if i not in done]
+            items = [job.items[i] for i in pending]
+            last_save = time.time()
+            for position, outcome in self.runner.iter_results(items, load_prices(items), job.cancel_event):
+                index = pending[position]
+                with job.lock:
+                    if outcome['ok']:
+                        job.results[index] = outcome['result']
+                    else:
+                        job.errors[index] = outcome['error']
+                    job.updated = time.time()
+                if time.time() - last_save >= self.save_interval:
+                    self._save(job)
+                    last_save = time.time()
+        except Exception as e:
+            self._set_status(job, FAILED, f"{type(e).__name__}: {e}")
+            return
+        if self._closing and job.status != CANCELLED:
+            self._set_status(job, QUEUED)
+        elif job.completed == len(job.items):
+            self._set_status(job, COMPLETED)
+        else:
+            self._save(job)
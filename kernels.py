@@ -0,0 +1,426 @@
+"""
+Compute Kernels - optional numba-compiled loops for the backtest and rolling primitives
+
+Every kernel has a pure-NumPy (or pandas) fallback, so numba stays an optional speed-up:
+``NUMBA_AVAILABLE`` reports whether the compiled versions are in use.
+"""
+import importlib.util
+import multiprocessing
+import os
+import threading
+from typing import Sequence
+import numpy as np
+
+# numba is imported and each kernel compiled on its first call rather than at import time,
+# which keeps it (~0.3s) off the cold-start path of every process that never uses it
+NUMBA_AVAILABLE = importlib.util.find_spec('numba') is not None
+numba = None
+_compile_lock = threading.Lock()
+
+
+def _prange(n):
+    return range(n)
+
+
+def _load_numba():
+    global numba, _prange
+    if numba is None:
+        import numba as module
+        # TBB (numba's default) hangs interpreter exit when a parallel kernel first runs off
+        # the main thread, as it does in the API's executor threads; prefer OpenMP, which
+        # is thread-safe. NUMBA_THREADING_LAYER still overrides this.
+        if 'NUMBA_THREADING_LAYER' not in os.environ:
+            module.config.THREADING_LAYER_PRIORITY = ['omp', 'tbb', 'workqueue']
+        _prange = module.prange
+        numba = module
+    return numba
+
+
+def pool_context(preload: Sequence[str] = ()):
+    """
+    Start method for process pools. A child forked after a parallel kernel has run under
+    GNU OpenMP is killed when it runs one itself, so once numba is loaded, pools start
+    their workers from a fork server (with ``preload`` imported there) instead.
+    """
+    if numba is None or multiprocessing.get_context().get_start_method() != 'fork':
+        return None
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload(list(preload))
+    return context
+
+
+class _LazyKernel:
+    """A numba kernel that is compiled (or loaded from numba's cache) on first call."""
+
+    def __init__(self, func, parallel: bool):
+        self.func = func
+        self.parallel = parallel
+        self.compiled = None
+
+    def __call__(self, *args):
+        if self.compiled is None:
+            with _compile_lock:
+                if self.compiled is None:
+                    self.compiled = _load_numba().njit(cache=True, nogil=True, parallel=self.parallel)(self.func)
+        return self.compiled(*args)
+
+
+def _jit(parallel: bool = False):
+    def decorate(func):
+        if not NUMBA_AVAILABLE:
+            return None
+        return _LazyKernel(func, parallel)
+    return decorate
+
+
+@_jit()
+def _backtest_loop_jit(prices, signals, trade_cost, stt_rate, initial_cash):
+    n = prices.shape[0]
+    positions = np.empty(n)
+    net = np.empty(n)
+    equity = np.empty(n)
+    drawdown = np.empty(n)
+    carry = 0.0
+    growth = 1.0
+    peak = -np.inf
+    for t in range(n):
+        if not np.isnan(signals[t]):
+            carry = signals[t]
+        positions[t] = carry
+        if t == 0:
+            net[t] = 0.0
+        else:
+            ret = prices[t] / prices[t - 1] - 1
+            if np.isnan(ret) or np.isinf(ret):
+                ret = 0.0
+            change = carry - positions[t - 1]
+            cost = abs(change) * trade_cost + max(-change, 0.0) * stt_rate
+            net[t] = positions[t - 1] * ret - cost
+        growth *= 1 + net[t]
+        equity[t] = growth * initial_cash
+        if equity[t] > peak:
+            peak = equity[t]
+        drawdown[t] = (equity[t] - peak) / peak
+    return positions, net, equity, drawdown
+
+
+def _backtest_loop_numpy(prices, signals, trade_cost, stt_rate, initial_cash):
+    positions = signals.copy()
+    mask = np.isnan(positions)
+    if mask.any():
+        idx = np.where(~mask, np.arange(len(positions)), 0)
+        np.maximum.accumulate(idx, out=idx)
+        positions = np.nan_to_num(positions[idx], nan=0.0)
+    returns = np.zeros_like(prices)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[1:] = prices[1:] / prices[:-1] - 1
+    returns = np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+    change = np.zeros_like(positions)
+    change[1:] = np.diff(positions)
+    net = np.zeros_like(positions)
+    net[1:] = positions[:-1] * returns[1:]
+    net[1:] -= np.abs(change[1:]) * trade_cost + np.maximum(-change[1:], 0) * stt_rate
+    equity = np.cumprod(1 + net) * initial_cash
+    peak = np.maximum.accumulate(equity)
+    return positions, net, equity, (equity - peak) / peak
+
+
+def backtest_loop(prices: np.ndarray, signals: np.ndarray, trade_cost: float, stt_rate: float, initial_cash: float):
+    """
+    Position carry (forward fill), cost accrual, equity compounding and drawdown tracking
+    for one series. Each fill pays ``trade_cost`` on the traded size and ``stt_rate`` on the
+    sold size. Returns ``(positions, net_returns, equity, drawdown)``; the first bar has no
+    prior position and gets a zero return.
+    """
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    signals = np.ascontiguousarray(signals, dtype=np.float64)
+    kernel = _backtest_loop_jit if NUMBA_AVAILABLE else _backtest_loop_numpy
+    return kernel(prices, signals, float(trade_cost), float(stt_rate), float(initial_cash))
+
+
+@_jit(parallel=True)
+def _matrix_stats_jit(prices, positions, trade_cost, stt_rate, initial_cash):
+    n, k = positions.shape
+    stride = 0 if prices.shape[1] == 1 else 1
+    total_return = np.empty(k)
+    mean = np.empty(k)
+    std = np.empty(k)
+    downside_std = np.empty(k)
+    max_dd = np.empty(k)
+    max_dd_idx = np.empty(k, dtype=np.int64)
+    var_95 = np.empty(k)
+    cvar_95 = np.empty(k)
+    gain_sum = np.empty(k)
+    loss_sum = np.empty(k)
+    wins = np.empty(k, dtype=np.int64)
+    trades = np.empty(k, dtype=np.int64)
+    for j in _prange(k):
+        col = j * stride
+        body = np.empty(max(n - 1, 1))
+        growth = 1.0
+        peak = initial_cash
+        worst = 0.0
+        worst_idx = min(1, n - 1)
+        total = 0.0
+        neg_n = 0
+        neg_sum = 0.0
+        neg_sq = 0.0
+        pos_sum = 0.0
+        win = 0
+        trade = 0
+        prev = 0.0 if np.isnan(positions[0, j]) else positions[0, j]
+        # Round trips: equity before the entry fill vs. after the exit fill
+        entry_growth = 1.0
+        in_trade = prev != 0
+        for t in range(1, n):
+            pos = positions[t, j]
+            if np.isnan(pos):
+                pos = prev
+            ret = prices[t, col] / prices[t - 1, col] - 1
+            if np.isnan(ret) or np.isinf(ret):
+                ret = 0.0
+            change = pos - prev
+            r = prev * ret - (abs(change) * trade_cost + max(-change, 0.0) * stt_rate)
+            body[t - 1] = r
+            total += r
+            if r < 0:
+                neg_n += 1
+                neg_sum += r
+                neg_sq += r * r
+            if r > 0:
+                pos_sum += r
+            if not in_trade and pos != 0:
+                entry_growth = growth
+            growth *= 1 + r
+            if in_trade and pos == 0:
+                trade += 1
+                if growth / entry_growth > 1:
+                    win += 1
+            in_trade = pos != 0
+            equity = growth * initial_cash
+            if equity > peak:
+                peak = equity
+            dd = equity / peak - 1
+            if dd < worst:
+                worst = dd
+                worst_idx = t
+            prev = pos
+        if in_trade:
+            trade += 1
+            if growth / entry_growth > 1:
+                win += 1
+        m = n - 1
+        mu = total / m if m > 0 else 0.0
+        ss = 0.0
+        for t in range(m):
+            ss += (body[t] - mu) ** 2
+        total_return[j] = growth - 1
+        mean[j] = mu
+        std[j] = np.sqrt(ss / (m - 1)) if m > 1 else 0.0
+        if neg_n > 1:
+            dv = (neg_sq - neg_sum * neg_sum / neg_n) / (neg_n - 1)
+            downside_std[j] = np.sqrt(dv) if dv > 0 else 0.0
+        else:
+            downside_std[j] = 0.0
+        max_dd[j] = worst
+        max_dd_idx[j] = worst_idx
+        var_95[j] = np.percentile(body[:m], 5.0) if m > 0 else 0.0
+        tail_n = 0
+        tail_sum = 0.0
+        for t in range(m):
+            if body[t] <= var_95[j]:
+                tail_n += 1
+                tail_sum += body[t]
+        cvar_95[j] = tail_sum / tail_n if tail_n > 0 else 0.0
+        gain_sum[j] = pos_sum
+        loss_sum[j] = neg_sum
+        wins[j] = win
+        trades[j] = trade
+    return (total_return, mean, std, downside_std, max_dd, max_dd_idx, var_95, cvar_95,
+            gain_sum, loss_sum, wins, trades)
+
+
+def matrix_stats(prices: np.ndarray, positions: np.ndarray, trade_cost: float, stt_rate: float, initial_cash: float):
+    """
+    Per-column backtest statistics for a (T x K) position matrix without materialising any
+    (T x K) intermediate. ``wins`` and ``trades`` count round trips, open ones closing on
+    the last bar. Columns are spread across cores. Returns None when numba is not
+    installed, in which case callers use the vectorised NumPy path.
+    """
+    if not NUMBA_AVAILABLE:
+        return None
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    if prices.ndim == 1:
+        prices = prices[:, None]
+    positions = np.ascontiguousarray(positions, dtype=np.float64)
+    return _matrix_stats_jit(prices, positions, float(trade_cost), float(stt_rate), float(initial_cash))
+
+
+# The rolling mean/std kernels follow pandas' fixed-window algorithms (Kahan-compensated
+# sums, Welford updates, remove-then-add ordering, constant-window special case) so the
+# two backends agree to within a few ulps.
+@_jit()
+def _rolling_mean_jit(values, window):
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    nobs = 0
+    neg_ct = 0
+    total = 0.0
+    comp_add = 0.0
+    comp_remove = 0.0
+    same = 0
+    prev_value = np.nan
+    for t in range(n):
+        if t >= window:
+            old = values[t - window]
+            if not np.isnan(old):
+                nobs -= 1
+                y = -old - comp_remove
+                s = total + y
+                comp_remove = s - total - y
+                total = s
+                if old < 0:
+                    neg_ct -= 1
+        x = values[t]
+        if not np.isnan(x):
+            nobs += 1
+            y = x - comp_add
+            s = total + y
+            comp_add = s - total - y
+            total = s
+            if x < 0:
+                neg_ct += 1
+            if x == prev_value:
+                same += 1
+            else:
+                same = 1
+            prev_value = x
+        if nobs >= window and nobs > 0:
+            result = total / nobs
+            if same >= nobs:
+                result = prev_value
+            elif neg_ct == 0 and result < 0:
+                result = 0.0
+            elif neg_ct == nobs and result > 0:
+                result = 0.0
+            out[t] = result
+    return out
+
+
+@_jit()
+def _rolling_std_jit(values, window):
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    nobs = 0
+    mean = 0.0
+    ssqdm = 0.0
+    comp_add = 0.0
+    comp_remove = 0.0
+    same = 0
+    prev_value = np.nan
+    for t in range(n):
+        if t >= window:
+            old = values[t - window]
+            if not np.isnan(old):
+                nobs -= 1
+                if nobs:
+                    prev_mean = mean - comp_remove
+                    y = old - comp_remove
+                    d = y - mean
+                    comp_remove = d + mean - y
+                    mean -= d / nobs
+                    ssqdm -= (old - prev_mean) * (old - mean)
+                else:
+                    mean = 0.0
+                    ssqdm = 0.0
+        x = values[t]
+        if not np.isnan(x):
+            if x == prev_value:
+                same += 1
+            else:
+                same = 1
+            prev_value = x
+            nobs += 1
+            prev_mean = mean - comp_add
+            y = x - comp_add
+            d = y - mean
+            comp_add = d + mean - y
+            mean += d / nobs
+            ssqdm += (x - prev_mean) * (x - mean)
+        if nobs >= window and nobs > 1:
+            if same >= nobs:
+                out[t] = 0.0
+            else:
+                var = ssqdm / (nobs - 1)
+                out[t] = np.sqrt(var) if var > 0 else 0.0
+    return out
+
+
+@_jit()
+def _rolling_extreme_jit(values, window, sign):
+    # Monotonic deque of indices; ``sign`` = 1 tracks the max, -1 the min
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    dq = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
+    last_nan = -1
+    for t in range(n):
+        x = values[t]
+        if np.isnan(x):
+            last_nan = t
+        else:
+            while tail > head and sign * values[dq[tail - 1]] <= sign * x:
+                tail -= 1
+            dq[tail] = t
+            tail += 1
+        while tail > head and dq[head] <= t - window:
+            head += 1
+        if t >= window - 1 and last_nan <= t - window and tail > head:
+            out[t] = values[dq[head]]
+    return out
+
+
+def _rolling_pandas(values: np.ndarray, window: int, name: str) -> np.ndarray:
+    import pandas as pd
+    return getattr(pd.Series(values).rolling(window=window), name)().to_numpy()
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    if not NUMBA_AVAILABLE:
+        return _rolling_pandas(values, int(window), 'mean')
+    return _rolling_mean_jit(values, int(window))
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    if not NUMBA_AVAILABLE:
+        return _rolling_pandas(values, int(window), 'std')
+    return _rolling_std_jit(values, int(window))
+
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    if not NUMBA_AVAILABLE:
+        return _rolling_pandas(values, int(window), 'max')
+    return _rolling_extreme_jit(values, int(window), 1.0)
+
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    if not NUMBA_AVAILABLE:
+        return _rolling_pandas(values, int(window), 'min')
+    return _rolling_extreme_jit(values, int(window), -1.0)
+
+
+def warm_up() -> bool:
+    """Compile every kernel on a tiny input so the first real call does not pay for it."""
+    if not NUMBA_AVAILABLE:
+        return False
+    values = np.linspace(100.0, 101.0, 8)
+    backtest_loop(values, np.ones(8), 0.001, 0.001, 1.0)
+    matrix_stats(values, np.ones((8, 2)), 0.001, 0.001, 1.0)
+    for rolling in (rolling_mean, rolling_std, rolling_max, rolling_min):
+        rolling(values, 3)
+    return True
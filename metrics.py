@@ -0,0 +1,115 @@
+"""
+Metrics Engine - every performance statistic from one vectorized pass over the returns
+"""
+from typing import Dict, Optional
+import numpy as np
+
+PERIODS_PER_YEAR = 252
+
+
+def drawdown(equity: np.ndarray, initial: Optional[float] = None) -> np.ndarray:
+    """
+    Fractional drawdown from the running peak; NaN bars stay NaN and do not reset the peak.
+    ``initial`` is the capital before the first bar, so a loss on that bar counts too.
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    peak = np.fmax.accumulate(equity, axis=0)
+    if initial is not None:
+        peak = np.fmax(peak, initial)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return equity / peak - 1
+
+
+def _ratio(num, den) -> np.ndarray:
+    """``num / den`` with 0 wherever the denominator is zero or undefined."""
+    num, den = np.broadcast_arrays(np.asarray(num, dtype=np.float64), np.asarray(den, dtype=np.float64))
+    ok = np.isfinite(den) & (den != 0)
+    return np.divide(num, den, out=np.zeros(num.shape), where=ok)
+
+
+def from_moments(mean, std, downside_std, max_dd, gain_sum, loss_sum, wins, trades,
+                 rf_rate: float = 0.04, periods_per_year: int = PERIODS_PER_YEAR) -> Dict:
+    """Turn per-column running sums (from ``compute`` or a compiled kernel) into the ratios."""
+    annual_ret = mean * periods_per_year
+    annual_vol = std * np.sqrt(periods_per_year)
+    return {
+        'mean': mean,
+        'std': std,
+        'downside_std': downside_std,
+        'annual_return': annual_ret,
+        'annual_volatility': annual_vol,
+        'sharpe_ratio': _ratio(annual_ret - rf_rate, annual_vol),
+        'sortino_ratio': _ratio(annual_ret - rf_rate, downside_std * np.sqrt(periods_per_year)),
+        'calmar_ratio': _ratio(annual_ret, np.abs(max_dd)),
+        'max_drawdown': max_dd,
+        'win_rate': _ratio(wins, trades),
+        'profit_factor': _ratio(gain_sum, np.abs(loss_sum)),
+        'wins': wins,
+        'trades': trades,
+    }
+
+
+def compute(returns, equity=None, dd: Optional[np.ndarray] = None, rf_rate: float = 0.04,
+            confidence: float = 0.95, periods_per_year: int = PERIODS_PER_YEAR, tails: bool = True) -> Dict:
+    """
+    Sharpe, Sortino, Calmar, max drawdown, VaR, CVaR, win rate and profit factor for a returns
+    vector (T,) or column-wise for a matrix (T x K). NaN returns are ignored. The drawdown comes
+    from ``dd`` if the caller already has it, else from ``equity``, else from compounding the
+    returns from a starting capital of 1. 1-D input gives floats, 2-D input gives length-K arrays. ``tails=False`` skips
+    the sort behind VaR/CVaR (reported as NaN) when only the moments are needed.
+    """
+    r = np.asarray(returns, dtype=np.float64)
+    vector = r.ndim == 1
+    if vector:
+        r = r[:, None]
+    valid = ~np.isnan(r)
+    r0 = np.where(valid, r, 0.0)
+    n = valid.sum(axis=0)
+    cols = np.arange(r.shape[1])
+
+    # Moments
+    mean = _ratio(r0.sum(axis=0), n)
+    centered = np.where(valid, r0 - mean, 0.0)
+    std = np.sqrt(_ratio((centered * centered).sum(axis=0), n - 1))
+
+    neg = r0 < 0
+    pos = r0 > 0
+    n_neg = neg.sum(axis=0)
+    loss_sum = np.where(neg, r0, 0.0).sum(axis=0)
+    gain_sum = np.where(pos, r0, 0.0).sum(axis=0)
+    neg_centered = np.where(neg, r0 - _ratio(loss_sum, n_neg), 0.0)
+    downside_std = np.sqrt(_ratio((neg_centered * neg_centered).sum(axis=0), n_neg - 1))
+
+    # Tail: linearly interpolated percentile of the sorted valid values (NaN sorts last)
+    if tails:
+        ordered = np.sort(r, axis=0)
+        last = np.maximum(n - 1, 0)
+        position = last * (1 - confidence)
+        lo = np.floor(position).astype(np.int64)
+        hi = np.minimum(lo + 1, last)
+        var = ordered[lo, cols] + (ordered[hi, cols] - ordered[lo, cols]) * (position - lo)
+        var = np.where(n > 0, var, 0.0)
+        tail = valid & (r0 <= var)
+        cvar = _ratio(np.where(tail, r0, 0.0).sum(axis=0), tail.sum(axis=0))
+    else:
+        var = cvar = np.full(r.shape[1], np.nan)
+
+    # Drawdown
+    if dd is None:
+        if equity is None:
+            dd = drawdown(np.cumprod(1 + r0, axis=0), initial=1.0)
+        else:
+            dd = drawdown(equity)
+    dd = np.asarray(dd, dtype=np.float64)
+    if dd.ndim == 1:
+        dd = dd[:, None]
+    filled = np.where(np.isnan(dd), np.inf, dd)
+    max_dd_idx = filled.argmin(axis=0)
+    max_dd = np.where(np.isnan(dd).all(axis=0), np.nan, filled[max_dd_idx, cols])
+
+    stats = from_moments(mean, std, downside_std, max_dd, gain_sum, loss_sum, pos.sum(axis=0),
+                         (valid & (r0 != 0)).sum(axis=0), rf_rate, periods_per_year)
+    stats.update({'max_drawdown_index': max_dd_idx, 'var': var, 'cvar': cvar})
+    if vector:
+        stats = {key: np.asarray(value)[0].item() for key, value in stats.items()}
+    return stats
@@ -0,0 +1,115 @@
+"""
+Parameter Optimizer - grid search over the STRATEGY_CONFIGS ranges
+"""
+import itertools
+import os
+from typing import Callable, Dict, Optional
+import numpy as np
+import pandas as pd
+
+from backtest import QuantBacktester, BacktestConfig
+from indicators import IndicatorBank
+from strategies import STRATEGY_CONFIGS, get_strategy_grid
+
+
+# Pairs that only make sense in one order (e.g. the short window must be shorter)
+PARAM_CONSTRAINTS = {
+    'SMA Crossover': [('short_window', 'long_window')],
+    'EMA Crossover': [('short_window', 'long_window')],
+    'MACD': [('fast', 'slow')],
+    'RSI': [('oversold', 'overbought')],
+}
+
+# Largest number of combinations (before constraints) a grid may expand to
+MAX_GRID_SIZE = int(os.getenv('OPTIMIZER_MAX_GRID', 1_000_000))
+
+
+def expand_grid(strategy_name: str, steps: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """
+    Expand the (min, max) ranges in STRATEGY_CONFIGS into every parameter combination.
+    Integer ranges step by 1 and float ranges by 0.1 (the dashboard slider step) unless
+    overridden in ``steps``. Steps must be positive and the grid at most ``MAX_GRID_SIZE``
+    combinations.
+    """
+    if strategy_name not in STRATEGY_CONFIGS:
+        raise ValueError(f"No parameter ranges configured for {strategy_name}")
+    steps = steps or {}
+    axes = {}
+    for param, (low, high) in STRATEGY_CONFIGS[strategy_name].items():
+        step = float(steps.get(param, 1 if isinstance(low, int) else 0.1))
+        if not (np.isfinite(step) and step > 0):
+            raise ValueError(f"Step for {param} must be a positive number, got {step}")
+        if (high - low) / step + 1 > MAX_GRID_SIZE:
+            raise ValueError(f"Step {step} for {param} gives more than {MAX_GRID_SIZE} values")
+        if isinstance(low, int):
+            axes[param] = np.arange(low, high + 1, max(int(step), 1))
+        else:
+            axes[param] = np.round(np.arange(low, high + step / 2, step), 10)
+    size = int(np.prod([len(values) for values in axes.values()], dtype=np.float64))
+    if size > MAX_GRID_SIZE:
+        raise ValueError(f"Grid of {size} combinations exceeds the limit of {MAX_GRID_SIZE}; use larger steps")
+    grid = pd.DataFrame(list(itertools.product(*axes.values())), columns=list(axes.keys()))
+    for smaller, larger in PARAM_CONSTRAINTS.get(strategy_name, []):
+        grid = grid[grid[smaller] < grid[larger]]
+    for param, values in axes.items():
+        grid[param] = grid[param].astype(values.dtype)
+    return grid.reset_index(drop=True)
+
+
+def _grid_builder(grid_func: Callable[..., np.ndarray]) -> Callable[[IndicatorBank, pd.DataFrame], np.ndarray]:
+    def build(bank: IndicatorBank, grid: pd.DataFrame) -> np.ndarray:
+        return grid_func(bank.prices, bank=bank, **{param: grid[param].to_numpy() for param in grid.columns})
+    return build
+
+
+# Builders turn a parameter grid into a (T x K) int8 position matrix that matches the
+# corresponding TradingStrategies function column for column (see the ``*_grid`` methods).
+POSITION_BUILDERS: Dict[str, Callable[[IndicatorBank, pd.DataFrame], np.ndarray]] = {
+    name: _grid_builder(get_strategy_grid(name)) for name in STRATEGY_CONFIGS
+}
+
+
+class GridSearchOptimizer:
+    """
+    Evaluates every parameter combination for one strategy on one price series and
+    ranks them. Positions are built from shared indicator columns and backtested in
+    chunks of ``chunk_size`` combinations (fewer if the config's ``memory_budget_mb``
+    requires it) with ``QuantBacktester.backtest_matrix``.
+    """
+
+    def __init__(self, config: BacktestConfig = None, chunk_size: int = 2000):
+        self.backtester = QuantBacktester(config)
+        self.chunk_size = chunk_size
+
+    def evaluate(self, prices: pd.Series, strategy_name: str, grid: Optional[pd.DataFrame] = None,
+                 steps: Optional[Dict[str, float]] = None, bank: Optional[IndicatorBank] = None) -> pd.DataFrame:
+        """``bank`` may be passed in (e.g. a view of a longer series) to reuse computed indicators."""
+        grid = expand_grid(strategy_name, steps) if grid is None else grid.reset_index(drop=True)
+        if strategy_name not in POSITION_BUILDERS:
+            raise ValueError(f"Strategy {strategy_name} cannot be optimized")
+        bank = IndicatorBank(prices) if bank is None else bank
+        build = POSITION_BUILDERS[strategy_name]
+        chunk_size = min(self.chunk_size, self.backtester.chunk_columns(len(bank.values)))
+        stats = []
+        for start in range(0, len(grid), chunk_size):
+            chunk = grid.iloc[start:start + chunk_size]
+            positions = build(bank, chunk)
+            # Parameters that do not move the signal (e.g. RSI overbought) give identical
+            # columns; backtest each distinct column once and broadcast its stats.
+            packed = np.packbits(positions, axis=0).T
+            _, first, inverse = np.unique(packed, axis=0, return_index=True, return_inverse=True)
+            result = self.backtester.backtest_matrix(prices, positions[:, first], keep_series=False)
+            stats.append(result['stats'].iloc[inverse.ravel()].set_index(chunk.index))
+        return pd.concat([grid, pd.concat(stats)], axis=1)
+
+    def optimize(self, prices: pd.Series, strategy_name: str, metric: str = 'sharpe_ratio', top_n: Optional[int] = 20,
+                 steps: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+        """Ranked table of parameter combinations, best ``metric`` first."""
+        if top_n is not None and top_n < 1:
+            raise ValueError(f"top_n must be at least 1, got {top_n}")
+        results = self.evaluate(prices, strategy_name, steps=steps)
+        if metric not in results.columns:
+            raise ValueError(f"Unknown metric: {metric}")
+        ranked = results.sort_values(metric, ascending=False, kind='stable').reset_index(drop=True)
+        return ranked.head(top_n) if top_n else ranked
+
@@ -0,0 +1,138 @@
+"""
+Portfolio Backtester - multi-asset target weights with periodic or threshold rebalancing
+"""
+from typing import Dict, Optional, Union
+import numpy as np
+import pandas as pd
+
+import metrics
+from backtest import BacktestConfig
+from strategies import get_strategy
+
+
+def signals_to_weights(signals: pd.DataFrame) -> pd.DataFrame:
+    """Equal-weight every asset whose signal is on; bars with no active asset sit in cash."""
+    active = signals.fillna(0).clip(lower=0).astype(np.float64)
+    count = active.sum(axis=1)
+    return active.div(count.where(count > 0, 1.0), axis=0)
+
+
+def rebalance_schedule(index: pd.Index, rebalance: Union[str, int, None]) -> np.ndarray:
+    """
+    Boolean mask of scheduled rebalance bars: every bar (``None``), every ``n`` bars (int),
+    or the first bar of each calendar period for a pandas frequency such as 'W', 'M' or 'Q'.
+    """
+    n_bars = len(index)
+    if rebalance is None:
+        return np.ones(n_bars, dtype=bool)
+    if isinstance(rebalance, (int, np.integer)):
+        return np.arange(n_bars) % max(int(rebalance), 1) == 0
+    periods = pd.DatetimeIndex(index).to_period(rebalance)
+    mask = np.ones(n_bars, dtype=bool)
+    mask[1:] = periods[1:] != periods[:-1]
+    return mask
+
+
+class PortfolioBacktester:
+    """
+    Simulates a long-only portfolio over a (T x N) price matrix. Target weights (or 0/1
+    signals, equal-weighted) are set at each bar's close and earn the next bar's return.
+    Between rebalances the holdings drift with prices; a rebalance trades back to target on
+    the schedule and/or when any weight drifts more than ``threshold`` away. Traded notional
+    pays ``brokerage_fee + slippage`` and sells additionally pay ``stt_tax``. Each bar is one
+    vector step across all assets.
+    """
+
+    def __init__(self, config: BacktestConfig = None):
+        self.config = config or BacktestConfig()
+
+    def run(self, prices: pd.DataFrame, weights: Optional[pd.DataFrame] = None,
+            signals: Optional[pd.DataFrame] = None, rebalance: Union[str, int, None] = None,
+            threshold: Optional[float] = None) -> Dict:
+        if (weights is None) == (signals is None):
+            raise ValueError("Pass exactly one of weights or signals")
+        if weights is None:
+            weights = signals_to_weights(signals)
+        weights = weights.reindex(index=prices.index, columns=prices.columns).fillna(0.0)
+        target = weights.to_numpy(dtype=np.float64)
+        if (target < 0).any() or (target.sum(axis=1) > 1 + 1e-9).any():
+            raise ValueError("Target weights must be non-negative and sum to at most 1")
+
+        px = prices.to_numpy(dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            asset_returns = px[1:] / px[:-1] - 1
+        asset_returns = np.nan_to_num(asset_returns, nan=0.0, posinf=0.0, neginf=0.0)
+        # Assets without a price yet cannot be held
+        target = np.where(np.isnan(px), 0.0, target)
+
+        scheduled = rebalance_schedule(prices.index, rebalance)
+        if rebalance is None and threshold is not None:
+            # Drift-triggered only, after the initial allocation
+            scheduled[1:] = False
+        trade_rate = self.config.brokerage_fee + self.config.slippage
+        stt_rate = self.config.stt_tax
+
+        n_bars, n_assets = px.shape
+        held = np.zeros((n_bars, n_assets))
+        contributions = np.zeros((n_bars, n_assets))
+        asset_costs = np.zeros((n_bars, n_assets))
+        net = np.zeros(n_bars)
+        turnover = np.zeros(n_bars)
+        rebalanced = np.zeros(n_bars, dtype=bool)
+
+        w = np.zeros(n_assets)
+        for t in range(n_bars):
+            if t > 0:
+                r = asset_returns[t - 1]
+                contributions[t] = w * r
+                gross = contributions[t].sum()
+                w = w * (1 + r) / (1 + gross) if gross != -1 else np.zeros(n_assets)
+                net[t] = gross
+            trade = target[t] - w
+            if scheduled[t] or (threshold is not None and np.abs(trade).max() > threshold):
+                costs = np.abs(trade) * trade_rate + np.maximum(-trade, 0) * stt_rate
+                cost = costs.sum()
+                if t > 0:
+                    net[t] = (1 + net[t]) * (1 - cost) - 1
+                else:
+                    net[t] = -cost
+                asset_costs[t] = costs
+                turnover[t] = np.abs(trade).sum()
+                rebalanced[t] = True
+                w = target[t].copy()
+            held[t] = w
+
+        equity = np.cumprod(1 + net) * self.config.initial_cash
+        summary = metrics.compute(net[1:], dd=metrics.drawdown(equity)[1:])
+        index, columns = prices.index, prices.columns
+        # Sum of each asset's per-bar return contribution, net of the costs it caused
+        contribution_total = pd.Series(contributions.sum(axis=0) - asset_costs.sum(axis=0), index=columns)
+        return {
+            'equity_curve': pd.Series(equity, index=index),
+            'returns': pd.Series(net, index=index),
+            'weights': pd.DataFrame(held, index=index, columns=columns),
+            'contributions': pd.DataFrame(contributions, index=index, columns=columns),
+            'asset_contribution': contribution_total.sort_values(ascending=False),
+            'costs': pd.Series(asset_costs.sum(axis=1), index=index),
+            'turnover': pd.Series(turnover, index=index),
+            'rebalances': int(rebalanced.sum()),
+            'total_return': equity[-1] / self.config.initial_cash - 1,
+            'annual_return': summary['annual_return'],
+            'annual_volatility': summary['annual_volatility'],
+            'sharpe_ratio': summary['sharpe_ratio'],
+            'sortino_ratio': summary['sortino_ratio'],
+            'calmar_ratio': summary['calmar_ratio'],
+            'max_drawdown': summary['max_drawdown'],
+            'max_drawdown_date': index[summary['max_drawdown_index'] + 1] if n_bars > 1 else index[0],
+            'var_95': summary['var'],
+            'win_rate': summary['win_rate'],
+        }
+
+    def run_strategy(self, prices: pd.DataFrame, strategy_name: str, parameters: Optional[Dict] = None,
+                     rebalance: Union[str, int, None] = None, threshold: Optional[float] = None) -> Dict:
+        """Apply one TradingStrategies function to every column and equal-weight the active assets."""
+        strategy_func = get_strategy(strategy_name)
+        signals = pd.DataFrame({
+            ticker: strategy_func(prices[ticker].dropna(), **(parameters or {})) for ticker in prices.columns
+        })
+        return self.run(prices, signals=signals, rebalance=rebalance, threshold=threshold)
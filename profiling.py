@@ -0,0 +1,151 @@
+"""
+Request Profiling - per-stage timing spans, Prometheus-style histograms and on-demand profiles
+"""
+import cProfile
+import io
+import pstats
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import pyinstrument
+    PYINSTRUMENT_AVAILABLE = True
+except ImportError:
+    pyinstrument = None
+    PYINSTRUMENT_AVAILABLE = False
+
+# Seconds; covers a cached response (~1ms) up to a cold multi-year download
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Spans recorded by the request currently being handled (None outside a request)
+_spans: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar('spans', default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one series per label set, rendered in Prometheus text format."""
+
+    def __init__(self, name: str, description: str, labels: Tuple[str, ...], buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self.series: Dict[tuple, list] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(label, '')) for label in self.labels)
+        slot = bisect_left(self.buckets, value)
+        with self.lock:
+            entry = self.series.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0])
+            entry[0][slot] += 1
+            entry[1] += value
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            series = [(key, list(counts), total) for key, (counts, total) in sorted(self.series.items())]
+        for key, counts, total in series:
+            labels = ','.join(f'{label}="{value}"' for label, value in zip(self.labels, key))
+            prefix = f"{labels}," if labels else ''
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{self.name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+            suffix = f"{{{labels}}}" if labels else ''
+            lines.append(f"{self.name}_sum{suffix} {total!r}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return '\n'.join(lines)
+
+    def reset(self) -> None:
+        with self.lock:
+            self.series.clear()
+
+
+request_duration = Histogram('http_request_duration_seconds', 'Request latency by route.',
+                             ('method', 'route', 'status'))
+stage_duration = Histogram('backtest_stage_duration_seconds', 'Time spent in each request stage.', ('stage',))
+HISTOGRAMS = (request_duration, stage_duration)
+
+
+def render_metrics() -> str:
+    return '\n'.join(histogram.render() for histogram in HISTOGRAMS) + '\n'
+
+
+@contextmanager
+def span(stage: str):
+    """Time a block: feeds ``stage_duration`` and, inside a request, its Server-Timing header."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stage_duration.observe(elapsed, stage=stage)
+        spans = _spans.get()
+        if spans is not None:
+            spans.append((stage, elapsed))
+
+
+def start_request():
+    """Begin collecting spans for the current request; returns the token for ``end_request``."""
+    return _spans.set([])
+
+
+def end_request(token) -> List[Tuple[str, float]]:
+    spans = _spans.get() or []
+    _spans.reset(token)
+    return spans
+
+
+def server_timing(spans: List[Tuple[str, float]], total: Optional[float] = None) -> str:
+    """``Server-Timing`` header value (durations in milliseconds); repeated stages are summed."""
+    merged: Dict[str, float] = {}
+    for stage, elapsed in spans:
+        merged[stage] = merged.get(stage, 0.0) + elapsed
+    if total is not None:
+        merged['total'] = total
+    return ', '.join(f"{stage};dur={elapsed * 1000:.3f}" for stage, elapsed in merged.items())
+
+
+class Profiler:
+    """
+    One request at a time under cProfile (or pyinstrument when installed and requested).
+    Only code running on the event-loop thread is captured, which covers the inline endpoints
+    such as ``/backtest``; work handed to an executor shows up as time spent waiting.
+    """
+    MODES = ('cprofile', 'pyinstrument')
+
+    def __init__(self, mode: str = 'cprofile'):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown profiler: {mode}. Available: {', '.join(self.MODES)}")
+        if mode == 'pyinstrument' and not PYINSTRUMENT_AVAILABLE:
+            raise ValueError("pyinstrument is not installed")
+        self.mode = mode
+        self.profiler = cProfile.Profile() if mode == 'cprofile' else pyinstrument.Profiler(async_mode='enabled')
+
+    def start(self) -> None:
+        if self.mode == 'cprofile':
+            self.profiler.enable()
+        else:
+            self.profiler.start()
+
+    def stop(self) -> None:
+        if self.mode == 'cprofile':
+            self.profiler.disable()
+        else:
+            self.profiler.stop()
+
+    def report(self, limit: int = 40) -> str:
+        if self.mode == 'pyinstrument':
+            return self.profiler.output_text()
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats('cumulative').print_stats(limit)
+        return out.getvalue()
+
+
+# cProfile cannot run two profiles at once in one interpreter
+profile_lock = threading.Lock()
@@ -0,0 +1,218 @@
+"""
+Data Providers - pluggable price sources behind DataFetcher
+"""
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+from store import period_start, align_tz
+
+
+BARS_PER_YEAR = {
+    '1m': 252 * 375, '2m': 252 * 188, '5m': 252 * 75, '15m': 252 * 25, '30m': 252 * 13,
+    '60m': 252 * 7, '90m': 252 * 5, '1h': 252 * 7, '1d': 252, '5d': 52, '1wk': 52, '1mo': 12, '3mo': 4,
+}
+
+PANDAS_FREQ = {
+    '1m': 'min', '2m': '2min', '5m': '5min', '15m': '15min', '30m': '30min', '60m': 'h',
+    '90m': '90min', '1h': 'h', '1d': 'B', '5d': '5B', '1wk': 'W-FRI', '1mo': 'BME', '3mo': 'BQE',
+}
+
+
+def _slice(data: pd.DataFrame, period: Optional[str], start) -> pd.DataFrame:
+    if data.empty:
+        return data
+    if start is None and period is not None:
+        start = period_start(period)
+    start = align_tz(pd.Timestamp(start) if start is not None else None, data.index)
+    return data[data.index >= start] if start is not None else data
+
+
+class DataProvider:
+    """
+    Base class for price sources. ``download`` returns a DataFrame indexed by timestamp
+    with a single ``close`` column, or an empty DataFrame when nothing is available.
+    ``persist`` tells DataFetcher whether results are worth keeping in the on-disk store.
+    """
+    name = 'base'
+    persist = False
+    max_workers = 8
+
+    def download(self, ticker: str, period: Optional[str] = None, interval: str = '1d', start=None) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def download_many(self, tickers: List[str], period: Optional[str] = None, interval: str = '1d',
+                      start=None) -> Dict[str, pd.DataFrame]:
+        """Fetch several tickers over a bounded thread pool; providers with a bulk API override this."""
+        if not tickers:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tickers))) as pool:
+            futures = {t: pool.submit(self.download, t, period, interval, start) for t in tickers}
+        results = {}
+        for ticker, future in futures.items():
+            try:
+                results[ticker] = future.result()
+            except Exception as e:
+                print(f"Error fetching data for {ticker}: {e}")
+                results[ticker] = pd.DataFrame()
+        return results
+
+
+class YFinanceProvider(DataProvider):
+    name = 'yfinance'
+    persist = True
+
+    def download(self, ticker: str, period: Optional[str] = None, interval: str = '1d', start=None) -> pd.DataFrame:
+        import yfinance as yf
+        if start is not None:
+            data = yf.download(ticker, start=start, interval=interval, progress=False)
+        else:
+            data = yf.download(ticker, period=period, interval=interval, progress=False)
+        if data.empty:
+            return pd.DataFrame()
+        data = data[['Close']].dropna()
+        data.columns = ['close']
+        return data
+
+    def download_many(self, tickers: List[str], period: Optional[str] = None, interval: str = '1d',
+                      start=None) -> Dict[str, pd.DataFrame]:
+        """One yf.download round-trip for all tickers."""
+        import yfinance as yf
+        if not tickers:
+            return {}
+        if start is not None:
+            data = yf.download(tickers, start=start, interval=interval, progress=False, group_by='column')
+        else:
+            data = yf.download(tickers, period=period, interval=interval, progress=False, group_by='column')
+        if data.empty:
+            return {t: pd.DataFrame() for t in tickers}
+        close = data['Close']
+        if isinstance(close, pd.Series):
+            close = close.to_frame(tickers[0])
+        results = {}
+        for ticker in tickers:
+            if ticker in close.columns:
+                results[ticker] = close[[ticker]].dropna().set_axis(['close'], axis=1)
+            else:
+                results[ticker] = pd.DataFrame()
+        return results
+
+
+class LocalFileProvider(DataProvider):
+    """
+    Reads ``<ticker>_<interval>.<ext>`` or ``<ticker>.<ext>`` from a directory, where ext is
+    parquet, feather or csv. The close column is matched case-insensitively.
+    """
+    name = 'local'
+    EXTENSIONS = ('parquet', 'feather', 'csv')
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.getenv('DATA_PROVIDER_PATH', './data')
+
+    def _find(self, ticker: str, interval: str) -> Optional[str]:
+        for stem in (f"{ticker}_{interval}", ticker):
+            for ext in self.EXTENSIONS:
+                path = os.path.join(self.directory, f"{stem}.{ext}")
+                if os.path.exists(path):
+                    return path
+        return None
+
+    def _read(self, path: str) -> pd.DataFrame:
+        if path.endswith('.parquet'):
+            data = pd.read_parquet(path)
+        elif path.endswith('.feather'):
+            data = pd.read_feather(path)
+        else:
+            data = pd.read_csv(path, index_col=0, parse_dates=True)
+        if not isinstance(data.index, pd.DatetimeIndex):
+            date_cols = [c for c in data.columns if str(c).lower() in ('date', 'datetime', 'timestamp')]
+            if date_cols:
+                data = data.set_index(pd.to_datetime(data[date_cols[0]])).drop(columns=date_cols[0])
+        return data
+
+    def download(self, ticker: str, period: Optional[str] = None, interval: str = '1d', start=None) -> pd.DataFrame:
+        path = self._find(ticker, interval)
+        if path is None:
+            return pd.DataFrame()
+        data = self._read(path)
+        columns = {str(c).lower(): c for c in data.columns}
+        close = columns.get('close', columns.get('adj close'))
+        if close is None:
+            return pd.DataFrame()
+        data = data[[close]].dropna().sort_index()
+        data.columns = ['close']
+        return _slice(data, period, start)
+
+
+class SyntheticProvider(DataProvider):
+    """
+    Seeded geometric Brownian motion with optional Merton jumps. Each ticker gets its own
+    reproducible path; ``bars`` overrides the period and generates exactly that many bars
+    (minute-spaced when the interval's calendar cannot hold them).
+    """
+    name = 'synthetic'
+
+    def __init__(self, seed: int = 0, mu: float = 0.08, sigma: float = 0.25, jump_intensity: float = 0.0,
+                 jump_mean: float = -0.02, jump_std: float = 0.05, start_price: float = 100.0,
+                 bars: Optional[int] = None):
+        self.seed = seed
+        self.mu = mu
+        self.sigma = sigma
+        self.jump_intensity = jump_intensity
+        self.jump_mean = jump_mean
+        self.jump_std = jump_std
+        self.start_price = start_price
+        self.bars = bars
+
+    def _index(self, period: Optional[str], interval: str, start) -> pd.DatetimeIndex:
+        freq = PANDAS_FREQ.get(interval, 'B')
+        end = pd.Timestamp(datetime.now()).floor('min')
+        if self.bars is not None:
+            try:
+                return pd.date_range(end=end, periods=self.bars, freq=freq)
+            except (OverflowError, ValueError):
+                # pandas timestamps span at most ~292 years (about 76k business days), so
+                # longer series are spaced a minute apart; the prices keep ``interval``'s scale
+                return pd.date_range(end=end, periods=self.bars, freq='min')
+        if start is None:
+            start = period_start(period or '5y') if period != 'max' else end - pd.DateOffset(years=20)
+        return pd.date_range(start=pd.Timestamp(start), end=end, freq=freq)
+
+    def generate(self, ticker: str, n: int, interval: str = '1d') -> np.ndarray:
+        rng = np.random.default_rng([self.seed, zlib.crc32(ticker.encode())])
+        dt = 1.0 / BARS_PER_YEAR.get(interval, 252)
+        drift = (self.mu - 0.5 * self.sigma ** 2) * dt
+        log_ret = drift + self.sigma * np.sqrt(dt) * rng.standard_normal(n)
+        if self.jump_intensity > 0:
+            k = np.exp(self.jump_mean + 0.5 * self.jump_std ** 2) - 1
+            n_jumps = rng.poisson(self.jump_intensity * dt, n)
+            log_ret += n_jumps * self.jump_mean + np.sqrt(n_jumps) * self.jump_std * rng.standard_normal(n)
+            log_ret -= self.jump_intensity * k * dt
+        log_ret[0] = 0.0
+        return self.start_price * np.exp(np.cumsum(log_ret))
+
+    def download(self, ticker: str, period: Optional[str] = None, interval: str = '1d', start=None) -> pd.DataFrame:
+        index = self._index(period, interval, start)
+        if len(index) == 0:
+            return pd.DataFrame()
+        return pd.DataFrame({'close': self.generate(ticker, len(index), interval)}, index=index)
+
+
+PROVIDERS = {
+    'yfinance': YFinanceProvider,
+    'local': LocalFileProvider,
+    'synthetic': SyntheticProvider,
+}
+
+
+def get_provider(name: Optional[str] = None, **kwargs) -> DataProvider:
+    name = name or os.getenv('DATA_PROVIDER', 'yfinance')
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown data provider: {name}. Available: {', '.join(PROVIDERS)}")
+    if name == 'synthetic' and 'seed' not in kwargs and os.getenv('SYNTHETIC_SEED'):
+        kwargs['seed'] = int(os.getenv('SYNTHETIC_SEED'))
+    return PROVIDERS[name](**kwargs)
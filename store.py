@@ -0,0 +1,141 @@
+"""
+Price Store - on-disk columnar cache for downloaded price history
+"""
+import os
+import json
+import time
+import importlib.util
+from datetime import datetime
+from typing import Dict, Optional
+import pandas as pd
+
+
+def _parquet_available() -> bool:
+    return any(importlib.util.find_spec(m) is not None for m in ('pyarrow', 'fastparquet'))
+
+
+def period_start(period: str, now: Optional[datetime] = None) -> Optional[pd.Timestamp]:
+    """Translate a yfinance period string ('5d', '6mo', '5y', 'ytd', 'max') into a start date."""
+    now = pd.Timestamp(now or datetime.now()).normalize()
+    period = period.strip().lower()
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return pd.Timestamp(year=now.year, month=1, day=1)
+    units = {'d': 'days', 'wk': 'weeks', 'mo': 'months', 'y': 'years'}
+    for suffix, unit in units.items():
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return now - pd.DateOffset(**{unit: int(period[:-len(suffix)])})
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def align_tz(ts: Optional[pd.Timestamp], index: pd.Index) -> Optional[pd.Timestamp]:
+    if ts is None or not isinstance(index, pd.DatetimeIndex):
+        return ts
+    if index.tz is not None and ts.tz is None:
+        return ts.tz_localize(index.tz)
+    if index.tz is None and ts.tz is not None:
+        return ts.tz_localize(None)
+    return ts
+
+
+class PriceStore:
+    """
+    One file per (ticker, interval) plus a small JSON sidecar recording how far back the
+    stored history is known to be complete and when the tail was last refreshed.
+    Parquet is used when pyarrow/fastparquet is installed, pickle otherwise.
+    """
+
+    def __init__(self, root: Optional[str] = None, refresh_seconds: Optional[float] = None, fmt: Optional[str] = None):
+        self.root = root or os.getenv('DATA_CACHE_DIR', './data_cache')
+        if refresh_seconds is None:
+            refresh_seconds = float(os.getenv('PRICE_STORE_REFRESH_SECONDS', 900))
+        self.refresh_seconds = refresh_seconds
+        self.fmt = fmt or ('parquet' if _parquet_available() else 'pickle')
+
+    def _key(self, ticker: str, interval: str) -> str:
+        safe = ''.join(c if c.isalnum() or c in '.-' else '_' for c in ticker)
+        return f"{safe}_{interval}"
+
+    def path(self, ticker: str, interval: str) -> str:
+        ext = 'parquet' if self.fmt == 'parquet' else 'pkl'
+        return os.path.join(self.root, f"{self._key(ticker, interval)}.{ext}")
+
+    def _meta_path(self, ticker: str, interval: str) -> str:
+        return os.path.join(self.root, f"{self._key(ticker, interval)}.json")
+
+    def load(self, ticker: str, interval: str) -> pd.DataFrame:
+        path = self.path(ticker, interval)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        try:
+            if self.fmt == 'parquet':
+                return pd.read_parquet(path)
+            return pd.read_pickle(path)
+        except Exception as e:
+            print(f"Error reading price store {path}: {e}")
+            return pd.DataFrame()
+
+    def metadata(self, ticker: str, interval: str) -> Dict:
+        path = self._meta_path(ticker, interval)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self, ticker: str, interval: str, data: pd.DataFrame, start: Optional[pd.Timestamp] = None) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        path = self.path(ticker, interval)
+        tmp = path + '.tmp'
+        if self.fmt == 'parquet':
+            data.to_parquet(tmp)
+        else:
+            data.to_pickle(tmp)
+        os.replace(tmp, path)
+        meta = {
+            'start': None if start is None else pd.Timestamp(start).isoformat(),
+            'updated': time.time(),
+        }
+        with open(self._meta_path(ticker, interval), 'w') as f:
+            json.dump(meta, f)
+
+    def covers(self, ticker: str, interval: str, start: Optional[pd.Timestamp]) -> bool:
+        """True if the stored history is complete back to ``start`` (None means full history)."""
+        meta = self.metadata(ticker, interval)
+        if 'start' not in meta:
+            return False
+        if meta['start'] is None:
+            return True
+        return start is not None and pd.Timestamp(meta['start']) <= start
+
+    def is_stale(self, ticker: str, interval: str) -> bool:
+        updated = self.metadata(ticker, interval).get('updated', 0)
+        return time.time() - updated > self.refresh_seconds
+
+    def merge(self, ticker: str, interval: str, new: pd.DataFrame, start: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """Append ``new`` bars to the stored history (newer values win) and persist the result."""
+        cached = self.load(ticker, interval)
+        if cached.empty:
+            combined = new
+        elif new.empty:
+            combined = cached
+        else:
+            combined = pd.concat([cached, new])
+            combined = combined[~combined.index.duplicated(keep='last')].sort_index()
+
+        meta = self.metadata(ticker, interval)
+        if 'start' in meta:
+            known = None if meta['start'] is None else pd.Timestamp(meta['start'])
+            if known is None or (start is not None and known < start):
+                start = known
+        if not combined.empty:
+            self.save(ticker, interval, combined, start)
+        return combined
+
+    def clear(self, ticker: str, interval: str) -> None:
+        for path in (self.path(ticker, interval), self._meta_path(ticker, interval)):
+            if os.path.exists(path):
+                os.remove(path)
@@ -1,33 +1,46 @@
 import pandas as pd
 import numpy as np
-from typing import Tuple, Dict
+from typing import Tuple, Dict, List, Optional
+
+import indicators as ind
+
+
+def _bank(prices: pd.Series, bank: Optional[ind.IndicatorBank]) -> ind.IndicatorBank:
+    return ind.IndicatorBank(prices) if bank is None else bank
+
+
+def _params(*values) -> List[np.ndarray]:
+    """Parameter values as equal-length 1-D arrays (scalars repeat), one entry per column."""
+    return np.broadcast_arrays(*(np.atleast_1d(np.asarray(v)) for v in values))
+
+
+def _shift(matrix: np.ndarray) -> np.ndarray:
+    shifted = np.full_like(matrix, np.nan)
+    shifted[1:] = matrix[:-1]
+    return shifted
 
 
 class TradingStrategies:
     
     @staticmethod
     def sma_crossover(prices: pd.Series, short_window: int = 20, long_window: int = 50) -> pd.Series:
-        sma_short = prices.rolling(window=short_window).mean()
-        sma_long = prices.rolling(window=long_window).mean()
+        sma_short = ind.rolling_mean(prices, short_window)
+        sma_long = ind.rolling_mean(prices, long_window)
         signals = pd.Series(0, index=prices.index)
         signals[sma_short > sma_long] = 1
         return signals
     
     @staticmethod
     def ema_crossover(prices: pd.Series, short_window: int = 12, long_window: int = 26) -> pd.Series:
-        ema_short = prices.ewm(span=short_window).mean()
-        ema_long = prices.ewm(span=long_window).mean()
+        ema_short = ind.ewm_mean(prices, short_window)
+        ema_long = ind.ewm_mean(prices, long_window)
         signals = pd.Series(0, index=prices.index)
         signals[ema_short > ema_long] = 1
         return signals
     
     @staticmethod
     def rsi_strategy(prices: pd.Series, period: int = 14, oversold: int = 30, overbought: int = 70) -> pd.Series:
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
+        rsi = ind.rsi(prices, period)
         signals = pd.Series(0, index=prices.index)
         signals[rsi < oversold] = 1
         signals[rsi > overbought] = 0
@@ -35,8 +48,8 @@ class TradingStrategies:
     
     @staticmethod
     def macd_strategy(prices: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9) -> pd.Series:
-        ema_fast = prices.ewm(span=fast).mean()
-        ema_slow = prices.ewm(span=slow).mean()
+        ema_fast = ind.ewm_mean(prices, fast)
+        ema_slow = ind.ewm_mean(prices, slow)
         macd = ema_fast - ema_slow
         signal_line = macd.ewm(span=signal).mean()
         signals = pd.Series(0, index=prices.index)
@@ -45,8 +58,8 @@ class TradingStrategies:
     
     @staticmethod
     def bollinger_bands(prices: pd.Series, period: int = 20, num_std: float = 2.0) -> pd.Series:
-        sma = prices.rolling(window=period).mean()
-        std = prices.rolling(window=period).std()
+        sma = ind.rolling_mean(prices, period)
+        std = ind.rolling_std(prices, period)
         lower_band = sma - (num_std * std)
         upper_band = sma + (num_std * std)
         signals = pd.Series(0, index=prices.index)
@@ -56,8 +69,8 @@ class TradingStrategies:
     
     @staticmethod
     def stochastic_oscillator(prices: pd.Series, period: int = 14, smooth: int = 3) -> pd.Series:
-        low_min = prices.rolling(window=period).min()
-        high_max = prices.rolling(window=period).max()
+        low_min = ind.rolling_min(prices, period)
+        high_max = ind.rolling_max(prices, period)
         k = 100 * (prices - low_min) / (high_max - low_min)
         k_smooth = k.rolling(window=smooth).mean()
         signals = pd.Series(0, index=prices.index)
@@ -67,14 +80,15 @@ class TradingStrategies:
     
     @staticmethod
     def momentum(prices: pd.Series, period: int = 10) -> pd.Series:
-        momentum = prices.pct_change(period)
+        momentum = ind.pct_change(prices, period)
         signals = pd.Series(0, index=prices.index)
         signals[momentum > 0] = 1
         return signals
     
     @staticmethod
     def roc_strategy(prices: pd.Series, period: int = 12) -> pd.Series:
-        roc = ((prices - prices.shift(period)) / prices.shift(period)) * 100
+        shifted = ind.shift(prices, period)
+        roc = ((prices - shifted) / shifted) * 100
         signals = pd.Series(0, index=prices.index)
         signals[roc > 0] = 1
         return signals
@@ -93,22 +107,22 @@ class TradingStrategies:
     
     @staticmethod
     def volume_weighted_ma(prices: pd.Series, period: int = 20) -> pd.Series:
-        sma = prices.rolling(window=period).mean()
+        sma = ind.rolling_mean(prices, period)
         signals = pd.Series(0, index=prices.index)
         signals[prices > sma] = 1
         return signals
     
     @staticmethod
     def support_resistance(prices: pd.Series, period: int = 50) -> pd.Series:
-        rolling_high = prices.rolling(window=period).max()
-        rolling_low = prices.rolling(window=period).min()
+        rolling_high = ind.rolling_max(prices, period)
+        rolling_low = ind.rolling_min(prices, period)
         signals = pd.Series(0, index=prices.index)
         signals[(prices > rolling_low) & (prices < rolling_high)] = 1
         return signals
     
     @staticmethod
     def trend_following(prices: pd.Series, threshold: float = 0.02) -> pd.Series:
-        returns = prices.pct_change()
+        returns = ind.pct_change(prices)
         signals = pd.Series(0, index=prices.index)
         signals[returns > threshold] = 1
         signals[returns < -threshold] = 0
@@ -116,8 +130,8 @@ class TradingStrategies:
     
     @staticmethod
     def mean_reversion(prices: pd.Series, period: int = 20, threshold: float = 1.5) -> pd.Series:
-        sma = prices.rolling(window=period).mean()
-        std = prices.rolling(window=period).std()
+        sma = ind.rolling_mean(prices, period)
+        std = ind.rolling_std(prices, period)
         signals = pd.Series(0, index=prices.index)
         signals[prices < (sma - threshold * std)] = 1
         signals[prices > (sma + threshold * std)] = 0
@@ -125,8 +139,8 @@ class TradingStrategies:
     
     @staticmethod
     def williams_r(prices: pd.Series, period: int = 14) -> pd.Series:
-        high = prices.rolling(window=period).max()
-        low = prices.rolling(window=period).min()
+        high = ind.rolling_max(prices, period)
+        low = ind.rolling_min(prices, period)
         wr = -100 * (high - prices) / (high - low)
         signals = pd.Series(0, index=prices.index)
         signals[wr < -80] = 1
@@ -135,16 +149,16 @@ class TradingStrategies:
     
     @staticmethod
     def adx_trend(prices: pd.Series, period: int = 14) -> pd.Series:
-        returns = prices.pct_change()
-        trend = returns.rolling(window=period).std()
+        returns = ind.pct_change(prices)
+        trend = ind.rolling_std(returns, period)
         signals = pd.Series(0, index=prices.index)
         signals[trend > trend.mean()] = 1
         return signals
     
     @staticmethod
     def fibonacci_retracement(prices: pd.Series, period: int = 50) -> pd.Series:
-        high = prices.rolling(window=period).max()
-        low = prices.rolling(window=period).min()
+        high = ind.rolling_max(prices, period)
+        low = ind.rolling_min(prices, period)
         fib_38 = low + 0.382 * (high - low)
         signals = pd.Series(0, index=prices.index)
         signals[prices < fib_38] = 1
@@ -152,15 +166,146 @@ class TradingStrategies:
     
     @staticmethod
     def ichimoku_cloud(prices: pd.Series, period1: int = 9, period2: int = 26) -> pd.Series:
-        high_9 = prices.rolling(window=period1).max()
-        low_9 = prices.rolling(window=period1).min()
+        high_9 = ind.rolling_max(prices, period1)
+        low_9 = ind.rolling_min(prices, period1)
         tenkan = (high_9 + low_9) / 2
-        high_26 = prices.rolling(window=period2).max()
-        low_26 = prices.rolling(window=period2).min()
+        high_26 = ind.rolling_max(prices, period2)
+        low_26 = ind.rolling_min(prices, period2)
         kijun = (high_26 + low_26) / 2
         signals = pd.Series(0, index=prices.index)
         signals[tenkan > kijun] = 1
         return signals
+    
+    # Batched variants: each ``*_grid`` method takes the same parameters as its single-series
+    # counterpart, as scalars or equal-length arrays (one entry per column), and returns a
+    # (T x K) int8 position matrix whose k-th column equals that function's signals for the
+    # k-th parameter set. Each distinct window is computed once; ``bank`` (e.g. a view of a
+    # longer series) reuses indicators across calls.
+    
+    @staticmethod
+    def sma_crossover_grid(prices: pd.Series, short_window=20, long_window=50,
+                           bank: Optional[ind.IndicatorBank] = None) -> np.ndarray:
+        bank = _bank(prices, bank)
+        short_window, long_window = _params(short_window, long_window)
+        return (bank.stack('sma', short_window) > bank.stack('sma', long_window)).astype(np.int8)
+    
+    @staticmethod
+    def ema_crossover_grid(prices: pd.Series, short_window=12, long_window=26,
+                           bank: Optional[ind.IndicatorBank] = None) -> np.ndarray:
+        bank = _bank(prices, bank)
+        short_window, long_window = _params(short_window, long_window)
+        return (bank.stack('ema', short_window) > bank.stack('ema', long_window)).astype(np.int8)
+    
+    @staticmethod
+    def rsi_strategy_grid(prices: pd.Series, period=14, oversold=30, overbought=70,
+                          bank: Optional[ind.IndicatorBank] = None) -> np.ndarray:
+        bank = _bank(prices, bank)
+        period, oversold, overbought = _params(period, oversold, overbought)
+        rsi = bank.stack('rsi', period)
+        return ((rsi < oversold) & ~(rsi > overbought)).astype(np.int8)
+    
+    @staticmethod
+    def macd_strategy_grid(prices: pd.Series, fast=12, slow=26, signal=9,
+                           bank: Optional[ind.IndicatorBank] = None) -> np.ndarray:
+        bank = _bank(prices, bank)
+        return (bank.stack('macd_hist', *_params(fast, slow, signal)) > 0).astype(np.int8)
+    
+    @staticmethod
+    def bollinger_bands_grid(prices: pd.Series, period=20, num_std=2.0,
+                             bank: Optional[ind.IndicatorBank] = None) -> np.ndarray:
+        return _band_grid(_bank(prices, bank), *_params(period, num_std))
+    
+    @staticmethod
+    def stochastic_oscillator_grid(prices: pd.Series, period=14, smooth=3,
+                                   bank: Optional[ind.IndicatorBank] = None) -> np.ndarray:
+        bank = _bank(prices, bank)
+        # A %K below 20 can never also be above 80, so the exit mask changes nothing
+        return (bank.stack('stochastic', *_params(period, smooth)) < 20).astype(np.int8)
+    
+    @staticmethod
+    def momentum_grid(prices: pd.Series, period=10, bank: Optional[ind.IndicatorBank] = None) -> np.ndarray:
+        bank = _bank(prices, bank)
+        return (bank.stack('pct_change', *_params(period)) > 0).astype(np.int8)
+    
+    @staticmethod
+    def roc_strategy_grid(prices: pd.Series, period=12, bank: Optional[ind.IndicatorBank] = None) -> np.ndarray:
+        bank = _bank(prices, bank)
+        return (bank.stack('roc', *_params(period)) > 0).astype(np.int8)
+    
+    @staticmethod
+    def atr_breakout_grid(prices: pd.Series, period=14, multiplier=2.0,
+                          bank: Optional[ind.IndicatorBank] = None) -> np.ndarray:
+        bank = _bank(prices, bank)
+        period, multiplier = _params(period, multiplier)
+        close = bank.values[:, None]
+        upper = close + multiplier * bank.stack('atr', period)
+        return (close > _shift(upper)).astype(np.int8)
+    
+    @staticmethod
+    def volume_weighted_ma_grid(prices: pd.Series, period=20, bank: Optional[ind.IndicatorBank] = None) -> np.ndarray:
+        bank = _bank(prices, bank)
+        return (bank.values[:, None] > bank.stack('sma', *_params(period))).astype(np.int8)
+    
+    @staticmethod
+    def support_resistance_grid(prices: pd.Series, period=50, bank: Optional[ind.IndicatorBank] = None) -> np.ndarray:
+        bank = _bank(prices, bank)
+        (period,) = _params(period)
+        close = bank.values[:, None]
+        return ((close > bank.stack('rolling_min', period)) & (close < bank.stack('rolling_max', period))).astype(np.int8)
+    
+    @staticmethod
+    def trend_following_grid(prices: pd.Series, threshold=0.02, bank: Optional[ind.IndicatorBank] = None) -> np.ndarray:
+        bank = _bank(prices, bank)
+        (threshold,) = _params(threshold)
+        returns = bank.pct_change(1)[:, None]
+        return ((returns > threshold) & ~(returns < -threshold)).astype(np.int8)
+    
+    @staticmethod
+    def mean_reversion_grid(prices: pd.Series, period=20, threshold=1.5,
+                            bank: Optional[ind.IndicatorBank] = None) -> np.ndarray:
+        return _band_grid(_bank(prices, bank), *_params(period, threshold))
+    
+    @staticmethod
+    def williams_r_grid(prices: pd.Series, period=14, bank: Optional[ind.IndicatorBank] = None) -> np.ndarray:
+        bank = _bank(prices, bank)
+        (period,) = _params(period)
+        high, low = bank.stack('rolling_max', period), bank.stack('rolling_min', period)
+        wr = -100 * (high - bank.values[:, None]) / (high - low)
+        # Below -80 can never also be above -20, so the exit mask changes nothing
+        return (wr < -80).astype(np.int8)
+    
+    @staticmethod
+    def adx_trend_grid(prices: pd.Series, period=14, bank: Optional[ind.IndicatorBank] = None) -> np.ndarray:
+        bank = _bank(prices, bank)
+        trend = bank.stack('volatility', *_params(period))
+        # Column means skipping NaN, summed the way pandas does so ties break identically
+        valid = ~np.isnan(trend)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(valid, trend, 0).sum(axis=0) / valid.sum(axis=0)
+        return (trend > mean).astype(np.int8)
+    
+    @staticmethod
+    def fibonacci_retracement_grid(prices: pd.Series, period=50, bank: Optional[ind.IndicatorBank] = None) -> np.ndarray:
+        bank = _bank(prices, bank)
+        (period,) = _params(period)
+        high, low = bank.stack('rolling_max', period), bank.stack('rolling_min', period)
+        return (bank.values[:, None] < low + 0.382 * (high - low)).astype(np.int8)
+    
+    @staticmethod
+    def ichimoku_cloud_grid(prices: pd.Series, period1=9, period2=26,
+                            bank: Optional[ind.IndicatorBank] = None) -> np.ndarray:
+        bank = _bank(prices, bank)
+        period1, period2 = _params(period1, period2)
+        tenkan = (bank.stack('rolling_max', period1) + bank.stack('rolling_min', period1)) / 2
+        kijun = (bank.stack('rolling_max', period2) + bank.stack('rolling_min', period2)) / 2
+        return (tenkan > kijun).astype(np.int8)
+
+
+def _band_grid(bank: ind.IndicatorBank, period: np.ndarray, width: np.ndarray) -> np.ndarray:
+    """Bollinger / mean-reversion: long below ``sma - width * std``, flat above ``sma + width * std``."""
+    sma, std = bank.stack('sma', period), bank.stack('std', period)
+    close = bank.values[:, None]
+    return ((close < sma - width * std) & ~(close > sma + width * std)).astype(np.int8)
 
 
 def get_strategy(name: str) -> callable:
@@ -186,6 +331,11 @@ def get_strategy(name: str) -> callable:
     return strategies.get(name, TradingStrategies.sma_crossover)
 
 
+def get_strategy_grid(name: str) -> callable:
+    """The batched ``*_grid`` counterpart of ``get_strategy(name)``."""
+    return getattr(TradingStrategies, f"{get_strategy(name).__name__}_grid")
+
+
 STRATEGY_CONFIGS = {
     'SMA Crossover': {'short_window': (5, 50), 'long_window': (20, 200)},
     'EMA Crossover': {'short_window': (5, 50), 'long_window': (20, 200)},
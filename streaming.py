@@ -0,0 +1,488 @@
+"""
+Streaming Backtester - bar-by-bar incremental updates for paper trading and live dashboards
+"""
+import math
+from collections import deque
+from typing import Callable, Dict, Optional
+import numpy as np
+import pandas as pd
+
+import metrics
+from backtest import BacktestConfig
+
+NAN = math.nan
+
+
+def _div(a: float, b: float) -> float:
+    """IEEE division (inf / NaN on a zero divisor) to match the vectorized strategies."""
+    if b == 0:
+        return NAN if a == 0 or a != a else math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+class RollingMean:
+    """Incremental ``Series.rolling(window).mean()`` using pandas' compensated add/remove sums."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.nobs = 0
+        self.neg_ct = 0
+        self.total = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same = 0
+        self.prev_value = NAN
+
+    def update(self, x: float) -> float:
+        self.values.append(x)
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if old == old:
+                self.nobs -= 1
+                y = -old - self.comp_remove
+                s = self.total + y
+                self.comp_remove = s - self.total - y
+                self.total = s
+                if old < 0:
+                    self.neg_ct -= 1
+        if x == x:
+            self.nobs += 1
+            y = x - self.comp_add
+            s = self.total + y
+            self.comp_add = s - self.total - y
+            self.total = s
+            if x < 0:
+                self.neg_ct += 1
+            self.same = self.same + 1 if x == self.prev_value else 1
+            self.prev_value = x
+        if self.nobs < self.window or self.nobs == 0:
+            return NAN
+        result = self.total / self.nobs
+        if self.same >= self.nobs:
+            return self.prev_value
+        if (self.neg_ct == 0 and result < 0) or (self.neg_ct == self.nobs and result > 0):
+            return 0.0
+        return result
+
+
+class RollingStd:
+    """Incremental ``Series.rolling(window).std()`` using pandas' Welford updates."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.nobs = 0
+        self.mean = 0.0
+        self.ssqdm = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same = 0
+        self.prev_value = NAN
+
+    def update(self, x: float) -> float:
+        self.values.append(x)
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            if old == old:
+                self.nobs -= 1
+                if self.nobs:
+                    prev_mean = self.mean - self.comp_remove
+                    y = old - self.comp_remove
+                    d = y - self.mean
+                    self.comp_remove = d + self.mean - y
+                    self.mean -= d / self.nobs
+                    self.ssqdm -= (old - prev_mean) * (old - self.mean)
+                else:
+                    self.mean = 0.0
+                    self.ssqdm = 0.0
+        if x == x:
+            self.same = self.same + 1 if x == self.prev_value else 1
+            self.prev_value = x
+            self.nobs += 1
+            prev_mean = self.mean - self.comp_add
+            y = x - self.comp_add
+            d = y - self.mean
+            self.comp_add = d + self.mean - y
+            self.mean += d / self.nobs
+            self.ssqdm += (x - prev_mean) * (x - self.mean)
+        if self.nobs < self.window or self.nobs <= 1:
+            return NAN
+        if self.same >= self.nobs:
+            return 0.0
+        var = self.ssqdm / (self.nobs - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+
+class RollingExtreme:
+    """Incremental rolling max (``sign=1``) or min (``sign=-1``) over a monotonic deque."""
+
+    def __init__(self, window: int, sign: int = 1):
+        self.window = window
+        self.sign = sign
+        self.queue = deque()
+        self.t = -1
+        self.last_nan = -1
+
+    def update(self, x: float) -> float:
+        self.t += 1
+        if x != x:
+            self.last_nan = self.t
+        else:
+            while self.queue and self.sign * self.queue[-1][1] <= self.sign * x:
+                self.queue.pop()
+            self.queue.append((self.t, x))
+        while self.queue and self.queue[0][0] <= self.t - self.window:
+            self.queue.popleft()
+        if self.t < self.window - 1 or self.last_nan > self.t - self.window or not self.queue:
+            return NAN
+        return self.queue[0][1]
+
+
+class EWMean:
+    """Incremental ``Series.ewm(span=span).mean()`` (adjusted weights), following pandas' recurrence."""
+
+    def __init__(self, span: int):
+        self.old_wt_factor = 1. - 1. / (1. + (span - 1) / 2.0)
+        self.weighted = None
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def update(self, x: float) -> float:
+        is_obs = x == x
+        self.nobs += is_obs
+        if self.weighted is None:
+            self.weighted = x
+        elif self.weighted == self.weighted:
+            self.old_wt *= self.old_wt_factor
+            if is_obs:
+                if self.weighted != x:
+                    self.weighted = (self.old_wt * self.weighted + x) / (self.old_wt + 1.0)
+                self.old_wt += 1.0
+        elif is_obs:
+            self.weighted = x
+        return self.weighted if self.nobs >= 1 else NAN
+
+
+class Lag:
+    """The value ``period`` bars ago (``Series.shift(period)``)."""
+
+    def __init__(self, period: int):
+        self.values = deque(maxlen=period + 1)
+
+    def update(self, x: float) -> float:
+        self.values.append(x)
+        return self.values[0] if len(self.values) == self.values.maxlen else NAN
+
+
+# Each factory returns a step function price -> signal that mirrors the TradingStrategies
+# function of the same name, bar for bar.
+def _sma_crossover(short_window: int = 20, long_window: int = 50) -> Callable[[float], int]:
+    short, long = RollingMean(short_window), RollingMean(long_window)
+    return lambda p: int(short.update(p) > long.update(p))
+
+
+def _ema_crossover(short_window: int = 12, long_window: int = 26) -> Callable[[float], int]:
+    short, long = EWMean(short_window), EWMean(long_window)
+    return lambda p: int(short.update(p) > long.update(p))
+
+
+def _rsi_strategy(period: int = 14, oversold: int = 30, overbought: int = 70) -> Callable[[float], int]:
+    prev = Lag(1)
+    gains, losses = RollingMean(period), RollingMean(period)
+
+    def step(p):
+        delta = p - prev.update(p)
+        gain = gains.update(delta if delta > 0 else 0.0)
+        loss = losses.update(-delta if delta < 0 else -0.0)
+        rsi = 100 - _div(100, 1 + _div(gain, loss))
+        return int(rsi < oversold and not rsi > overbought)
+    return step
+
+
+def _macd_strategy(fast: int = 12, slow: int = 26, signal: int = 9) -> Callable[[float], int]:
+    ema_fast, ema_slow, signal_line = EWMean(fast), EWMean(slow), EWMean(signal)
+
+    def step(p):
+        macd = ema_fast.update(p) - ema_slow.update(p)
+        return int(macd > signal_line.update(macd))
+    return step
+
+
+def _bollinger_bands(period: int = 20, num_std: float = 2.0) -> Callable[[float], int]:
+    mean, std = RollingMean(period), RollingStd(period)
+
+    def step(p):
+        sma, sd = mean.update(p), std.update(p)
+        return int(p < sma - num_std * sd and not p > sma + num_std * sd)
+    return step
+
+
+def _stochastic_oscillator(period: int = 14, smooth: int = 3) -> Callable[[float], int]:
+    low, high, k_mean = RollingExtreme(period, -1), RollingExtreme(period, 1), RollingMean(smooth)
+
+    def step(p):
+        low_min, high_max = low.update(p), high.update(p)
+        k_smooth = k_mean.update(_div(100 * (p - low_min), high_max - low_min))
+        return int(k_smooth < 20 and not k_smooth > 80)
+    return step
+
+
+def _momentum(period: int = 10) -> Callable[[float], int]:
+    lag = Lag(period)
+    return lambda p: int(_div(p, lag.update(p)) - 1 > 0)
+
+
+def _roc_strategy(period: int = 12) -> Callable[[float], int]:
+    lag = Lag(period)
+
+    def step(p):
+        shifted = lag.update(p)
+        return int(_div(p - shifted, shifted) * 100 > 0)
+    return step
+
+
+def _atr_breakout(period: int = 14, multiplier: float = 2.0) -> Callable[[float], int]:
+    prev_close, atr_mean = Lag(1), RollingMean(period)
+    prev_upper = [NAN]
+
+    def step(p):
+        low = p * 0.98
+        prev = prev_close.update(p)
+        tr = NAN if prev != prev else max(p - low, max(abs(p - prev), abs(low - prev)))
+        upper = p + multiplier * atr_mean.update(tr)
+        signal = int(p > prev_upper[0])
+        prev_upper[0] = upper
+        return signal
+    return step
+
+
+def _volume_weighted_ma(period: int = 20) -> Callable[[float], int]:
+    mean = RollingMean(period)
+    return lambda p: int(p > mean.update(p))
+
+
+def _support_resistance(period: int = 50) -> Callable[[float], int]:
+    high, low = RollingExtreme(period, 1), RollingExtreme(period, -1)
+
+    def step(p):
+        rolling_high, rolling_low = high.update(p), low.update(p)
+        return int(p > rolling_low and p < rolling_high)
+    return step
+
+
+def _trend_following(threshold: float = 0.02) -> Callable[[float], int]:
+    lag = Lag(1)
+
+    def step(p):
+        ret = _div(p, lag.update(p)) - 1
+        return int(ret > threshold and not ret < -threshold)
+    return step
+
+
+def _mean_reversion(period: int = 20, threshold: float = 1.5) -> Callable[[float], int]:
+    mean, std = RollingMean(period), RollingStd(period)
+
+    def step(p):
+        sma, sd = mean.update(p), std.update(p)
+        return int(p < sma - threshold * sd and not p > sma + threshold * sd)
+    return step
+
+
+def _williams_r(period: int = 14) -> Callable[[float], int]:
+    high, low = RollingExtreme(period, 1), RollingExtreme(period, -1)
+
+    def step(p):
+        h, l = high.update(p), low.update(p)
+        wr = _div(-100 * (h - p), h - l)
+        return int(wr < -80 and not wr > -20)
+    return step
+
+
+def _fibonacci_retracement(period: int = 50) -> Callable[[float], int]:
+    high, low = RollingExtreme(period, 1), RollingExtreme(period, -1)
+
+    def step(p):
+        h, l = high.update(p), low.update(p)
+        return int(p < l + 0.382 * (h - l))
+    return step
+
+
+def _ichimoku_cloud(period1: int = 9, period2: int = 26) -> Callable[[float], int]:
+    high_1, low_1 = RollingExtreme(period1, 1), RollingExtreme(period1, -1)
+    high_2, low_2 = RollingExtreme(period2, 1), RollingExtreme(period2, -1)
+
+    def step(p):
+        tenkan = (high_1.update(p) + low_1.update(p)) / 2
+        kijun = (high_2.update(p) + low_2.update(p)) / 2
+        return int(tenkan > kijun)
+    return step
+
+
+# 'ADX Trend' compares against the mean over the whole history, so it has no incremental form
+STREAMING_STRATEGIES = {
+    'SMA Crossover': _sma_crossover,
+    'EMA Crossover': _ema_crossover,
+    'RSI': _rsi_strategy,
+    'MACD': _macd_strategy,
+    'Bollinger Bands': _bollinger_bands,
+    'Stochastic': _stochastic_oscillator,
+    'Momentum': _momentum,
+    'ROC': _roc_strategy,
+    'ATR Breakout': _atr_breakout,
+    'Volume MA': _volume_weighted_ma,
+    'Support/Resistance': _support_resistance,
+    'Trend Following': _trend_following,
+    'Mean Reversion': _mean_reversion,
+    'Williams %R': _williams_r,
+    'Fibonacci': _fibonacci_retracement,
+    'Ichimoku Cloud': _ichimoku_cloud,
+}
+
+
+# Net returns behind the streaming VaR/CVaR: ten years of daily bars
+TAIL_WINDOW = 2520
+
+
+class StreamingBacktester:
+    """
+    Stateful counterpart of ``QuantBacktester.backtest_strategy`` for one strategy. Each
+    ``update`` does O(1) work: it advances the strategy's indicator state, the position,
+    equity, running peak and metric accumulators. Fed the same series, signals, equity and
+    drawdown match the batch path exactly and the moment-based metrics to rounding. VaR/CVaR
+    come from the last ``tail_window`` net returns, kept in a bounded deque, so memory and
+    ``stats`` stay O(tail_window) however long the session runs (``None`` keeps every return).
+    """
+
+    def __init__(self, strategy_name: str, parameters: Optional[Dict] = None, config: BacktestConfig = None,
+                 tail_window: Optional[int] = TAIL_WINDOW):
+        if strategy_name not in STREAMING_STRATEGIES:
+            raise ValueError(f"Strategy '{strategy_name}' has no streaming implementation")
+        self.strategy_name = strategy_name
+        self.config = config or BacktestConfig()
+        self.step = STREAMING_STRATEGIES[strategy_name](**(parameters or {}))
+        self.bars = 0
+        self.last_price = NAN
+        self.last_timestamp = None
+        self.position = 0.0
+        self.signal = 0.0
+        self.entries = 0
+        self.growth = 1.0
+        self.entry_growth = 1.0
+        self.equity = float(self.config.initial_cash)
+        self.peak = NAN
+        self.max_dd = NAN
+        self.max_dd_date = None
+        # Running moments (Welford) of price returns, net returns and losing net returns
+        self.price_moments = [0, 0.0, 0.0]
+        self.net_moments = [0, 0.0, 0.0]
+        self.loss_moments = [0, 0.0, 0.0]
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        self.wins = 0
+        self.trades = 0
+        self.net_returns = deque(maxlen=tail_window)
+
+    @staticmethod
+    def _accumulate(moments: list, x: float) -> None:
+        moments[0] += 1
+        delta = x - moments[1]
+        moments[1] += delta / moments[0]
+        moments[2] += delta * (x - moments[1])
+
+    @staticmethod
+    def _std(moments: list) -> float:
+        return math.sqrt(moments[2] / (moments[0] - 1)) if moments[0] > 1 else 0.0
+
+    def update(self, price: float, timestamp=None) -> Dict:
+        """Consume one bar and return the live state after it."""
+        price = float(price)
+        signal = float(self.step(price))
+        if signal != 0 and self.signal == 0:
+            self.entries += 1
+        self.signal = signal
+        # Same rule as execution.limit_trades: flat from entry max_trades + 1 onwards
+        position = signal if self.entries <= self.config.max_trades else 0.0
+        if position != 0 and self.position == 0:
+            self.entry_growth = self.growth
+        if self.bars == 0:
+            ret = 0.0
+            net = NAN
+        else:
+            ret = _div(price, self.last_price) - 1
+            change = position - self.position
+            cost = abs(change) * self.config.trade_cost + max(-change, 0.0) * self.config.stt_tax
+            net = self.position * ret - cost
+        self._accumulate(self.price_moments, ret)
+
+        if net == net:
+            self.growth *= 1 + net
+            self.equity = self.growth * self.config.initial_cash
+            self.peak = self.equity if not self.peak >= self.equity else self.peak
+            drawdown = self.equity / self.peak - 1
+            if not drawdown >= self.max_dd:
+                self.max_dd = drawdown
+                self.max_dd_date = timestamp
+            self._accumulate(self.net_moments, net)
+            self.net_returns.append(net)
+            if net < 0:
+                self._accumulate(self.loss_moments, net)
+                self.loss_sum += net
+            elif net > 0:
+                self.gain_sum += net
+        else:
+            drawdown = NAN
+        if position == 0 and self.position != 0:
+            self.trades += 1
+            self.wins += int(self.growth / self.entry_growth > 1)
+
+        self.bars += 1
+        self.last_price = price
+        self.last_timestamp = timestamp
+        self.position = position
+        return {
+            'timestamp': timestamp,
+            'price': price,
+            'position': position,
+            'net_return': net,
+            'equity': self.equity,
+            'drawdown': drawdown,
+        }
+
+    def run(self, prices: pd.Series) -> Dict:
+        """Feed every bar of ``prices`` and return ``stats()``."""
+        for timestamp, price in prices.items():
+            self.update(price, timestamp)
+        return self.stats()
+
+    def stats(self) -> Dict:
+        """The scalar results of ``backtest_strategy`` for the bars seen so far."""
+        # An open trade counts as closed at the last bar, as in the batch trade log
+        trades, wins = self.trades, self.wins
+        if self.position != 0:
+            trades += 1
+            wins += int(self.growth / self.entry_growth > 1)
+        summary = metrics.from_moments(self.net_moments[1], self._std(self.net_moments), self._std(self.loss_moments),
+                                       self.max_dd, self.gain_sum, self.loss_sum, wins, trades)
+        net = np.asarray(self.net_returns)
+        var = np.percentile(net, 5) if len(net) else 0.0
+        tail = net[net <= var]
+        return {
+            'strategy_name': self.strategy_name,
+            'bars': self.bars,
+            'equity': self.equity,
+            'position': self.position,
+            'total_return': self.equity / self.config.initial_cash - 1 if self.bars > 1 else NAN,
+            'annual_return': self.price_moments[1] * 252,
+            'annual_volatility': self._std(self.price_moments) * np.sqrt(252) if self.bars > 1 else NAN,
+            'sharpe_ratio': float(summary['sharpe_ratio']),
+            'sortino_ratio': float(summary['sortino_ratio']),
+            'calmar_ratio': float(summary['calmar_ratio']),
+            'max_drawdown': self.max_dd,
+            'max_drawdown_date': self.max_dd_date,
+            'var_95': float(var),
+            'cvar_95': float(tail.mean()) if len(tail) else 0.0,
+            'profit_factor': float(summary['profit_factor']),
+            'win_rate': float(summary['win_rate']),
+            'total_trades': trades,
+        }
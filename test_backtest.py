@@ -75,6 +75,44 @@ class TestQuantBacktester:
         assert 'max_drawdown' in results
         assert 'win_rate' in results
 
+    def test_backtest_matrix_matches_single(self, sample_price_series):
+        backtester = QuantBacktester()
+        positions = pd.DataFrame({
+            w: TradingStrategies.sma_crossover(sample_price_series, w, 50) for w in (5, 10, 20)
+        })
+        matrix = backtester.backtest_matrix(sample_price_series, positions)
+        assert matrix['equity_curve'].shape == (len(sample_price_series), 3)
+        for w in positions.columns:
+            single = backtester.backtest_strategy(sample_price_series, positions[w])
+            row = matrix['stats'].loc[w]
+            for key in ['total_return', 'annual_return', 'annual_volatility', 'sharpe_ratio',
+                        'sortino_ratio', 'calmar_ratio', 'max_drawdown']:
+                assert np.isclose(row[key], single[key])
+            np.testing.assert_allclose(matrix['equity_curve'][1:, list(positions.columns).index(w)],
+                                       single['equity_curve'].values[1:])
+    
+    def test_backtest_matrix_per_ticker_prices(self, sample_price_series):
+        prices = pd.concat([sample_price_series, sample_price_series * 2], axis=1)
+        positions = np.ones((len(prices), 2))
+        stats = QuantBacktester().backtest_matrix(prices, positions, keep_series=False)['stats']
+        assert np.isclose(stats['total_return'].iloc[0], stats['total_return'].iloc[1])
+
+    
+    def test_compact_chunked_matrix_matches_default(self, sample_price_series):
+        from backtest import COMPACT_PRECISION
+        positions = (np.cumsum(np.random.rand(len(sample_price_series), 40) < 0.05, axis=0) % 2).astype(np.int8)
+        default = QuantBacktester().backtest_matrix(sample_price_series, positions)
+        # A budget this small forces one column per chunk
+        compact = QuantBacktester(BacktestConfig(compact=True, memory_budget_mb=0.01)).backtest_matrix(
+            sample_price_series, positions)
+        pd.testing.assert_frame_equal(compact['stats'], default['stats'])
+        assert compact['positions'].dtype == np.int8 and compact['equity_curve'].dtype == np.float32
+        np.testing.assert_array_equal(compact['positions'], default['positions'])
+        np.testing.assert_allclose(compact['equity_curve'], default['equity_curve'], rtol=COMPACT_PRECISION)
+        
+        single = QuantBacktester(BacktestConfig(compact=True)).backtest_strategy(
+            sample_price_series, TradingStrategies.sma_crossover(sample_price_series))
+        assert single['positions'].dtype == np.int8 and single['equity_curve'].dtype == np.float32
 
 class TestStrategies:
     def test_sma_crossover(self, sample_price_series):
@@ -101,6 +139,22 @@ class TestStrategies:
     def test_momentum(self, sample_price_series):
         signals = TradingStrategies.momentum(sample_price_series)
         assert len(signals) == len(sample_price_series)
+    
+    def test_grid_variants_match_single_series(self, sample_price_series):
+        import inspect
+        values = {'short_window': [5, 20], 'long_window': [30, 50], 'period': [5, 20], 'oversold': [30, 45],
+                  'overbought': [70, 40], 'fast': [5, 12], 'slow': [20, 26], 'signal': [5, 9], 'num_std': [1.0, 2.5],
+                  'smooth': [1, 3], 'multiplier': [1.0, 2.0], 'threshold': [0.01, 1.5], 'period1': [5, 9],
+                  'period2': [20, 26]}
+        for name, func in inspect.getmembers(TradingStrategies, inspect.isfunction):
+            if name.endswith('_grid'):
+                continue
+            params = {p: values[p] for p in inspect.signature(func).parameters if p != 'prices'}
+            positions = getattr(TradingStrategies, f'{name}_grid')(sample_price_series, **params)
+            assert positions.dtype == np.int8 and positions.shape == (len(sample_price_series), 2), name
+            for k in range(2):
+                expected = func(sample_price_series, **{p: v[k] for p, v in params.items()}).to_numpy()
+                assert (positions[:, k] == expected).all(), name
 
 
 class TestRiskMetrics:
@@ -140,6 +194,40 @@ class TestRiskMetrics:
         assert isinstance(pf, (int, float))
 
 
+class TestMetricsEngine:
+    def test_matches_reference_formulas(self, sample_price_series):
+        import metrics
+        returns = sample_price_series.pct_change()
+        clean = returns.dropna()
+        stats = metrics.compute(returns, sample_price_series)
+        var = np.percentile(clean, 5)
+        assert stats['sharpe_ratio'] == pytest.approx((returns.mean() * 252 - 0.04) / (returns.std() * np.sqrt(252)))
+        assert stats['sortino_ratio'] == pytest.approx(
+            (returns.mean() * 252 - 0.04) / (clean[clean < 0].std() * np.sqrt(252)))
+        assert stats['var'] == pytest.approx(var)
+        assert stats['cvar'] == pytest.approx(clean[clean <= var].mean())
+        assert stats['profit_factor'] == pytest.approx(clean[clean > 0].sum() / abs(clean[clean < 0].sum()))
+        running_max = sample_price_series.expanding().max()
+        assert stats['max_drawdown'] == pytest.approx(((sample_price_series - running_max) / running_max).min())
+
+    def test_column_wise_matches_vector(self, sample_price_series):
+        import metrics
+        returns = sample_price_series.pct_change().to_numpy()
+        matrix = metrics.compute(np.column_stack([returns, -returns, np.zeros_like(returns)]))
+        single = metrics.compute(-returns)
+        for key, value in single.items():
+            assert matrix[key][1] == pytest.approx(value)
+        assert matrix['sharpe_ratio'][2] == 0 and matrix['profit_factor'][2] == 0
+
+    def test_drawdown_counts_loss_on_first_bar(self):
+        import metrics
+        from montecarlo import MonteCarloSimulator
+        returns = np.array([-0.1, 0.0, 0.0, 0.01])
+        assert metrics.compute(returns)['max_drawdown'] == pytest.approx(-0.1)
+        paths = MonteCarloSimulator(n_paths=50, block_size=1, seed=0).simulate(np.array([-0.1, -0.1]))
+        np.testing.assert_allclose(paths['max_drawdown'], 0.9 ** 2 - 1)
+
+
 class TestFormatter:
     def test_format_currency(self):
         from utils import Formatter
@@ -159,6 +247,748 @@ class TestFormatter:
         assert "1.50" in result
 
 
+class TestPriceStore:
+    def test_roundtrip(self, tmp_path, sample_price_series):
+        from store import PriceStore
+        store = PriceStore(root=str(tmp_path))
+        data = sample_price_series.to_frame('close')
+        store.save('SBIN.NS', '1d', data, start=data.index[0])
+        loaded = store.load('SBIN.NS', '1d')
+        pd.testing.assert_frame_equal(loaded, data, check_freq=False)
+        assert store.covers('SBIN.NS', '1d', data.index[10])
+        assert not store.covers('SBIN.NS', '1d', None)
+    
+    def test_fetch_served_from_disk(self, tmp_path, monkeypatch, sample_price_series):
+        from data import DataFetcher
+        from store import PriceStore
+        calls = []
+        
+        def fake_download(ticker_key, period=None, interval='1d', start=None):
+            calls.append((period, start))
+            return sample_price_series.to_frame('close')
+        
+        monkeypatch.setattr(DataFetcher, 'store', PriceStore(root=str(tmp_path), refresh_seconds=3600))
+        monkeypatch.setattr(DataFetcher, '_download', staticmethod(fake_download))
+        first = DataFetcher.fetch_historical_data('SBIN', period='max')
+        second = DataFetcher.fetch_historical_data('SBIN', period='max')
+        assert len(calls) == 1
+        assert len(first) == len(second) == len(sample_price_series)
+    
+    def test_stale_store_fetches_tail_only(self, tmp_path, monkeypatch, sample_price_series):
+        from data import DataFetcher
+        from store import PriceStore
+        calls = []
+        
+        def fake_download(ticker_key, period=None, interval='1d', start=None):
+            calls.append((period, start))
+            if start is None:
+                return sample_price_series.iloc[:200].to_frame('close')
+            return sample_price_series[sample_price_series.index >= start].to_frame('close')
+        
+        monkeypatch.setattr(DataFetcher, 'store', PriceStore(root=str(tmp_path), refresh_seconds=0))
+        monkeypatch.setattr(DataFetcher, '_download', staticmethod(fake_download))
+        DataFetcher.fetch_historical_data('SBIN', period='max')
+        data = DataFetcher.fetch_historical_data('SBIN', period='max')
+        assert calls[1][0] is None and calls[1][1] == sample_price_series.index[199]
+        assert len(data) == len(sample_price_series)
+
+
+class TestProviders:
+    def test_synthetic_is_reproducible(self):
+        from providers import SyntheticProvider
+        provider = SyntheticProvider(seed=7, jump_intensity=5.0, bars=10000)
+        a = provider.download('SBIN.NS', interval='1h')
+        b = provider.download('SBIN.NS', interval='1h')
+        c = provider.download('INFY.NS', interval='1h')
+        assert len(a) == 10000
+        assert (a['close'] > 0).all()
+        pd.testing.assert_frame_equal(a, b)
+        assert not np.allclose(a['close'].values, c['close'].values)
+        # More daily bars than pandas' timestamp range holds
+        large = SyntheticProvider(seed=7, bars=1_000_000).download('X', 'max', '1d')
+        assert len(large) == 1_000_000 and large.index.is_monotonic_increasing
+    
+    def test_local_csv_provider(self, tmp_path, sample_price_series):
+        from providers import LocalFileProvider
+        sample_price_series.rename('Close').to_csv(tmp_path / 'SBIN.NS.csv', index_label='Date')
+        data = LocalFileProvider(str(tmp_path)).download('SBIN.NS', period='max')
+        assert list(data.columns) == ['close']
+        assert len(data) == len(sample_price_series)
+        assert LocalFileProvider(str(tmp_path)).download('TCS.NS', period='max').empty
+    
+    def test_fetcher_uses_provider(self, monkeypatch):
+        from data import DataFetcher
+        from providers import SyntheticProvider
+        monkeypatch.setattr(DataFetcher, 'provider', SyntheticProvider(seed=1))
+        data = DataFetcher.fetch_historical_data('SBIN', period='1y')
+        assert 240 <= len(data) <= 270
+        assert not DataFetcher.fetch_intraday_data('SBIN', days=5).empty
+
+
+class TestFetchMany:
+    def test_aligned_matrix_one_round_trip(self, monkeypatch):
+        from data import DataFetcher
+        from providers import SyntheticProvider
+        
+        class CountingProvider(SyntheticProvider):
+            calls = 0
+            
+            def download_many(self, tickers, period=None, interval='1d', start=None):
+                CountingProvider.calls += 1
+                return {t: self.download(t, period, interval, start).iloc[len(t):] for t in tickers}
+        
+        monkeypatch.setattr(DataFetcher, 'provider', CountingProvider(seed=3))
+        wide = DataFetcher.fetch_many(['SBIN', 'INFY', 'SBIN', 'NIFTY50'], period='1y')
+        assert CountingProvider.calls == 1
+        assert list(wide.columns) == ['SBIN', 'INFY', 'NIFTY50']
+        assert wide.index.is_monotonic_increasing
+        assert wide.isna().sum().tolist() == [2, 2, 0]
+        assert wide.to_numpy().shape == (len(wide), 3)
+
+
+class TestOptimizer:
+    def test_expand_grid_respects_constraints(self):
+        from optimizer import expand_grid
+        grid = expand_grid('SMA Crossover', steps={'short_window': 5, 'long_window': 20})
+        assert (grid['short_window'] < grid['long_window']).all()
+        assert grid['short_window'].dtype.kind == 'i'
+        floats = expand_grid('Bollinger Bands')
+        assert np.isclose(floats['num_std'].max(), 3.0)
+
+    def test_rejects_bad_steps_and_top_n(self, sample_price_series):
+        from fastapi.testclient import TestClient
+        import api
+        from optimizer import GridSearchOptimizer, expand_grid
+        for steps in ({'num_std': 0}, {'num_std': -0.5}, {'num_std': 1e-9}, {'period': 0}):
+            with pytest.raises(ValueError):
+                expand_grid('Bollinger Bands', steps=steps)
+        with pytest.raises(ValueError):
+            GridSearchOptimizer().optimize(sample_price_series, 'Momentum', top_n=0)
+        with TestClient(api.app) as client:
+            for payload in ({'steps': {'num_std': 0}}, {'top_n': 0}):
+                response = client.post('/optimize', json={'ticker': 'SBIN', 'strategy_name': 'Bollinger Bands', **payload})
+                assert response.status_code == 400
+
+    def test_batched_positions_match_strategies(self, sample_price_series):
+        from optimizer import expand_grid, POSITION_BUILDERS, IndicatorBank
+        from strategies import get_strategy
+        bank = IndicatorBank(sample_price_series)
+        for name, builder in POSITION_BUILDERS.items():
+            grid = expand_grid(name, steps={p: 10 for p in ['period', 'short_window', 'long_window', 'fast',
+                                                            'slow', 'signal', 'oversold', 'overbought']})
+            positions = builder(bank, grid)
+            for k, params in enumerate(grid.head(5).to_dict('records')):
+                expected = get_strategy(name)(sample_price_series, **params).values
+                assert (positions[:, k] == expected).all(), name
+    
+    def test_optimize_ranks_by_metric(self, sample_price_series):
+        from optimizer import GridSearchOptimizer
+        ranked = GridSearchOptimizer().optimize(sample_price_series, 'RSI', metric='calmar_ratio', top_n=10,
+                                                steps={'oversold': 5, 'overbought': 5})
+        assert len(ranked) == 10
+        assert ranked['calmar_ratio'].is_monotonic_decreasing
+
+
+class TestWalkForward:
+    def test_split_windows(self):
+        from walkforward import split_windows
+        assert split_windows(10, 4, 3) == [(0, 4, 7), (3, 7, 10)]
+        assert split_windows(11, 4, 3, anchored=True) == [(0, 4, 7), (0, 7, 10), (0, 10, 11)]
+
+    def test_out_of_sample_returns_match_single_backtests(self, sample_price_series):
+        from walkforward import WalkForwardOptimizer
+        from strategies import get_strategy
+        steps = {'short_window': 10, 'long_window': 30}
+        result = WalkForwardOptimizer(max_workers=1).run(sample_price_series, 'SMA Crossover', train_size=100,
+                                                          test_size=50, steps=steps)
+        windows = result['windows']
+        assert len(windows) == 4
+        assert len(result['equity_curve']) == len(sample_price_series) - 100
+        import execution
+        config = BacktestConfig()
+        held = 0.0
+        for row in windows.to_dict('records'):
+            params = {'short_window': row['short_window'], 'long_window': row['long_window']}
+            single = QuantBacktester().backtest_strategy(
+                sample_price_series, get_strategy('SMA Crossover')(sample_price_series, **params))
+            start = sample_price_series.index.get_loc(row['test_start'])
+            end = sample_price_series.index.get_loc(row['test_end']) + 1
+            expected = single['returns'].iloc[start:end].copy()
+            # The switch from the previous window's position (flat at first) is paid on the first bar
+            entry = single['positions'].iloc[start - 1]
+            expected.iloc[0] -= execution.fill_costs(np.array([held, entry]), config.trade_cost, config.stt_tax)[1]
+            held = single['positions'].iloc[end - 1]
+            np.testing.assert_allclose(result['returns'][row['test_start']:row['test_end']], expected)
+
+
+class TestMonteCarlo:
+    def test_indices_resample_whole_blocks(self):
+        import montecarlo as mc
+        rng = np.random.default_rng(0)
+        idx = mc.block_indices(100, 50, 10, rng)
+        assert idx.shape == (100, 50)
+        steps = np.diff(idx, axis=0) % 100
+        assert (steps[np.arange(99) % 10 != 9] == 1).all()
+        stationary = mc.stationary_indices(100, 50, 10, rng)
+        assert stationary.shape == (100, 50) and stationary.min() >= 0 and stationary.max() < 100
+
+    def test_chunked_simulation_is_reproducible(self, sample_price_series):
+        from montecarlo import MonteCarloSimulator
+        returns = sample_price_series.pct_change()
+        paths = MonteCarloSimulator(n_paths=1000, chunk_size=300, seed=7).simulate(returns)
+        again = MonteCarloSimulator(n_paths=1000, chunk_size=300, seed=7).simulate(returns)
+        np.testing.assert_array_equal(paths['sharpe_ratio'], again['sharpe_ratio'])
+        assert (paths['max_drawdown'] <= 0).all()
+        summary = MonteCarloSimulator(n_paths=1000, seed=7).summarize(returns)
+        sharpe = summary['metrics']['sharpe_ratio']
+        assert sharpe['lower'] <= sharpe['p50'] <= sharpe['upper']
+
+    def test_chunks_follow_memory_budget(self, sample_price_series):
+        from montecarlo import MonteCarloSimulator, WORKING_BYTES_PER_CELL
+        simulator = MonteCarloSimulator(n_paths=100, chunk_size=2000, memory_budget_mb=1, seed=7)
+        assert simulator.chunk_paths(1000) == 2 ** 20 // (1000 * WORKING_BYTES_PER_CELL)
+        assert simulator.chunk_paths(10 ** 9) == 1
+        assert simulator.chunk_paths(5) == 2000
+        paths = simulator.simulate(sample_price_series.pct_change())
+        assert len(paths['sharpe_ratio']) == 100 and np.isfinite(paths['sharpe_ratio']).all()
+
+
+class TestPortfolio:
+    @pytest.fixture
+    def price_matrix(self, sample_price_series):
+        rng = np.random.default_rng(1)
+        return pd.DataFrame({
+            f'A{i}': 100 * np.cumprod(1 + rng.normal(0.0005, 0.01, len(sample_price_series)))
+            for i in range(5)
+        }, index=sample_price_series.index)
+
+    def test_buy_and_hold_without_costs(self, price_matrix):
+        from portfolio import PortfolioBacktester
+        config = BacktestConfig(brokerage_fee=0, stt_tax=0, slippage=0)
+        weights = pd.DataFrame(0.2, index=price_matrix.index, columns=price_matrix.columns)
+        results = PortfolioBacktester(config).run(price_matrix, weights=weights, threshold=1.0)
+        expected = (price_matrix.iloc[-1] / price_matrix.iloc[0]).mean() - 1
+        assert results['rebalances'] == 1
+        assert results['total_return'] == pytest.approx(expected)
+
+    def test_rebalancing_modes_and_costs(self, price_matrix):
+        from portfolio import PortfolioBacktester
+        weights = pd.DataFrame(0.2, index=price_matrix.index, columns=price_matrix.columns)
+        backtester = PortfolioBacktester()
+        daily = backtester.run(price_matrix, weights=weights)
+        monthly = backtester.run(price_matrix, weights=weights, rebalance='M')
+        drift = backtester.run(price_matrix, weights=weights, threshold=0.02)
+        assert daily['rebalances'] == len(price_matrix)
+        assert monthly['rebalances'] == price_matrix.index.to_period('M').nunique()
+        assert drift['rebalances'] < daily['rebalances']
+        assert daily['costs'].sum() > monthly['costs'].sum() > 0
+        np.testing.assert_allclose(monthly['weights'].sum(axis=1), 1.0)
+
+    def test_signals_equal_weight_active_assets(self, price_matrix):
+        from portfolio import signals_to_weights
+        signals = pd.DataFrame({'A': [1, 1, 0], 'B': [1, 0, 0]})
+        weights = signals_to_weights(signals)
+        assert weights.values.tolist() == [[0.5, 0.5], [1.0, 0.0], [0.0, 0.0]]
+
+
+class TestBatchRunner:
+    def test_results_in_order_with_errors(self, sample_price_series):
+        from batch import BatchRunner
+        prices = {('SBIN', '5y'): sample_price_series}
+        items = [
+            {'ticker': 'SBIN', 'period': '5y', 'strategy_name': 'RSI', 'parameters': {}, 'initial_cash': 100000},
+            {'ticker': 'TCS', 'period': '5y', 'strategy_name': 'RSI', 'parameters': {}, 'initial_cash': 100000},
+            {'ticker': 'SBIN', 'period': '5y', 'strategy_name': 'MACD', 'parameters': {'bogus': 1},
+             'initial_cash': 100000},
+            {'ticker': 'SBIN', 'period': '5y', 'strategy_name': 'Momentum', 'parameters': {'period': 5},
+             'initial_cash': 50000},
+        ]
+        outcomes = BatchRunner(max_workers=2, chunksize=1).run(items, prices)
+        assert [o['ok'] for o in outcomes] == [True, False, False, True]
+        assert 'No data' in outcomes[1]['error']
+        inline = BatchRunner(max_workers=1).run(items, prices)
+        assert outcomes[3]['result'] == inline[3]['result']
+
+    
+    def test_iter_results_bounded_window(self, sample_price_series):
+        from batch import BatchRunner
+        prices = {('SBIN', '5y'): sample_price_series}
+        items = [{'ticker': 'SBIN', 'period': '5y', 'strategy_name': 'RSI', 'parameters': {},
+                  'initial_cash': 1000 * (i + 1)} for i in range(6)]
+        outcomes = dict(BatchRunner(max_workers=2).iter_results(items, prices, max_in_flight=1))
+        assert sorted(outcomes) == list(range(6))
+        assert all(outcome['ok'] for outcome in outcomes.values())
+    
+    def test_stream_endpoint(self, monkeypatch):
+        import json
+        from fastapi.testclient import TestClient
+        from data import DataFetcher
+        from providers import SyntheticProvider
+        import api
+        monkeypatch.setattr(DataFetcher, 'provider', SyntheticProvider(seed=6, bars=300))
+        monkeypatch.setattr(DataFetcher, 'store', None)
+        batch = [{'ticker': 'SBIN', 'strategy_name': 'RSI'},
+                 {'ticker': 'SBIN', 'strategy_name': 'RSI', 'parameters': {'bogus': 1}}]
+        with TestClient(api.app) as client:
+            with client.stream('POST', '/backtest/batch', params={'stream': True}, json=batch) as response:
+                assert response.headers['content-type'] == 'application/x-ndjson'
+                lines = sorted((json.loads(line) for line in response.iter_lines() if line), key=lambda l: l['index'])
+        assert [line['index'] for line in lines] == [0, 1]
+        assert 'sharpe_ratio' in lines[0] and 'error' in lines[1]
+        # Non-finite metrics are written as null, not as bare NaN
+        line = api.ndjson_line({'index': 0, 'sharpe_ratio': float('nan'), 'calmar_ratio': float('inf')})
+        assert json.loads(line) == {'index': 0, 'sharpe_ratio': None, 'calmar_ratio': None}
+
+class TestJobs:
+    @pytest.fixture
+    def synthetic_provider(self, monkeypatch):
+        from data import DataFetcher
+        from providers import SyntheticProvider
+        monkeypatch.setattr(DataFetcher, 'provider', SyntheticProvider(seed=5))
+    
+    def _items(self, n):
+        return [{'ticker': 'SBIN', 'period': '1y', 'strategy_name': 'RSI', 'parameters': {'period': 5 + i},
+                 'initial_cash': 100000} for i in range(n)]
+    
+    def _wait(self, job, timeout=10):
+        import time
+        deadline = time.time() + timeout
+        while job.status not in ('completed', 'cancelled', 'failed') and time.time() < deadline:
+            time.sleep(0.02)
+    
+    def test_job_completes_and_survives_restart(self, tmp_path, synthetic_provider):
+        from batch import BatchRunner
+        from jobs import JobManager
+        db = str(tmp_path / 'jobs.db')
+        manager = JobManager(db_path=db, runner=BatchRunner(max_workers=1))
+        job = manager.submit(self._items(4) + [dict(self._items(1)[0], parameters={'bogus': 1})])
+        self._wait(job)
+        snapshot = job.snapshot()
+        assert snapshot['status'] == 'completed'
+        assert [r['index'] for r in snapshot['results']] == [0, 1, 2, 3]
+        assert snapshot['errors'][0]['index'] == 4
+        manager.shutdown()
+        
+        restored = JobManager(db_path=db, runner=BatchRunner(max_workers=1)).get(job.id)
+        assert restored.snapshot()['results'] == snapshot['results']
+    
+    def test_unfinished_job_resumes(self, tmp_path, synthetic_provider):
+        from batch import BatchRunner
+        from jobs import Job, JobStore, JobManager
+        db = str(tmp_path / 'jobs.db')
+        job = Job(self._items(3), status='running')
+        job.results[0] = {'total_return': 123.0}
+        JobStore(db).save(job)
+        manager = JobManager(db_path=db, runner=BatchRunner(max_workers=1))
+        resumed = manager.get(job.id)
+        self._wait(resumed)
+        assert resumed.status == 'completed'
+        assert resumed.results[0] == {'total_return': 123.0}
+        assert resumed.completed == 3
+    
+    def test_cancel(self, synthetic_provider):
+        from batch import BatchRunner
+        from jobs import JobManager
+        manager = JobManager(runner=BatchRunner(max_workers=1))
+        job = manager.submit(self._items(200))
+        manager.cancel(job.id)
+        self._wait(job)
+        assert job.status == 'cancelled'
+        assert job.completed < 200
+    
+    def test_finished_jobs_are_evicted(self, tmp_path, synthetic_provider):
+        from batch import BatchRunner
+        from jobs import JobManager
+        manager = JobManager(max_concurrent=1, runner=BatchRunner(max_workers=1), max_finished=1)
+        first, second = manager.submit(self._items(1)), manager.submit(self._items(1))
+        self._wait(first), self._wait(second)
+        assert manager.get(first.id) is None and manager.get(second.id) is second
+        
+        stored = JobManager(db_path=str(tmp_path / 'jobs.db'), runner=BatchRunner(max_workers=1), ttl=0)
+        job = stored.submit(self._items(2))
+        self._wait(job)
+        stored.shutdown()
+        restored = stored.get(job.id)
+        assert job.id not in stored.jobs
+        assert restored.status == 'completed' and restored.snapshot()['results'] == job.snapshot()['results']
+
+
+class TestResultCache:
+    def test_lru_eviction_and_counters(self):
+        from cache import ResultCache
+        cache = ResultCache(max_entries=2, expiry=lambda: float('inf'))
+        cache.set('a', 1)
+        cache.set('b', 2)
+        assert cache.get('a') == 1
+        cache.set('c', 3)
+        assert cache.get('b') is None
+        assert cache.get('c') == 3
+        stats = cache.stats()
+        assert (stats['hits'], stats['misses'], stats['evictions'], stats['size']) == (2, 1, 1, 2)
+    
+    def test_entries_expire(self):
+        from cache import ResultCache
+        now = [1000.0]
+        cache = ResultCache(expiry=lambda: now[0] + 60, clock=lambda: now[0])
+        cache.set('a', 1)
+        now[0] += 59
+        assert cache.get('a') == 1
+        now[0] += 2
+        assert cache.get('a') is None
+    
+    def test_key_depends_on_payload_and_data(self, sample_price_series):
+        from cache import make_key, series_version
+        version = series_version(sample_price_series)
+        payload = {'ticker': 'SBIN', 'parameters': {'a': 1, 'b': 2}}
+        assert make_key(payload, version) == make_key({'parameters': {'b': 2, 'a': 1}, 'ticker': 'SBIN'}, version)
+        assert make_key(payload, version) != make_key(payload, series_version(sample_price_series.iloc[:-1]))
+    
+    def test_next_market_close(self):
+        from datetime import datetime
+        from cache import next_market_close, MARKET_TZ
+        friday_evening = datetime(2024, 1, 5, 16, 0, tzinfo=MARKET_TZ)
+        close = datetime.fromtimestamp(next_market_close(friday_evening), MARKET_TZ)
+        assert (close.weekday(), close.hour, close.minute) == (0, 15, 30)
+
+
+class TestProfiling:
+    @pytest.fixture
+    def client(self, monkeypatch):
+        from fastapi.testclient import TestClient
+        from data import DataFetcher
+        from providers import SyntheticProvider
+        import api
+        monkeypatch.setattr(DataFetcher, 'provider', SyntheticProvider(seed=3, bars=300))
+        api.result_cache.clear()
+        with TestClient(api.app) as client:
+            yield client
+    
+    def test_histogram_renders_cumulative_buckets(self):
+        from profiling import Histogram
+        histogram = Histogram('latency_seconds', 'Latency.', ('stage',), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value, stage='fetch')
+        text = histogram.render()
+        assert 'latency_seconds_bucket{stage="fetch",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{stage="fetch",le="1.0"} 2' in text
+        assert 'latency_seconds_bucket{stage="fetch",le="+Inf"} 3' in text
+        assert 'latency_seconds_count{stage="fetch"} 3' in text
+    
+    def test_server_timing_and_metrics(self, client):
+        response = client.post('/backtest', json={'ticker': 'SBIN', 'strategy_name': 'RSI'})
+        assert response.status_code == 200
+        stages = [part.split(';')[0] for part in response.headers['Server-Timing'].split(', ')]
+        assert stages == ['cache', 'fetch', 'signals', 'backtest', 'serialize', 'total']
+        metrics_text = client.get('/metrics').text
+        assert 'backtest_stage_duration_seconds_count{stage="backtest"}' in metrics_text
+        assert 'http_request_duration_seconds_bucket{method="POST",route="/backtest",status="200"' in metrics_text
+    
+    def test_profile_flag(self, client, monkeypatch):
+        import api
+        request = {'ticker': 'INFY', 'strategy_name': 'RSI'}
+        # Off unless API_ALLOW_PROFILING is set: the flag is ignored
+        assert 'function calls' not in client.post('/backtest?profile=cprofile', json=request).text
+        monkeypatch.setattr(api, 'ALLOW_PROFILING', True)
+        response = client.post('/backtest?profile=cprofile', json=request)
+        assert response.status_code == 200
+        assert 'function calls' in response.text
+        assert client.post('/backtest?profile=bogus', json={'ticker': 'INFY', 'strategy_name': 'RSI'}).status_code == 400
+
+
+class TestStartup:
+    def test_import_api_is_lazy(self):
+        import os, subprocess, sys
+        code = "import sys, api; print(sorted({'pandas', 'numba', 'scipy', 'backtest'} & set(sys.modules)))"
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        assert out.stdout.strip() == '[]'
+    
+    def test_ready_warm_up(self, monkeypatch):
+        import time
+        from fastapi.testclient import TestClient
+        import api
+        monkeypatch.setattr(api, 'warmup_state', {'status': 'idle', 'steps': {}})
+        with TestClient(api.app) as client:
+            assert client.get('/ready').status_code == 200
+            response = client.get('/ready?warm=true')
+            for _ in range(300):
+                if response.status_code == 200:
+                    break
+                assert response.json()['status'] == 'warming'
+                time.sleep(0.1)
+                response = client.get('/ready?warm=true')
+        body = response.json()
+        assert body['warmup']['status'] == 'warm'
+        assert {'imports', 'backtest'} <= set(body['warmup']['steps'])
+
+
+class TestDownsample:
+    def test_keeps_extremes_and_bounds(self):
+        from downsample import downsample_indices
+        y = np.cumsum(np.random.default_rng(0).normal(size=50_000))
+        for method in ('lttb', 'minmax'):
+            idx = downsample_indices(y, 500, method)
+            assert len(idx) <= 504
+            assert (np.diff(idx) > 0).all()
+            assert {0, len(y) - 1, int(np.argmax(y)), int(np.argmin(y))} <= set(idx.tolist())
+        np.testing.assert_array_equal(downsample_indices(y[:100], 500), np.arange(100))
+        with pytest.raises(ValueError):
+            downsample_indices(y, 500, 'bogus')
+    
+    def test_ohlc_buckets(self):
+        from downsample import downsample_ohlc
+        close = np.cumsum(np.random.default_rng(1).normal(size=10_000)) + 500
+        frame = pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'close': close},
+                             index=pd.date_range('2020-01-01', periods=len(close), freq='min'))
+        small = downsample_ohlc(frame, 200)
+        assert len(small) == 200
+        assert small['High'].max() == frame['High'].max()
+        assert small['Low'].min() == frame['Low'].min()
+        assert small['close'].iloc[-1] == frame['close'].iloc[-1]
+    
+    def test_series_endpoint(self, monkeypatch):
+        from fastapi.testclient import TestClient
+        from data import DataFetcher
+        from providers import SyntheticProvider
+        import api
+        monkeypatch.setattr(DataFetcher, 'provider', SyntheticProvider(seed=4, bars=3000))
+        api.result_cache.clear()
+        with TestClient(api.app) as client:
+            request_id = client.post('/backtest', json={'ticker': 'SBIN', 'strategy_name': 'RSI'}).json()['request_id']
+            body = client.get(f'/backtest/{request_id}/series', params={'points': 100}).json()
+            assert body['total_points'] == 3000
+            assert set(body['series']) == {'price', 'equity_curve', 'drawdown'}
+            assert all(len(s['values']) <= 104 for s in body['series'].values())
+            assert client.get('/backtest/REQ_missing/series').status_code == 404
+            assert client.get(f'/backtest/{request_id}/series', params={'points': 1}).status_code == 400
+
+
+class TestColumnar:
+    @pytest.mark.parametrize('fmt', ['npz', 'arrow'])
+    def test_round_trip(self, sample_price_series, fmt):
+        import columnar
+        if fmt == 'arrow' and not columnar.arrow_available():
+            pytest.skip('pyarrow not installed')
+        results = QuantBacktester().backtest_strategy(sample_price_series, TradingStrategies.rsi_strategy(sample_price_series))
+        frame = columnar.series_frame(sample_price_series, columnar.series_arrays(results))
+        table, meta = columnar.decode(columnar.encode([frame, frame.iloc[:10]], {'total': 2}, fmt), fmt)
+        assert meta == {'total': 2}
+        assert table['item'].tolist() == [0] * len(frame) + [1] * 10
+        np.testing.assert_array_equal(table['equity_curve'].to_numpy()[:len(frame)], results['equity_curve'].to_numpy())
+        assert (pd.DatetimeIndex(table['timestamp'][:len(frame)]) == sample_price_series.index).all()
+    
+    def test_batch_endpoint(self, monkeypatch):
+        from fastapi.testclient import TestClient
+        from data import DataFetcher
+        from providers import SyntheticProvider
+        import api, columnar
+        monkeypatch.setattr(DataFetcher, 'provider', SyntheticProvider(seed=5, bars=400))
+        monkeypatch.setattr(DataFetcher, 'store', None)
+        batch = [{'ticker': ticker, 'strategy_name': 'SMA Crossover'} for ticker in ('SBIN', 'INFY')]
+        with TestClient(api.app) as client:
+            json_body = client.post('/backtest/batch', json=batch).json()
+            response = client.post('/backtest/batch', params={'format': 'npz'}, json=batch)
+            assert response.headers['content-type'] == columnar.MEDIA_TYPES['npz']
+            table, meta = columnar.decode(response.content, 'npz')
+            assert table.groupby('item').size().tolist() == [400, 400]
+            assert [r['total_return'] for r in meta['results']] == [r['total_return'] for r in json_body['results']]
+            assert client.post('/backtest', params={'format': 'xml'},
+                               json=batch[0]).status_code == 400
+
+
+class TestIndicatorCache:
+    def test_primitives_shared_across_strategies(self, sample_price_series):
+        import indicators as ind
+        prices = sample_price_series.copy()
+        TradingStrategies.bollinger_bands(prices)
+        misses = ind.cache.misses
+        TradingStrategies.mean_reversion(prices)
+        TradingStrategies.volume_weighted_ma(prices)
+        assert ind.cache.misses == misses
+        assert ind.rolling_mean(prices, 20) is ind.rolling_mean(prices, 20)
+    
+    def test_entries_released_with_series(self, sample_price_series):
+        import gc
+        import indicators as ind
+        prices = sample_price_series.copy()
+        ind.rolling_std(prices, 10)
+        gc.collect()
+        before = ind.cache.stats()['series']
+        del prices
+        gc.collect()
+        assert ind.cache.stats()['series'] == before - 1
+
+
+class TestKernels:
+    def test_backtest_loop_matches_pandas(self, sample_price_series):
+        signals = TradingStrategies.bollinger_bands(sample_price_series)
+        expected = QuantBacktester().backtest_strategy(sample_price_series, signals, "Ref")
+        results = QuantBacktester(BacktestConfig(engine='numba')).backtest_strategy(sample_price_series, signals, "Fast")
+        pd.testing.assert_series_equal(results['equity_curve'], expected['equity_curve'], check_names=False)
+        for key in ['total_return', 'sharpe_ratio', 'sortino_ratio', 'calmar_ratio', 'max_drawdown', 'var_95',
+                    'win_rate']:
+            assert results[key] == pytest.approx(expected[key], rel=1e-9, nan_ok=True)
+        assert results['max_drawdown_date'] == expected['max_drawdown_date']
+        assert results['total_trades'] == expected['total_trades']
+        
+        # Long from bar 0 and down on bar 1: the drawdown peak is bar 1's equity, not the initial cash
+        falling = pd.Series([100.0, 99.0, 99.5, 98.0, 101.0], index=pd.date_range('2020-01-01', periods=5))
+        ones = pd.Series(1, index=falling.index)
+        fast = QuantBacktester(BacktestConfig(engine='numba')).backtest_strategy(falling, ones)
+        assert fast['max_drawdown'] == pytest.approx(QuantBacktester().backtest_strategy(falling, ones)['max_drawdown'])
+
+    def test_numpy_fallback_matches_kernel(self, sample_price_series):
+        import kernels
+        prices = sample_price_series.to_numpy()
+        signals = TradingStrategies.momentum(sample_price_series).to_numpy(dtype=float)
+        args = (prices, signals, 0.001, 0.0001, 100000.0)
+        for fast, ref in zip(kernels.backtest_loop(*args), kernels._backtest_loop_numpy(*args)):
+            np.testing.assert_allclose(fast, ref, rtol=1e-12)
+
+    def test_matrix_stats_match_numpy_path(self, sample_price_series):
+        positions = np.column_stack([
+            TradingStrategies.sma_crossover(sample_price_series, s, 50).to_numpy(dtype=float) for s in (5, 10, 20)
+        ])
+        expected = QuantBacktester().backtest_matrix(sample_price_series, positions, keep_series=False)['stats']
+        stats = QuantBacktester(BacktestConfig(engine='numba')).backtest_matrix(
+            sample_price_series, positions, keep_series=False)['stats']
+        pd.testing.assert_frame_equal(stats, expected, check_dtype=False, rtol=1e-9)
+
+    def test_rolling_kernels_match_pandas(self, sample_price_series):
+        import kernels
+        if not kernels.NUMBA_AVAILABLE:
+            pytest.skip("numba not installed")
+        values = sample_price_series.to_numpy().copy()
+        values[[30, 31, 90]] = np.nan
+        frame = pd.Series(values).rolling(window=20)
+        np.testing.assert_allclose(kernels.rolling_mean(values, 20), frame.mean(), rtol=1e-12)
+        np.testing.assert_allclose(kernels.rolling_std(values, 20), frame.std(), rtol=1e-9)
+        np.testing.assert_array_equal(kernels.rolling_max(values, 20), frame.max())
+        np.testing.assert_array_equal(kernels.rolling_min(values, 20), frame.min())
+
+    def test_rolling_fallback_without_numba(self, monkeypatch, sample_price_series):
+        import kernels
+        monkeypatch.setattr(kernels, 'NUMBA_AVAILABLE', False)
+        for name in ('_rolling_mean_jit', '_rolling_std_jit', '_rolling_extreme_jit'):
+            monkeypatch.setattr(kernels, name, None)
+        frame = sample_price_series.rolling(window=20)
+        for name in ('mean', 'std', 'max', 'min'):
+            result = getattr(kernels, f'rolling_{name}')(sample_price_series.to_numpy(), 20)
+            np.testing.assert_allclose(result, getattr(frame, name)().to_numpy())
+
+    def test_parallel_kernel_off_main_thread_exits(self):
+        import os, subprocess, sys
+        import kernels
+        if not kernels.NUMBA_AVAILABLE:
+            pytest.skip("numba not installed")
+        code = ("import threading, numpy as np, kernels\n"
+                "args = (np.linspace(1.0, 2.0, 50), np.ones((50, 4)), 0.001, 0.001, 1.0)\n"
+                "thread = threading.Thread(target=kernels.matrix_stats, args=args)\n"
+                "thread.start(); thread.join()\n")
+        subprocess.run([sys.executable, '-c', code], check=True, timeout=60,
+                       cwd=os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestExecution:
+    def test_trade_log_matches_positions(self, sample_price_series):
+        signals = TradingStrategies.sma_crossover(sample_price_series, 10, 30)
+        results = QuantBacktester().backtest_strategy(sample_price_series, signals, "SMA")
+        trades = results['trades']
+        positions = results['positions'].to_numpy()
+        assert results['total_trades'] == len(trades)
+        assert (positions[trades['entry']] != 0).all()
+        assert (trades['exit'] >= trades['entry']).all()
+        growth = (1 + results['returns'].fillna(0)).cumprod().to_numpy()
+        first = trades[0]
+        expected = growth[first['exit']] / (growth[first['entry'] - 1] if first['entry'] else 1.0) - 1
+        assert first['return'] == pytest.approx(expected)
+        assert results['win_rate'] == pytest.approx((trades['return'] > 0).mean())
+
+    def test_max_trades_limits_entries(self, sample_price_series):
+        signals = TradingStrategies.sma_crossover(sample_price_series, 5, 20)
+        unlimited = QuantBacktester().backtest_strategy(sample_price_series, signals)
+        limited = QuantBacktester(BacktestConfig(max_trades=2)).backtest_strategy(sample_price_series, signals)
+        assert unlimited['total_trades'] > 2
+        assert limited['total_trades'] == 2
+        stop = unlimited['trades']['exit'][1]
+        assert (limited['positions'].iloc[stop + 1:] == 0).all()
+
+    def test_costs_per_fill(self):
+        import execution
+        positions = np.array([0.0, 1.0, 1.0, 0.0, 0.5])
+        costs = execution.fill_costs(positions, trade_cost=0.002, stt_rate=0.001)
+        np.testing.assert_allclose(costs, [0.0, 0.002, 0.0, 0.003, 0.001])
+
+    def test_matrix_trade_counts_match_strategy(self, sample_price_series):
+        signals = [TradingStrategies.sma_crossover(sample_price_series, s, 40) for s in (5, 15)]
+        stats = QuantBacktester().backtest_matrix(sample_price_series, np.column_stack(signals))['stats']
+        for column, signal in enumerate(signals):
+            results = QuantBacktester().backtest_strategy(sample_price_series, signal)
+            assert stats['total_trades'].iloc[column] == results['total_trades']
+            assert stats['win_rate'].iloc[column] == pytest.approx(results['win_rate'])
+
+
+class TestStreaming:
+    @pytest.mark.parametrize("name,params", [
+        ('SMA Crossover', {'short_window': 5, 'long_window': 20}),
+        ('MACD', {}),
+        ('RSI', {'period': 7}),
+        ('Bollinger Bands', {'num_std': 1.0}),
+        ('Stochastic', {}),
+        ('ATR Breakout', {'period': 10}),
+    ])
+    def test_reproduces_batch_backtest(self, sample_price_series, name, params):
+        from streaming import StreamingBacktester
+        from strategies import get_strategy
+        expected = QuantBacktester().backtest_strategy(sample_price_series, get_strategy(name)(sample_price_series, **params))
+        engine = StreamingBacktester(name, params)
+        states = [engine.update(price, ts) for ts, price in sample_price_series.items()]
+        np.testing.assert_array_equal([s['position'] for s in states], expected['positions'].values)
+        np.testing.assert_array_equal([s['equity'] for s in states][1:], expected['equity_curve'].values[1:])
+        stats = engine.stats()
+        for key in ['total_return', 'annual_return', 'annual_volatility', 'sharpe_ratio', 'sortino_ratio',
+                    'calmar_ratio', 'max_drawdown', 'var_95', 'cvar_95', 'profit_factor', 'win_rate', 'total_trades']:
+            assert stats[key] == pytest.approx(expected[key], rel=1e-9)
+        assert stats['max_drawdown_date'] == expected['max_drawdown_date']
+
+    def test_rejects_full_history_strategy(self):
+        from streaming import StreamingBacktester
+        with pytest.raises(ValueError):
+            StreamingBacktester('ADX Trend')
+
+    def test_tail_window_bounds_history(self, sample_price_series):
+        from streaming import StreamingBacktester
+        engine = StreamingBacktester('Momentum', tail_window=50)
+        states = [engine.update(price, ts) for ts, price in sample_price_series.items()]
+        assert len(engine.net_returns) == 50
+        recent = np.array([s['net_return'] for s in states[-50:]])
+        assert engine.stats()['var_95'] == pytest.approx(np.percentile(recent, 5))
+
+
+class TestBenchmark:
+    def test_records_and_compares_timings(self, tmp_path):
+        from benchmark import Benchmark, compare, main
+        results = Benchmark(sizes=(250,), param_sets=(2,), min_time=0, verbose=False).run(['metrics', 'matrix'])
+        names = {(r['suite'], r['name']) for r in results['results']}
+        assert ('metrics', 'compute') in names and ('matrix', 'backtest_matrix') in names
+        assert all(r['median'] > 0 and r['repeats'] >= 1 for r in results['results'])
+
+        slower = {'results': [dict(r, median=r['median'] * 2) for r in results['results']]}
+        rows = compare(slower, results, tolerance=0.5)
+        assert len(rows) == len(results['results'])
+        assert all(row['regression'] for row in rows)
+        assert not any(row['regression'] for row in compare(results, results))
+
+        output = tmp_path / 'bench.json'
+        assert main(['--suites', 'metrics', '--max-bars', '250', '--min-time', '0', '--output', str(output)]) == 0
+        assert output.exists()
+
+    def test_largest_size_builds(self):
+        from benchmark import SIZES, synthetic_prices
+        prices = synthetic_prices(max(SIZES))
+        assert len(prices) == max(SIZES) and prices.notna().all()
+
+
 class TestIntegration:
     def test_full_backtest_pipeline(self, sample_price_series):
         signals = TradingStrategies.sma_crossover(sample_price_series)
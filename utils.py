@@ -1,52 +1,44 @@
 import pandas as pd
-import numpy as np
-from typing import Dict, List, Tuple
-from scipy import stats
+from typing import Dict
+
+import metrics
 
 
 class RiskMetrics:
+    """Single-statistic helpers; ``summary`` returns every statistic from one ``metrics.compute`` pass."""
+    
+    @staticmethod
+    def summary(returns: pd.Series, equity: pd.Series = None, rf_rate: float = 0.04,
+                confidence: float = 0.95) -> Dict[str, float]:
+        return metrics.compute(returns, equity, rf_rate=rf_rate, confidence=confidence)
     
     @staticmethod
     def calculate_sharpe_ratio(returns: pd.Series, rf_rate: float = 0.04) -> float:
-        annual_ret = returns.mean() * 252
-        annual_vol = returns.std() * np.sqrt(252)
-        return (annual_ret - rf_rate) / annual_vol if annual_vol != 0 else 0
+        return metrics.compute(returns, rf_rate=rf_rate)['sharpe_ratio']
     
     @staticmethod
     def calculate_sortino_ratio(returns: pd.Series, rf_rate: float = 0.04) -> float:
-        annual_ret = returns.mean() * 252
-        downside = returns[returns < 0]
-        downside_vol = downside.std() * np.sqrt(252)
-        return (annual_ret - rf_rate) / downside_vol if downside_vol != 0 else 0
+        return metrics.compute(returns, rf_rate=rf_rate)['sortino_ratio']
     
     @staticmethod
     def calculate_calmar_ratio(returns: pd.Series, equity: pd.Series) -> float:
-        annual_ret = returns.mean() * 252
-        running_max = equity.expanding().max()
-        drawdown = (equity - running_max) / running_max
-        max_dd = drawdown.min()
-        return annual_ret / abs(max_dd) if max_dd != 0 else 0
+        return metrics.compute(returns, equity)['calmar_ratio']
     
     @staticmethod
     def calculate_var(returns: pd.Series, confidence: float = 0.95) -> float:
-        return np.percentile(returns, (1 - confidence) * 100)
+        return metrics.compute(returns, confidence=confidence)['var']
     
     @staticmethod
     def calculate_cvar(returns: pd.Series, confidence: float = 0.95) -> float:
-        var = np.percentile(returns, (1 - confidence) * 100)
-        return returns[returns <= var].mean()
+        return metrics.compute(returns, confidence=confidence)['cvar']
     
     @staticmethod
     def calculate_win_rate(returns: pd.Series) -> float:
-        wins = (returns > 0).sum()
-        total = (returns != 0).sum()
-        return wins / total if total > 0 else 0
+        return metrics.compute(returns)['win_rate']
     
     @staticmethod
     def calculate_profit_factor(returns: pd.Series) -> float:
-        profits = returns[returns > 0].sum()
-        losses = abs(returns[returns < 0].sum())
-        return profits / losses if losses != 0 else 0
+        return metrics.compute(returns)['profit_factor']
 
 
 class Formatter:
@@ -0,0 +1,151 @@
+"""
+Walk-Forward Optimization - optimize on rolling/anchored train windows, evaluate out of sample
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+import execution
+import kernels
+import metrics
+from backtest import BacktestConfig
+from batch import default_workers
+from optimizer import GridSearchOptimizer, IndicatorBank, POSITION_BUILDERS, expand_grid
+
+# State shared by every window in a pool, installed once per worker by _init_worker
+_shared: Dict = {}
+
+
+def split_windows(n_bars: int, train_size: int, test_size: int, anchored: bool = False) -> List[Tuple[int, int, int]]:
+    """
+    ``(train_start, test_start, test_end)`` bar offsets for consecutive out-of-sample windows.
+    Rolling windows keep ``train_size`` bars of history; anchored windows train from bar 0.
+    The last test window is truncated at the end of the series.
+    """
+    if train_size < 2 or test_size < 1:
+        raise ValueError("train_size must be >= 2 and test_size >= 1")
+    windows = []
+    for test_start in range(train_size, n_bars, test_size):
+        train_start = 0 if anchored else test_start - train_size
+        windows.append((train_start, test_start, min(test_start + test_size, n_bars)))
+    return windows
+
+
+def _make_state(prices: pd.Series, strategy_name: str, grid: pd.DataFrame, config: BacktestConfig,
+                metric: str) -> Dict:
+    return {
+        'prices': prices,
+        'strategy_name': strategy_name,
+        'grid': grid,
+        'metric': metric,
+        'optimizer': GridSearchOptimizer(config),
+        # Built once per worker: every window this worker runs reuses its indicators
+        'bank': IndicatorBank(prices),
+    }
+
+
+def _init_worker(*args) -> None:
+    global _shared
+    _shared = _make_state(*args)
+
+
+def run_window(window: Tuple[int, int, int], state: Optional[Dict] = None) -> Dict:
+    """Pick the best parameters on the train rows, then trade them over the test rows."""
+    state = _shared if state is None else state
+    prices, bank, grid, metric = state['prices'], state['bank'], state['grid'], state['metric']
+    train_start, test_start, test_end = window
+
+    ranked = state['optimizer'].evaluate(prices.iloc[train_start:test_start], state['strategy_name'], grid,
+                                         bank=bank.rows(train_start, test_start))
+    if metric not in ranked.columns:
+        raise ValueError(f"Unknown metric: {metric}")
+    scores = ranked[metric].to_numpy(dtype=np.float64)
+    best = int(np.argmax(np.where(np.isnan(scores), -np.inf, scores)))
+
+    # Start one bar early so the first test bar earns the position held into it
+    build = POSITION_BUILDERS[state['strategy_name']]
+    positions = build(bank.rows(test_start - 1, test_end), grid.iloc[[best]]).astype(np.float64)
+    result = state['optimizer'].backtester.backtest_matrix(prices.iloc[test_start - 1:test_end], positions)
+    return {
+        'parameters': {key: grid.iloc[best][key].item() for key in grid.columns},
+        'train_score': scores[best],
+        'returns': np.array(result['returns'][1:, 0], dtype=np.float64),
+        'entry_position': float(result['positions'][0, 0]),
+        'exit_position': float(result['positions'][-1, 0]),
+        'stats': result['stats'].iloc[0].to_dict(),
+    }
+
+
+class WalkForwardOptimizer:
+    """
+    Splits a price series into train/test windows, grid-searches the strategy's
+    STRATEGY_CONFIGS ranges on each train window and stitches the out-of-sample returns
+    into one equity curve. Windows are independent and run on a process pool
+    (``BATCH_MAX_WORKERS``); each worker computes the full-series indicators once and
+    slices them per window.
+    """
+
+    def __init__(self, config: BacktestConfig = None, max_workers: Optional[int] = None):
+        self.config = config or BacktestConfig()
+        self.max_workers = default_workers() if max_workers is None else max_workers
+
+    def run(self, prices: pd.Series, strategy_name: str, train_size: int = 252, test_size: int = 63,
+            anchored: bool = False, metric: str = 'sharpe_ratio', steps: Optional[Dict[str, float]] = None) -> Dict:
+        if strategy_name not in POSITION_BUILDERS:
+            raise ValueError(f"Strategy {strategy_name} cannot be optimized")
+        windows = split_windows(len(prices), train_size, test_size, anchored)
+        if not windows:
+            raise ValueError(f"Need more than {train_size} bars for a walk-forward run, got {len(prices)}")
+        grid = expand_grid(strategy_name, steps)
+        args = (prices, strategy_name, grid, self.config, metric)
+
+        workers = min(self.max_workers, len(windows))
+        if workers <= 1:
+            state = _make_state(*args)
+            outcomes = [run_window(window, state) for window in windows]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=kernels.pool_context([__name__]),
+                                     initializer=_init_worker, initargs=args) as pool:
+                outcomes = list(pool.map(run_window, windows))
+
+        index = prices.index
+        rows = []
+        for (train_start, test_start, test_end), outcome in zip(windows, outcomes):
+            stats = outcome['stats']
+            rows.append(dict(
+                train_start=index[train_start], test_start=index[test_start], test_end=index[test_end - 1],
+                **outcome['parameters'], train_score=outcome['train_score'],
+                total_return=stats['total_return'], sharpe_ratio=stats['sharpe_ratio'],
+                max_drawdown=stats['max_drawdown'], total_trades=stats['total_trades'],
+            ))
+
+        # Each window is backtested from flat; charge the switch from the position the previous
+        # window ended with (flat before the first) on the window's first bar
+        held = 0.0
+        for outcome in outcomes:
+            switch = execution.fill_costs(np.array([held, outcome['entry_position']]), self.config.trade_cost,
+                                          self.config.stt_tax)
+            outcome['returns'][0] -= switch[1]
+            held = outcome['exit_position']
+        net = np.concatenate([outcome['returns'] for outcome in outcomes])
+        oos_index = index[windows[0][1]:windows[-1][2]]
+        equity = np.cumprod(1 + net) * self.config.initial_cash
+        summary = metrics.compute(net, dd=metrics.drawdown(equity, initial=self.config.initial_cash))
+        trades = np.array([outcome['stats']['total_trades'] for outcome in outcomes])
+        wins = np.array([outcome['stats']['win_rate'] for outcome in outcomes]) * trades
+        return {
+            'strategy_name': strategy_name,
+            'metric': metric,
+            'windows': pd.DataFrame(rows),
+            'returns': pd.Series(net, index=oos_index),
+            'equity_curve': pd.Series(equity, index=oos_index),
+            'total_return': equity[-1] / self.config.initial_cash - 1,
+            'sharpe_ratio': summary['sharpe_ratio'],
+            'sortino_ratio': summary['sortino_ratio'],
+            'calmar_ratio': summary['calmar_ratio'],
+            'max_drawdown': summary['max_drawdown'],
+            'max_drawdown_date': oos_index[summary['max_drawdown_index']],
+            'win_rate': wins.sum() / max(trades.sum(), 1),
+            'total_trades': int(trades.sum()),
+        }